@@ -0,0 +1,134 @@
+"""
+Measure cold-start cost: import time of the main modules and, optionally,
+the time until a fresh API process listens and until it reports ready.
+
+    python -m benchmarks.cold_start --output cold_start.json
+    python -m benchmarks.cold_start --server --baseline cold_start.json
+
+With --baseline, exits non-zero when a metric regresses by more than
+--tolerance (fraction) against the saved results.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+MODULES = [
+    "src.config",
+    "src.api.routes",
+    "src.rag.loaders",
+    "src.rag.jobs",
+    "src.rag.ingestion",
+    "src.engine.orchestrator",
+]
+
+def time_import(module: str, runs: int) -> dict:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1:]}
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return {"median_seconds": round(statistics.median(samples), 4), "min_seconds": round(min(samples), 4)}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_server_start(timeout: float) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    result = {"listening_seconds": None, "ready_seconds": None}
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                result["error"] = f"server exited with code {process.returncode}"
+                break
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    status, body = response.status, json.load(response)
+            except urllib.error.HTTPError as e:
+                status, body = e.code, json.load(e)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.05)
+                continue
+
+            elapsed = round(time.perf_counter() - started, 4)
+            if result["listening_seconds"] is None:
+                result["listening_seconds"] = elapsed
+            if status == 200:
+                result["ready_seconds"] = elapsed
+                break
+            if body.get("status") == "unavailable":
+                result["error"] = body.get("detail")
+                break
+            time.sleep(0.05)
+        else:
+            result["error"] = f"not ready after {timeout}s"
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return result
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for module, current in results["imports"].items():
+        before = baseline.get("imports", {}).get(module, {}).get("median_seconds")
+        now = current.get("median_seconds")
+        if before and now and now > before * (1 + tolerance):
+            regressions.append(f"import {module}: {before}s -> {now}s")
+    for metric in ("listening_seconds", "ready_seconds"):
+        before = baseline.get("server", {}).get(metric)
+        now = results.get("server", {}).get(metric)
+        if before and now and now > before * (1 + tolerance):
+            regressions.append(f"server {metric}: {before}s -> {now}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="Also start the API and time /health.")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", default=None, help="Compare against a previous --output file.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {
+        "offline_mode": os.getenv("OFFLINE_MODE", "false").lower() == "true",
+        "imports": {module: time_import(module, args.runs) for module in args.modules},
+    }
+    if args.server:
+        results["server"] = time_server_start(args.timeout)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Compare embedding backends (PyTorch vs ONNX vs ONNX int8) on latency,
+throughput, peak RSS and retrieval recall against the PyTorch reference.
+
+    python -m benchmarks.embedding_backends --corpus docs --output embedding_bench.json
+
+Each backend runs in its own subprocess so import time and RSS are isolated.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKENDS = {
+    "torch": {"EMBEDDING_BACKEND": "torch"},
+    "onnx": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZED": "false"},
+    "onnx-int8": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZED": "true"},
+}
+
+def load_corpus(directory: str, limit: int):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from src.rag.loaders import SUPPORTED_EXTENSIONS, load_file
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, length_function=len)
+    texts = []
+    for root, _, files in os.walk(directory):
+        for file in sorted(files):
+            if file.endswith(SUPPORTED_EXTENSIONS):
+                texts.extend(chunk.page_content for chunk in splitter.split_documents(load_file(os.path.join(root, file))))
+    if not texts:
+        words = "agent retrieval compliance policy vector query document embedding latency cache".split()
+        rng = random.Random(0)
+        texts = [" ".join(rng.choice(words) for _ in range(120)) for _ in range(limit)]
+    return texts[:limit]
+
+def make_queries(texts, count: int):
+    rng = random.Random(42)
+    queries = []
+    for text in rng.sample(texts, min(count, len(texts))):
+        sentences = [s for s in re.split(r"(?<=[.!?])\s+", text) if len(s) > 20] or [text[:120]]
+        queries.append(rng.choice(sentences)[:200])
+    return queries
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+def run_worker(texts_path: str, vectors_path: str):
+    started = time.perf_counter()
+    from src.rag.embedding import build_embedding_model
+
+    model, model_name = build_embedding_model()
+    model.embed_query("warm-up")
+    load_seconds = time.perf_counter() - started
+
+    with open(texts_path, encoding="utf-8") as f:
+        payload = json.load(f)
+    corpus, queries = payload["corpus"], payload["queries"]
+
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        t0 = time.perf_counter()
+        query_vectors.append(model.embed_query(query))
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    corpus_vectors = model.embed_documents(corpus)
+    batch_seconds = time.perf_counter() - t0
+
+    np.savez(vectors_path, corpus=np.asarray(corpus_vectors, dtype=np.float32), queries=np.asarray(query_vectors, dtype=np.float32))
+    print(json.dumps({
+        "model": model_name,
+        "load_seconds": round(load_seconds, 3),
+        "query_latency_ms": {"p50": round(percentile(latencies, 50), 3), "p95": round(percentile(latencies, 95), 3)},
+        "throughput_docs_per_second": round(len(corpus) / batch_seconds, 2) if batch_seconds else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "dimensions": int(np.asarray(corpus_vectors).shape[1]),
+    }))
+
+def recall_at_k(reference, candidate, k: int) -> float:
+    def top_k(vectors):
+        scores = vectors["queries"] @ vectors["corpus"].T
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    expected, found = top_k(reference), top_k(candidate)
+    return float(np.mean([len(set(e) & set(f)) / k for e, f in zip(expected, found)]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--corpus", default="docs")
+    parser.add_argument("--max-chunks", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--texts", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.texts, args.vectors)
+        return
+
+    corpus = load_corpus(args.corpus, args.max_chunks)
+    queries = make_queries(corpus, args.queries)
+    workdir = tempfile.mkdtemp(prefix="embedding-bench-")
+    texts_path = os.path.join(workdir, "texts.json")
+    with open(texts_path, "w", encoding="utf-8") as f:
+        json.dump({"corpus": corpus, "queries": queries}, f)
+
+    results = {"corpus_chunks": len(corpus), "queries": len(queries), "k": args.k, "backends": {}}
+    vectors = {}
+    for backend in args.backends:
+        env = {**os.environ, **BACKENDS[backend], "EMBEDDING_CACHE_ENABLED": "false"}
+        if args.threads:
+            env["EMBEDDING_THREADS"] = str(args.threads)
+        if args.batch_size:
+            env["EMBEDDING_BATCH_SIZE"] = str(args.batch_size)
+
+        vectors_path = os.path.join(workdir, f"{backend}.npz")
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.embedding_backends", "--worker", "--texts", texts_path, "--vectors", vectors_path],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            results["backends"][backend] = {"error": completed.stderr.strip().splitlines()[-1:]}
+            continue
+
+        results["backends"][backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+        vectors[backend] = dict(np.load(vectors_path))
+
+    reference = "torch" if "torch" in vectors else next(iter(vectors), None)
+    for backend, backend_vectors in vectors.items():
+        results["backends"][backend]["recall_at_k_vs_" + reference] = round(recall_at_k(vectors[reference], backend_vectors, args.k), 4)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Serve the API with the offline stand-ins from benchmarks.fakes, for load
+tests that need no OpenAI key, Qdrant server or model download.
+
+    VECTOR_STORE_BACKEND=local python -m benchmarks.fake_server --port 8001 --llm-latency-ms 200
+
+Two extra endpoints report to the load generator:
+- GET /benchmark/stages: raw stage durations (seconds) recorded since the
+  last ?reset=true, so percentiles are exact rather than bucketed
+- GET /benchmark/process: CPU seconds and RSS of the server process
+"""
+import argparse
+import os
+import resource
+import threading
+
+from collections import defaultdict
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+
+def _record_stages():
+    """Keep every STAGE_SECONDS observation alongside the histogram."""
+    from src.metrics import STAGE_SECONDS
+
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    observe = STAGE_SECONDS.observe
+
+    def recording_observe(value: float, **labels: str):
+        observe(value, **labels)
+        with lock:
+            samples[labels["stage"]].append(value)
+
+    def snapshot(reset: bool) -> dict:
+        with lock:
+            result = {stage: list(values) for stage, values in samples.items()}
+            if reset:
+                samples.clear()
+        return result
+
+    STAGE_SECONDS.observe = recording_observe
+    return snapshot
+
+def build_app(args):
+    from benchmarks.fakes import install
+
+    install(
+        fake_embeddings=not args.real_embeddings,
+        latency_ms=args.llm_latency_ms,
+        jitter_ms=args.llm_jitter_ms,
+        ms_per_token=args.llm_ms_per_token,
+        answer_tokens=args.llm_answer_tokens,
+        block_ratio=args.block_ratio,
+        rag_ratio=args.rag_ratio,
+        tail_ratio=args.llm_tail_ratio,
+        tail_ms=args.llm_tail_ms,
+        error_ratio=args.llm_error_ratio,
+    )
+    stages = _record_stages()
+
+    from src.api.routes import app
+
+    @app.get("/benchmark/stages")
+    async def benchmark_stages(reset: bool = False):
+        return stages(reset)
+
+    @app.get("/benchmark/process")
+    async def benchmark_process():
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return {
+            "cpu_seconds": own.ru_utime + own.ru_stime,
+            "children_cpu_seconds": children.ru_utime + children.ru_stime,
+            "rss_mb": _rss_mb(),
+            "peak_rss_mb": round(own.ru_maxrss / 1024, 1),
+        }
+
+    return app
+
+def add_model_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--llm-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--llm-answer-tokens", type=int, default=60)
+    parser.add_argument("--block-ratio", type=float, default=0.1)
+    parser.add_argument("--rag-ratio", type=float, default=0.7)
+    parser.add_argument("--llm-tail-ratio", type=float, default=0.0, help="Share of LLM calls slowed by --llm-tail-ms.")
+    parser.add_argument("--llm-tail-ms", type=float, default=0.0)
+    parser.add_argument("--llm-error-ratio", type=float, default=0.0, help="Share of LLM calls that fail.")
+    parser.add_argument("--real-embeddings", action="store_true", help="Use the configured embedding model instead of hashing.")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_model_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(build_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
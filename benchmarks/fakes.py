@@ -0,0 +1,200 @@
+"""
+Offline stand-ins for the benchmarks: a deterministic chat model that answers
+each agent's prompt with valid output after a configurable delay, and a
+hashing embedding model. install() swaps them in before the agents load.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+
+_QUERY = re.compile(r'"""\s*(.*?)\s*"""', re.S)
+_QUESTION = re.compile(r"User Question:\s*(.*?)\s*Retrieved Context:", re.S)
+
+def _fraction(text: str, salt: str) -> float:
+    """Stable value in [0, 1) for `text`, so every run routes the same query the same way."""
+    digest = hashlib.md5(f"{salt}\0{text}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+class FakeChatModel(BaseChatModel):
+    """
+    Answers the compliance, decision, triage and RAG prompts with valid JSON
+    and anything else with plain text. Each call waits `latency_ms` (plus up
+    to `jitter_ms`, derived from the prompt) and `ms_per_token` per output
+    token. Queries are blocked with probability `block_ratio` and routed to
+    RAG with probability `rag_ratio`, decided by a hash of the query text.
+
+    Independently of the prompt, a call is slowed by `tail_ms` with
+    probability `tail_ratio` and fails with probability `error_ratio`, so a
+    repeated request does not share the first one's fate.
+
+    with_structured_output() passes the schema along with each call, as a
+    native structured-output API would, and counts it as prompt tokens.
+    """
+    model: str = "fake"
+    latency_ms: float = 200.0
+    jitter_ms: float = 50.0
+    ms_per_token: float = 0.0
+    answer_tokens: int = 60
+    block_ratio: float = 0.1
+    rag_ratio: float = 0.7
+    tail_ratio: float = 0.0
+    tail_ms: float = 0.0
+    error_ratio: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        system = str(messages[0].content) if messages else ""
+        human = str(messages[-1].content) if messages else ""
+        match = _QUERY.search(human)
+        query = match.group(1) if match else human
+
+        blocked = _fraction(query, "block") < self.block_ratio
+        decision = "rag" if _fraction(query, "route") < self.rag_ratio else "direct"
+        search_terms = [query[:60], " ".join(query.split()[:3])] if decision == "rag" else []
+        compliance = {
+            "is_safe": not blocked,
+            "reason": "Synthetic block." if blocked else "Synthetic pass.",
+            "category": "illegal" if blocked else "safe",
+            "risk_level": "high" if blocked else "low",
+            "sanitized_query": None,
+        }
+
+        if "Compliance Authority" in system:
+            return json.dumps(compliance)
+        if "Triage Authority" in system:
+            return json.dumps({
+                **compliance,
+                "decision": None if blocked else decision,
+                "decision_reason": None if blocked else "Synthetic route.",
+                "search_terms": [] if blocked else search_terms,
+            })
+        if "Decision Authority" in system:
+            return json.dumps({"decision": decision, "reason": "Synthetic route.", "search_terms": search_terms})
+        if "RAG Answer Agent" in system:
+            question = _QUESTION.search(human)
+            return json.dumps({
+                "answer": self._words(question.group(1) if question else human),
+                "context_sufficient": True,
+                "citations": ["synthetic.txt"],
+            })
+        return self._words(human)
+
+    def with_structured_output(self, schema: Any, **kwargs) -> Runnable:
+        return self.bind(response_format=schema) | PydanticOutputParser(pydantic_object=schema)
+
+    def _words(self, seed: str) -> str:
+        words = hashlib.sha256(seed.encode("utf-8")).hexdigest()
+        return " ".join(f"w{words[i % len(words)]}{i}" for i in range(self.answer_tokens))
+
+    def _delay(self, messages: List[BaseMessage], text: str) -> float:
+        prompt = "".join(str(message.content) for message in messages)
+        jitter = self.jitter_ms * _fraction(prompt, "jitter")
+        tail = self.tail_ms if random.random() < self.tail_ratio else 0.0
+        return (self.latency_ms + jitter + tail + self.ms_per_token * len(text.split())) / 1000
+
+    def _maybe_fail(self):
+        if random.random() < self.error_ratio:
+            raise RuntimeError(f"Synthetic upstream error from {self.model}.")
+
+    def _usage(self, messages: List[BaseMessage], text: str, response_format: Any = None) -> dict:
+        prompt = "".join(str(message.content) for message in messages)
+        if response_format is not None:
+            prompt += json.dumps(response_format.model_json_schema())
+        input_tokens = len(prompt) // 4
+        output_tokens = max(1, len(text) // 4)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _result(self, messages: List[BaseMessage], text: str, response_format: Any = None) -> ChatResult:
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text, response_format))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        self._maybe_fail()
+        text = self._respond(messages)
+        delay = self._delay(messages, text)
+        # A per-request `timeout` ends the call, as it does for the OpenAI client.
+        timeout = kwargs.get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"Synthetic request to {self.model} timed out after {timeout:.2f}s.")
+        time.sleep(delay)
+        return self._result(messages, text, kwargs.get("response_format"))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        self._maybe_fail()
+        text = self._respond(messages)
+        await asyncio.sleep(self._delay(messages, text))
+        return self._result(messages, text, kwargs.get("response_format"))
+
+    def _chunks(self, messages: List[BaseMessage], text: str, response_format: Any = None) -> List[ChatGenerationChunk]:
+        pieces = re.findall(r"\S+\s*", text) or [text]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=piece)) for piece in pieces]
+        usage = self._usage(messages, text, response_format)
+        chunks.append(ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage)))
+        return chunks
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        time.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages, text, kwargs.get("response_format")):
+            time.sleep(self.ms_per_token / 1000)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        text = self._respond(messages)
+        await asyncio.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(messages, text, kwargs.get("response_format")):
+            await asyncio.sleep(self.ms_per_token / 1000)
+            yield chunk
+
+class HashEmbeddings(Embeddings):
+    """Deterministic bag-of-words vectors: texts sharing words are similar."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+def install(fake_embeddings: bool = True, **model_options):
+    """
+    Back every agent's LLM client (tiers, hedging and fallback included) with
+    FakeChatModel, keeping its metrics callbacks, and with `fake_embeddings`
+    route the embedding model to HashEmbeddings. Must run before the agents
+    and the retriever are created.
+    """
+    import src.engine.llm as llm
+    import src.rag.embedding as embedding
+
+    def fake_chat_model(model: str, temperature: float = 0, timeout: Optional[float] = None):
+        return FakeChatModel(model=model, callbacks=[llm.LLMUsageHandler(model)], **model_options)
+
+    llm.chat_model = fake_chat_model
+    if fake_embeddings:
+        embedding.build_embedding_model = lambda backend=None, threads=None: (HashEmbeddings(), "hash-384")
@@ -0,0 +1,129 @@
+"""
+Measure how a background ingest affects query latency. A probe embeds a
+fresh query every --interval seconds, first while idle, then while a corpus
+is ingested the way background jobs do it:
+- "in_process": the embedding stage runs on a thread of this process
+  (INGEST_JOB_EMBED_THREADS=0)
+- "worker": embedding runs in a ProcessEmbeddings child at --niceness with
+  --threads threads (the job default)
+
+    python -m benchmarks.ingest_interference --files 200 --output interference.json
+
+Reports probe latency p50/p95/p99 per phase and the ingest duration. The
+probe and the ingest both use CpuEmbeddings, a synthetic model that spends
+its time in NumPy matrix products, which release the GIL and use every core,
+as torch does. No model download and no Qdrant are needed; vectors go to the
+local vector store in a temporary directory.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fakes import HashEmbeddings
+from benchmarks.load_test import make_corpus, percentiles
+
+VOCABULARY = [f"term{i}" for i in range(2000)]
+
+class CpuEmbeddings(HashEmbeddings):
+    """HashEmbeddings that also burns `rounds` 384x384 matrix products per text, like a transformer forward pass."""
+
+    def __init__(self, rounds: int = 20):
+        super().__init__()
+        self.rounds = rounds
+        self._weights = np.random.default_rng(0).normal(size=(384, 384)).astype(np.float32)
+
+    def _embed(self, text):
+        state = np.ones((16, 384), dtype=np.float32)
+        for _ in range(self.rounds):
+            state = np.tanh(state @ self._weights)
+        return super()._embed(text)
+
+def cpu_embeddings(threads: int) -> CpuEmbeddings:
+    return CpuEmbeddings()
+
+def probe(model: CpuEmbeddings, stop: threading.Event, interval: float) -> list:
+    latencies = []
+    while not stop.is_set():
+        query = f"probe {random.random()} {random.choice(VOCABULARY)}"
+        started = time.perf_counter()
+        model.embed_query(query)
+        latencies.append(time.perf_counter() - started)
+        time.sleep(interval)
+    return latencies
+
+def run_phase(args, workdir: str, corpus: str, kind: str) -> dict:
+    from src.rag.embedding import ProcessEmbeddings
+    from src.rag.ingestion import RAGIngestion
+
+    prober = CpuEmbeddings()
+    stop = threading.Event()
+    if kind == "idle":
+        timer = threading.Timer(args.idle_seconds, stop.set)
+        timer.start()
+        return {"probe_latency_ms": percentiles(probe(prober, stop, args.interval))}
+
+    embedding = CpuEmbeddings() if kind == "in_process" else ProcessEmbeddings(threads=args.threads, niceness=args.niceness, factory=cpu_embeddings)
+    rag = RAGIngestion(collection_name=f"interference_{kind}", manifest_path=os.path.join(workdir, f"{kind}.json"))
+    result = {}
+
+    def ingest():
+        started = time.perf_counter()
+        try:
+            rag.ingest(corpus, parse_workers=1, niceness=args.niceness, embedding=embedding)
+        finally:
+            result["ingest_seconds"] = round(time.perf_counter() - started, 2)
+            stop.set()
+
+    worker = threading.Thread(target=ingest)
+    worker.start()
+    latencies = probe(prober, stop, args.interval)
+    worker.join()
+    if kind == "worker":
+        embedding.close()
+    return {"probe_latency_ms": percentiles(latencies), **result}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between probe queries (seconds).")
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=1, help="Embedding threads of the worker process.")
+    parser.add_argument("--niceness", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ingest-interference-")
+    os.environ.update({
+        "VECTOR_STORE_BACKEND": "local",
+        "LOCAL_VECTOR_STORE_DIR": os.path.join(workdir, "vector_store"),
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    })
+    from benchmarks.fakes import install
+    install()
+
+    try:
+        corpus = os.path.join(workdir, "corpus")
+        make_corpus(corpus, args.files, args.file_kb, VOCABULARY)
+        results = {"files": args.files, "cpus": os.cpu_count(), "threads": args.threads, "niceness": args.niceness, "phases": {}}
+        for kind in ("idle", "in_process", "worker"):
+            results["phases"][kind] = run_phase(args, workdir, corpus, kind)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
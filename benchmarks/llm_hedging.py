@@ -0,0 +1,129 @@
+"""
+Measure what the latency-aware LLM client buys on a model with a slow tail:
+the same calls go to a bare FakeChatModel, to LatencyAwareLLM with only the
+deadline and fallback, and to LatencyAwareLLM with hedging as well.
+
+    python -m benchmarks.llm_hedging --calls 500 --tail-ratio 0.03 --tail-ms 2000
+    python -m benchmarks.llm_hedging --error-ratio 0.02 --timeout 1.5 --output hedging.json
+
+Reports latency p50/p95/p99/max, failed calls and LLM calls per request (the
+hedging overhead) for each client. Needs no network and no API key.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from benchmarks.fakes import FakeChatModel
+from src.engine.llm import LatencyAwareLLM, LatencyTracker
+
+class CallCounter(BaseCallbackHandler):
+    """Counts calls sent, including hedges cancelled before they finished."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+def make_model(args, name: str, counter: CallCounter) -> FakeChatModel:
+    return FakeChatModel(
+        model=name,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tail_ratio=args.tail_ratio,
+        tail_ms=args.tail_ms,
+        error_ratio=args.error_ratio,
+        callbacks=[counter],
+    )
+
+def make_client(args, kind: str, counter: CallCounter):
+    primary = make_model(args, "fake-primary", counter)
+    if kind == "plain":
+        return primary
+    tracker = LatencyTracker(quantile=args.quantile, min_samples=args.min_samples, min_seconds=args.min_seconds)
+    return LatencyAwareLLM(
+        primary,
+        model="fake-primary",
+        timeout=args.timeout,
+        fallback=make_model(args, "fake-fallback", counter),
+        fallback_model="fake-fallback",
+        tracker=tracker,
+        hedge=kind == "hedged",
+    )
+
+async def run_client(args, kind: str) -> dict:
+    counter = CallCounter()
+    client = make_client(args, kind, counter)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int, measured: bool):
+        nonlocal errors
+        # Distinct prompts, so the fake's prompt-derived jitter varies between calls.
+        messages = [SystemMessage(content="You are a helpful assistant."), HumanMessage(content=f"Question {i}")]
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.ainvoke(messages)
+            except Exception:
+                if measured:
+                    errors += 1
+                return
+            if measured:
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i, False) for i in range(args.warmup)))
+    calls_before = counter.calls
+    await asyncio.gather(*(one(args.warmup + i, True) for i in range(args.calls)))
+
+    result = {
+        "errors": errors,
+        "llm_calls_per_request": round((counter.calls - calls_before) / args.calls, 3),
+    }
+    if latencies:
+        result["latency_ms"] = {
+            **{f"p{q}": round(float(np.percentile(latencies, q)) * 1000, 1) for q in (50, 95, 99)},
+            "max": round(max(latencies) * 1000, 1),
+        }
+    if kind == "hedged":
+        result["hedge_after_seconds"] = client.tracker.hedge_delay("fake-primary")
+    return result
+
+async def run(args) -> dict:
+    results = {"config": {key: value for key, value in vars(args).items() if key != "output"}}
+    for kind in ("plain", "deadline", "hedged"):
+        results[kind] = await run_client(args, kind)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=100, help="Calls made before measuring, to fill the latency window.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tail-ratio", type=float, default=0.03)
+    parser.add_argument("--tail-ms", type=float, default=2000.0)
+    parser.add_argument("--error-ratio", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-call deadline of the wrapped clients.")
+    parser.add_argument("--quantile", type=float, default=0.95)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--min-seconds", type=float, default=0.0)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
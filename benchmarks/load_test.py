@@ -0,0 +1,252 @@
+"""
+Offline load test of the API: starts benchmarks.fake_server (fake chat model,
+hashing embeddings, local vector store) in a subprocess, ingests a synthetic
+corpus through /ingest, then drives /ask at each concurrency level.
+
+    python -m benchmarks.load_test --concurrency 1 8 32 --requests 200 --output load.json
+    python -m benchmarks.load_test --concurrency 8 --baseline load.json
+
+Reports client latency p50/p95/p99 and requests/s per level, p50/p95/p99 of
+each server stage, and server CPU and RSS. With --baseline, exits non-zero
+when p95 latency or throughput regresses by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_server import add_model_arguments
+
+def percentiles(values) -> dict:
+    if not values:
+        return {}
+    return {f"p{q}": round(float(np.percentile(values, q)) * 1000, 2) for q in (50, 95, 99)}
+
+def make_corpus(directory: str, files: int, file_kb: int, vocabulary: list, seed: int = 0):
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(files):
+        words, size = [], 0
+        while size < file_kb * 1024:
+            word = rng.choice(vocabulary)
+            words.append(word)
+            size += len(word) + 1
+        with open(os.path.join(directory, f"doc{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(" ".join(words))
+
+def make_queries(count: int, vocabulary: list, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [f"What do the documents say about {rng.choice(vocabulary)} and {rng.choice(vocabulary)}?" for _ in range(count)]
+
+def start_server(args, port: int, workdir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "VECTOR_STORE_BACKEND": "local",
+        "LOCAL_VECTOR_STORE_DIR": os.path.join(workdir, "vector_store"),
+        "INGEST_MANIFEST_DIR": os.path.join(workdir, "manifests"),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite"),
+        "ORCHESTRATOR_MODE": args.mode,
+        "OFFLINE_MODE": "true",
+        "CONTEXT_TOKEN_COUNTING": os.getenv("CONTEXT_TOKEN_COUNTING", "estimate"),
+        "LOG_LEVEL": "WARNING",
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "offline"),
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.fake_server", "--port", str(port),
+        "--llm-latency-ms", str(args.llm_latency_ms),
+        "--llm-jitter-ms", str(args.llm_jitter_ms),
+        "--llm-ms-per-token", str(args.llm_ms_per_token),
+        "--llm-answer-tokens", str(args.llm_answer_tokens),
+        "--block-ratio", str(args.block_ratio),
+        "--rag-ratio", str(args.rag_ratio),
+        "--llm-tail-ratio", str(args.llm_tail_ratio),
+        "--llm-tail-ms", str(args.llm_tail_ms),
+        "--llm-error-ratio", str(args.llm_error_ratio),
+    ]
+    if args.real_embeddings:
+        command.append("--real-embeddings")
+    return subprocess.Popen(command, env=env)
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            response = await client.get("/health")
+            if response.status_code == 200:
+                return
+            if response.json().get("status") == "unavailable":
+                raise RuntimeError(response.json().get("detail"))
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+async def server_stages(client: httpx.AsyncClient, reset: bool = True) -> dict:
+    samples = (await client.get("/benchmark/stages", params={"reset": reset})).json()
+    return {stage: {"count": len(values), **percentiles(values)} for stage, values in sorted(samples.items())}
+
+async def server_process(client: httpx.AsyncClient) -> dict:
+    return (await client.get("/benchmark/process")).json()
+
+def resource_usage(before: dict, after: dict, elapsed: float) -> dict:
+    cpu = after["cpu_seconds"] - before["cpu_seconds"]
+    children = after["children_cpu_seconds"] - before["children_cpu_seconds"]
+    return {
+        "cpu_seconds": round(cpu, 3),
+        "children_cpu_seconds": round(children, 3),
+        "cpu_utilization": round(cpu / elapsed, 3) if elapsed else None,
+        "rss_mb": after["rss_mb"],
+        "peak_rss_mb": after["peak_rss_mb"],
+    }
+
+async def run_ingest(client: httpx.AsyncClient, directory: str, parallel: bool, timeout: float) -> dict:
+    await server_stages(client)
+    before = await server_process(client)
+    started = time.perf_counter()
+
+    job_id = (await client.post("/ingest", json={"directory_path": directory, "parallel": parallel})).json()["job_id"]
+    while time.perf_counter() - started < timeout:
+        job = (await client.get(f"/ingest/jobs/{job_id}")).json()
+        if job["status"] not in ("queued", "running"):
+            break
+        await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "status": job["status"],
+        "seconds": round(elapsed, 3),
+        "summary": job.get("summary"),
+        "stages_ms": await server_stages(client),
+        "process": resource_usage(before, await server_process(client), elapsed),
+    }
+
+async def run_ask(client: httpx.AsyncClient, queries: list, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses, errors = [], {}, 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/ask", json={"query": queries[i % len(queries)], "role": "standard"})
+                response.raise_for_status()
+                status = response.json().get("strategy") or response.json().get("status")
+                statuses[status] = statuses.get(status, 0) + 1
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+
+    await server_stages(client)
+    before = await server_process(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "outcomes": statuses,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": percentiles(latencies),
+        "stages_ms": await server_stages(client),
+        "process": resource_usage(before, await server_process(client), elapsed),
+    }
+
+async def run(args, workdir: str) -> dict:
+    vocabulary = [f"term{i:04d}" for i in range(args.vocabulary)]
+    corpus = os.path.join(workdir, "corpus")
+    make_corpus(corpus, args.files, args.file_kb, vocabulary)
+    queries = make_queries(args.unique_queries, vocabulary)
+
+    port = args.port
+    process = start_server(args, port, workdir)
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 4)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits) as client:
+            await wait_ready(client, process, args.timeout)
+            results = {
+                "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+                "ingest": await run_ingest(client, corpus, args.ingest_parallel, args.timeout),
+                "ask": {},
+            }
+            if args.warmup:
+                await run_ask(client, queries, args.warmup, max(args.concurrency))
+            for concurrency in args.concurrency:
+                results["ask"][str(concurrency)] = await run_ask(client, queries, args.requests, concurrency)
+            return results
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for level, current in results["ask"].items():
+        before = baseline.get("ask", {}).get(level)
+        if not before:
+            continue
+        if current["latency_ms"].get("p95") and before["latency_ms"].get("p95") and \
+                current["latency_ms"]["p95"] > before["latency_ms"]["p95"] * (1 + tolerance):
+            regressions.append(f"ask c={level} p95: {before['latency_ms']['p95']}ms -> {current['latency_ms']['p95']}ms")
+        if current["requests_per_second"] and before["requests_per_second"] and \
+                current["requests_per_second"] < before["requests_per_second"] * (1 - tolerance):
+            regressions.append(f"ask c={level} throughput: {before['requests_per_second']} -> {current['requests_per_second']} req/s")
+    before, now = baseline.get("ingest", {}).get("seconds"), results["ingest"]["seconds"]
+    if before and now and now > before * (1 + tolerance):
+        regressions.append(f"ingest: {before}s -> {now}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring (0 to skip).")
+    parser.add_argument("--unique-queries", type=int, default=100)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--file-kb", type=int, default=8)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--ingest-parallel", action="store_true")
+    parser.add_argument("--mode", default="sequential", help="ORCHESTRATOR_MODE of the server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    add_model_arguments(parser)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", default=None, help="Compare against a previous --output file.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    try:
+        results = asyncio.run(run(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
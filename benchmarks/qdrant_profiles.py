@@ -0,0 +1,102 @@
+"""
+Compare the Qdrant collection profiles (src/adapters/qdrant_profiles.py): the
+same synthetic corpus is loaded into one collection per profile and searched
+through the adapter call the retriever uses (search_batch), with each
+profile's search parameters.
+
+    python -m benchmarks.qdrant_profiles --qdrant-url http://localhost:6333 --points 100000
+    python -m benchmarks.qdrant_profiles --profiles default quantized_disk --output profiles.json
+
+Reports per profile: query latency p50/p95/p99, recall@k against an exact
+float32 search, the estimated RAM of vectors and HNSW graph, and, with a
+server, the change of the server's resident memory after loading and searching
+the collection (read from its /metrics endpoint). Without --qdrant-url (or
+QDRANT_URL) Qdrant runs embedded, which searches exactly and ignores
+quantization, HNSW and on-disk settings, so only the estimates differ there.
+"""
+import argparse
+import json
+import os
+import re
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct
+
+from benchmarks.vector_store import DIM, exact_top_k, make_vectors, measure, payloads
+from src.adapters.qdrant_profiles import PROFILES, CollectionProfile, wait_until_green
+from src.adapters.qdrant_registry import create_payload_indexes
+
+COLLECTION = "benchmark_profiles"
+
+def estimated_ram_mb(profile: CollectionProfile, points: int, dim: int = DIM) -> float:
+    """float32 originals unless on disk, the int8 copy when quantized, and the HNSW links (2m per point on layer 0)."""
+    vectors = 0 if profile.on_disk else points * dim * 4
+    quantized = points * dim if profile.quantized else 0
+    graph = points * 2 * (profile.hnsw_m or 16) * 4
+    return round((vectors + quantized + graph) / 1e6, 1)
+
+def server_memory_mb(url: str) -> float:
+    import httpx
+
+    headers = {"api-key": os.getenv("QDRANT_API_KEY")} if os.getenv("QDRANT_API_KEY") else {}
+    text = httpx.get(f"{url.rstrip('/')}/metrics", headers=headers, timeout=10).text
+    match = re.search(r"^memory_resident_bytes\s+(\S+)", text, re.MULTILINE)
+    return float(match.group(1)) / 1e6 if match else None
+
+def bench_profile(client, url, profile: CollectionProfile, corpus, probes, truth, k, batch) -> dict:
+    collection = f"{COLLECTION}_{profile.name}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+
+    memory_before = server_memory_mb(url) if url else None
+    client.create_collection(collection, **profile.create_options(DIM, Distance.COSINE))
+    create_payload_indexes(client, collection, profile)
+    for start in range(0, len(corpus), 1000):
+        end = min(start + 1000, len(corpus))
+        client.upsert(collection, points=[
+            PointStruct(id=i, vector=corpus[i].tolist(), payload=payload)
+            for i, payload in zip(range(start, end), payloads(start, end))
+        ], wait=True)
+    wait_until_green(client, collection)
+
+    try:
+        result = {"estimated_ram_mb": estimated_ram_mb(profile, len(corpus))}
+        result.update(measure(client, collection, probes, truth, k, batch, params=profile.search_params()))
+        if url:
+            memory_after = server_memory_mb(url)
+            result["server_resident_delta_mb"] = round(memory_after - memory_before, 1) if memory_before and memory_after else None
+        return result
+    finally:
+        client.delete_collection(collection)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=4, help="Queries per batched search (one per search term).")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--qdrant-url", default=os.getenv("QDRANT_URL"))
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    corpus, probes = make_vectors(args.points, args.queries)
+    truth = exact_top_k(corpus, probes, args.k)
+
+    url = args.qdrant_url
+    client = QdrantClient(url=url, api_key=os.getenv("QDRANT_API_KEY") or None) if url else QdrantClient(":memory:")
+    results = {"points": args.points, "queries": args.queries, "k": args.k, "mode": "server" if url else "embedded", "profiles": {}}
+    try:
+        for name in args.profiles:
+            results["profiles"][name] = bench_profile(client, url, PROFILES[name], corpus, probes, truth, args.k, args.batch)
+    finally:
+        client.close()
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compare the two structured-output modes of the JSON agents (compliance,
+decision, triage, RAG answer): "parser" (format instructions in the prompt,
+reply parsed as text) against "native" (schema sent through the model's
+structured-output API). Reports, per agent and mode, prompt tokens per call
+(and how many were served from the provider's prompt cache), latency, and
+failed calls, then the reduction of native over parser.
+
+    python -m benchmarks.structured_output --output structured_output.json
+    python -m benchmarks.structured_output --offline --limit 10
+
+Calls the configured LLM unless --offline, which uses benchmarks.fakes (token
+counts are then estimates and latencies are synthetic). Each mode runs the
+labeled queries of benchmarks/data/triage_queries.jsonl --passes times, with
+the verdict caches cleared between passes, so later passes show prompt caching.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from benchmarks.triage_eval import DEFAULT_QUERIES, UsageCounter, load_queries, with_counter
+from src.engine.agents.compliance.agent import ComplianceAgent
+from src.engine.agents.compliance.model import ComplianceInput
+from src.engine.agents.decision.agent import DecisionAgent
+from src.engine.agents.rag_answer.agent import RAGAnswerAgent
+from src.engine.agents.triage.agent import TriageAgent
+
+MODES = ("parser", "native")
+
+RAG_CONTEXT = """[Source: handbook.md]
+Employees may work remotely up to three days a week. Requests for more remote days go to the team lead.
+
+[Source: onboarding.md]
+New hires receive a laptop on their first day and complete the security training within two weeks."""
+
+def build_agents(mode: str, counter) -> dict:
+    return {
+        "compliance": with_counter(ComplianceAgent(structured_output=mode), counter("compliance")),
+        "decision": with_counter(DecisionAgent(structured_output=mode), counter("decision")),
+        "triage": with_counter(TriageAgent(ComplianceAgent(), structured_output=mode), counter("triage")),
+        "rag_answer": with_counter(RAGAnswerAgent(structured_output=mode), counter("rag_answer")),
+    }
+
+def agent_call(name: str, agent, item: dict):
+    if name in ("compliance", "triage"):
+        agent.verdict_cache.clear()
+        return agent.ainvoke(ComplianceInput(query=item["query"], user_role=item.get("user_role", "standard")))
+    if name == "decision":
+        return agent.ainvoke(item["query"])
+    return agent.ainvoke(item["query"], RAG_CONTEXT)
+
+async def run_agent(name: str, agent, items: list, passes: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(item: dict):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await agent_call(name, agent, item)
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    for _ in range(passes):
+        await asyncio.gather(*(one(item) for item in items))
+
+    return {
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "latency_ms": {f"p{q}": round(float(np.percentile(latencies, q)) * 1000, 1) for q in (50, 95)} if latencies else None,
+    }
+
+def per_call(usage: dict) -> dict:
+    calls = usage["llm_calls"] or 1
+    return {
+        "llm_calls": usage["llm_calls"],
+        "input_tokens_per_call": round(usage["input_tokens"] / calls, 1),
+        "cached_input_tokens_per_call": round(usage["cached_input_tokens"] / calls, 1),
+        "output_tokens_per_call": round(usage["output_tokens"] / calls, 1),
+    }
+
+def reduction(before: float, after: float):
+    return round(1 - after / before, 4) if before else None
+
+async def evaluate(items: list, passes: int, concurrency: int) -> dict:
+    results = {mode: {} for mode in MODES}
+    for mode in MODES:
+        counters = {}
+        agents = build_agents(mode, lambda name: counters.setdefault(name, UsageCounter()))
+        for name, agent in agents.items():
+            run = await run_agent(name, agent, items, passes, concurrency)
+            results[mode][name] = {**per_call(counters[name].to_dict()), **run}
+
+    results["native_vs_parser"] = {
+        name: {
+            "input_tokens_saved_per_call": round(parser["input_tokens_per_call"] - native["input_tokens_per_call"], 1),
+            "input_tokens_reduction": reduction(parser["input_tokens_per_call"], native["input_tokens_per_call"]),
+            "p50_latency_reduction": reduction(parser["latency_ms"]["p50"], native["latency_ms"]["p50"])
+            if parser["latency_ms"] and native["latency_ms"] else None,
+        }
+        for name, parser, native in ((name, results["parser"][name], results["native"][name]) for name in results["parser"])
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="Labeled query set (JSONL).")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--offline", action="store_true", help="Use the fake chat model instead of the configured LLM.")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    if args.offline:
+        from benchmarks.fakes import install
+        install(latency_ms=50, jitter_ms=20)
+
+    items = load_queries(args.queries, args.limit)
+    results = {"queries": len(items), "passes": args.passes, **asyncio.run(evaluate(items, args.passes, args.concurrency))}
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
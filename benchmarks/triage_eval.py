@@ -0,0 +1,158 @@
+"""
+Compare the fused triage call against the two-agent path (compliance, then
+decision) on a labeled query set: block and route accuracy against the
+labels, agreement between the two paths, latency, LLM calls and tokens.
+
+    python -m benchmarks.triage_eval --output triage_eval.json
+    python -m benchmarks.triage_eval --queries my_queries.jsonl --concurrency 8
+
+Each line of the query set is a JSON object with "query", "user_role",
+"is_safe" and "decision" ("direct", "rag", or null for blocked queries).
+Calls the configured LLM; the local decision router is not used.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.engine.agents.compliance.agent import ComplianceAgent
+from src.engine.agents.compliance.model import ComplianceInput
+from src.engine.agents.decision.agent import DecisionAgent
+from src.engine.agents.triage.agent import TriageAgent
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(__file__), "data", "triage_queries.jsonl")
+
+class UsageCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.cached_input_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0)
+                self.output_tokens += usage.get("output_tokens", 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "llm_calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+def load_queries(path: str, limit: int = None) -> list:
+    with open(path, encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    return items[:limit] if limit else items
+
+def with_counter(agent, counter: UsageCounter):
+    agent.chain = agent.chain.with_config(callbacks=[counter])
+    return agent
+
+async def two_agent(compliance_agent: ComplianceAgent, decision_agent: DecisionAgent, item: dict):
+    compliance_input = ComplianceInput(query=item["query"], user_role=item.get("user_role", "standard"))
+    compliance_result = await compliance_agent.ainvoke(compliance_input)
+    if not compliance_result.is_safe:
+        return False, None
+    decision_result = await decision_agent.ainvoke(compliance_result.sanitized_query or item["query"])
+    return True, decision_result.decision
+
+async def triage(triage_agent: TriageAgent, item: dict):
+    compliance_input = ComplianceInput(query=item["query"], user_role=item.get("user_role", "standard"))
+    compliance_result, decision_result = (await triage_agent.ainvoke(compliance_input)).split()
+    return compliance_result.is_safe, decision_result.decision if decision_result else None
+
+async def run_path(name: str, path, items: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(item):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                is_safe, decision = await path(item)
+                error = None
+            except Exception as e:
+                is_safe, decision, error = None, None, f"{type(e).__name__}: {e}"
+            return {"is_safe": is_safe, "decision": decision, "ms": (time.perf_counter() - started) * 1000, "error": error}
+
+    results = await asyncio.gather(*(one(item) for item in items))
+    failed = sum(1 for r in results if r["error"])
+    if failed:
+        print(f"{name}: {failed} quer{'y' if failed == 1 else 'ies'} failed")
+    return results
+
+def score(items: list, results: list, counter: UsageCounter) -> dict:
+    blocked_true = [not item["is_safe"] for item in items]
+    blocked_pred = [r["is_safe"] is False for r in results]
+    true_positives = sum(t and p for t, p in zip(blocked_true, blocked_pred))
+    routed = [(item, r) for item, r in zip(items, results) if item["is_safe"] and r["is_safe"]]
+    latencies = [r["ms"] for r in results if not r["error"]]
+
+    return {
+        "errors": sum(1 for r in results if r["error"]),
+        "block_accuracy": round(sum(t == p for t, p in zip(blocked_true, blocked_pred)) / len(items), 4),
+        "block_precision": round(true_positives / sum(blocked_pred), 4) if any(blocked_pred) else None,
+        "block_recall": round(true_positives / sum(blocked_true), 4) if any(blocked_true) else None,
+        "route_accuracy": round(sum(item["decision"] == r["decision"] for item, r in routed) / len(routed), 4) if routed else None,
+        "latency_ms": {q: round(float(np.percentile(latencies, int(q[1:]))), 1) for q in ("p50", "p95")} if latencies else None,
+        **counter.to_dict(),
+    }
+
+def disagreements(items: list, baseline: list, triaged: list) -> list:
+    return [
+        {
+            "query": item["query"],
+            "expected": [item["is_safe"], item["decision"]],
+            "two_agent": [a["is_safe"], a["decision"]],
+            "triage": [b["is_safe"], b["decision"]],
+        }
+        for item, a, b in zip(items, baseline, triaged)
+        if (a["is_safe"], a["decision"]) != (b["is_safe"], b["decision"])
+    ]
+
+async def evaluate(items: list, concurrency: int) -> dict:
+    baseline_counter, triage_counter = UsageCounter(), UsageCounter()
+    compliance_agent = with_counter(ComplianceAgent(), baseline_counter)
+    decision_agent = with_counter(DecisionAgent(), baseline_counter)
+    triage_agent = with_counter(TriageAgent(ComplianceAgent()), triage_counter)
+
+    baseline = await run_path("two_agent", lambda item: two_agent(compliance_agent, decision_agent, item), items, concurrency)
+    triaged = await run_path("triage", lambda item: triage(triage_agent, item), items, concurrency)
+
+    differing = disagreements(items, baseline, triaged)
+    return {
+        "queries": len(items),
+        "two_agent": score(items, baseline, baseline_counter),
+        "triage": score(items, triaged, triage_counter),
+        "agreement": round(1 - len(differing) / len(items), 4),
+        "disagreements": differing,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="Labeled query set (JSONL).")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(evaluate(load_queries(args.queries, args.limit), args.concurrency))
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compare search latency of the local in-process vector index against Qdrant,
+through the same adapter call the retriever uses (search_batch).
+
+    python -m benchmarks.vector_store --points 50000 --output vector_store_bench.json
+    python -m benchmarks.vector_store --qdrant-url http://localhost:6333
+
+Vectors are synthetic clustered 384-d embeddings. Recall@k is measured against
+an exact float32 search. Without --qdrant-url (or QDRANT_URL), Qdrant runs in
+its embedded local mode, which is not representative of a server. With a
+server, the REST and gRPC transports are both measured.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.adapters.local_vector_store import LocalIndex
+from src.adapters.vector_store import CONTENT_KEY, METADATA_KEY, search_batch
+
+DIM = 384
+COLLECTION = "benchmark_vectors"
+
+def make_vectors(points: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, points // 200), DIM)).astype(np.float32)
+    corpus = centers[rng.integers(0, len(centers), points)] + 0.6 * rng.normal(size=(points, DIM)).astype(np.float32)
+    probes = centers[rng.integers(0, len(centers), queries)] + 0.6 * rng.normal(size=(queries, DIM)).astype(np.float32)
+    return corpus, probes
+
+def exact_top_k(corpus: np.ndarray, probes: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    probes = probes / np.linalg.norm(probes, axis=1, keepdims=True)
+    return np.argsort(-(probes @ corpus.T), axis=1)[:, :k]
+
+def payloads(start: int, end: int):
+    return [{CONTENT_KEY: f"chunk {i}", METADATA_KEY: {"source": f"doc{i % 100}.txt", "row": i}} for i in range(start, end)]
+
+def measure(client, collection: str, probes: np.ndarray, truth: np.ndarray, k: int, batch: int, **search_options) -> dict:
+    search_batch(client, collection, probes[:1].tolist(), k, **search_options)
+
+    latencies, recalls = [], []
+    for probe, expected in zip(probes, truth):
+        started = time.perf_counter()
+        hits = search_batch(client, collection, [probe.tolist()], k, **search_options)[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {doc.metadata["row"] for doc, _ in hits}
+        recalls.append(len(found & set(expected.tolist())) / k)
+
+    batch_latencies = []
+    for start in range(0, len(probes) - batch + 1, batch):
+        started = time.perf_counter()
+        search_batch(client, collection, probes[start:start + batch].tolist(), k, **search_options)
+        batch_latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "query_latency_ms": {q: round(float(np.percentile(latencies, int(q[1:]))), 3) for q in ("p50", "p95", "p99")},
+        f"batch{batch}_latency_ms_p50": round(float(np.percentile(batch_latencies, 50)), 3) if batch_latencies else None,
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+    }
+
+def directory_mb(path: str) -> float:
+    total = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    return round(total / 1e6, 1)
+
+def bench_local(corpus, probes, truth, k, batch, dtype, approximate, nprobe) -> dict:
+    path = tempfile.mkdtemp(prefix="local-index-")
+    try:
+        index = LocalIndex(path, dim=DIM, dtype=dtype)
+        for start in range(0, len(corpus), 10000):
+            end = min(start + 10000, len(corpus))
+            index.upsert(list(range(start, end)), corpus[start:end], payloads(start, end))
+        index.close()
+
+        started = time.perf_counter()
+        index = LocalIndex(path, dim=DIM, dtype=dtype, approximate=approximate, nprobe=nprobe)
+        open_seconds = time.perf_counter() - started
+        result = {"open_seconds": round(open_seconds, 4), "disk_mb": directory_mb(path)}
+        result.update(measure(index, COLLECTION, probes, truth, k, batch))
+        index.close()
+        return result
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def bench_qdrant(url, corpus, probes, truth, k, batch, prefer_grpc: bool = False) -> dict:
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+    client = QdrantClient(url=url, api_key=os.getenv("QDRANT_API_KEY") or None, prefer_grpc=prefer_grpc) if url else QdrantClient(":memory:")
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+    for start in range(0, len(corpus), 1000):
+        end = min(start + 1000, len(corpus))
+        client.upsert(COLLECTION, points=[
+            PointStruct(id=i, vector=corpus[i].tolist(), payload=payload)
+            for i, payload in zip(range(start, end), payloads(start, end))
+        ], wait=True)
+    try:
+        return {"mode": "server" if url else "embedded", **measure(client, COLLECTION, probes, truth, k, batch)}
+    finally:
+        client.delete_collection(COLLECTION)
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=4, help="Queries per batched search (one per search term).")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--qdrant-url", default=os.getenv("QDRANT_URL"))
+    parser.add_argument("--skip-qdrant", action="store_true")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    corpus, probes = make_vectors(args.points, args.queries)
+    truth = exact_top_k(corpus, probes, args.k)
+
+    results = {"points": args.points, "queries": args.queries, "k": args.k, "backends": {}}
+    for dtype in ("float16", "int8"):
+        for approximate in (False, True):
+            name = f"local-{dtype}-{'approximate' if approximate else 'exact'}"
+            results["backends"][name] = bench_local(corpus, probes, truth, args.k, args.batch, dtype, approximate, args.nprobe)
+    if not args.skip_qdrant:
+        results["backends"]["qdrant"] = bench_qdrant(args.qdrant_url, corpus, probes, truth, args.k, args.batch)
+        if args.qdrant_url:
+            results["backends"]["qdrant-grpc"] = bench_qdrant(args.qdrant_url, corpus, probes, truth, args.k, args.batch, prefer_grpc=True)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+import fcntl
+import json
+import os
+import threading
+import uuid
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.logger import logger
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Rows scored per NumPy block, to bound the float32 copy of a float16/int8 matrix.
+BLOCK_ROWS = 8192
+# Below this many rows the approximate index is not worth building; search stays exact.
+APPROXIMATE_MIN_ROWS = 10000
+KMEANS_ITERATIONS = 10
+# Compaction waits for at least this many dead rows, however high their fraction.
+COMPACT_MIN_DEAD_ROWS = 1024
+# Log records replayed since the last snapshot after which a writer saves a new one.
+SNAPSHOT_RECORDS = 50000
+# Files of one generation; generation 0 uses the bare names, later ones insert the number (vectors.3.bin).
+GENERATION_FILES = ("vectors.bin", "scales.bin", "payloads.jsonl", "records.jsonl", "snapshot.npz")
+
+class LocalPoint(NamedTuple):
+    """Search hit with the same attributes as a Qdrant ScoredPoint."""
+    id: Any
+    score: float
+    payload: Dict[str, Any]
+    vector: Optional[List[float]]
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class _View(NamedTuple):
+    """What a search reads, taken under the lock so a concurrent compaction cannot change it midway."""
+    generation: int
+    count: int
+    vectors: np.ndarray
+    scales: np.ndarray
+    alive: np.ndarray
+    ids: List[Any]
+    offsets: List[Tuple[int, int]]
+    payloads: Any
+
+class LocalIndex:
+    """
+    In-process cosine index stored in one directory:
+    - vectors.bin: memory-mapped matrix (float32, float16 or int8 with a per-row scale in scales.bin)
+    - payloads.jsonl: one JSON payload per row, read on demand
+    - records.jsonl: append-only log of id -> row assignments and deletions
+    - snapshot.npz: the id -> row map as of an offset of the log
+
+    Opening loads the snapshot and replays the log after it, so startup does
+    not touch the vectors. Writes from another process are picked up on the
+    next search by replaying the new tail of the log. Writers take an
+    exclusive file lock.
+
+    Re-upserts and deletions leave dead rows behind. Once they exceed
+    `compact_dead_fraction` of the rows, the writer copies the live rows into
+    the files of a new generation (vectors.<n>.bin, ...) and switches meta.json
+    to it; other processes follow on their next replay.
+    """
+    def __init__(
+        self,
+        path: str,
+        dim: int = 384,
+        dtype: str = "float16",
+        approximate: bool = False,
+        nprobe: int = 8,
+        compact_dead_fraction: float = 0.3,
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Use one of: {', '.join(DTYPES)}.")
+        self.path = path
+        self.approximate = approximate
+        self.nprobe = nprobe
+        self.compact_dead_fraction = compact_dead_fraction
+        self._lock = threading.RLock()
+        self._ivf_lock = threading.Lock()
+        self._payloads = None
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            meta = self._read_meta()
+            if meta["dtype"] != dtype:
+                logger.warning(f"Local index {path} is stored as {meta['dtype']}; ignoring requested dtype {dtype}.")
+        else:
+            self._write_meta({"dim": dim, "dtype": dtype, "capacity": 0, "generation": 0})
+        self._load()
+
+        if self._records_since_snapshot >= SNAPSHOT_RECORDS:
+            with self._lock, self._write_locked():
+                self._replay()
+                self._write_snapshot()
+        logger.info(f"Opened local vector index {path}: {self.points_count} vectors ({self.dtype}).")
+
+    @property
+    def points_count(self) -> int:
+        return int(self._alive.sum())
+
+    @property
+    def count(self) -> int:
+        return len(self._ids)
+
+    # Storage
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        if generation and name in GENERATION_FILES:
+            stem, extension = os.path.splitext(name)
+            name = f"{stem}.{generation}{extension}"
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> Dict[str, Any]:
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def _load(self):
+        """(Re)open the current generation: snapshot first, then the log after it."""
+        meta = self._read_meta()
+        self.dim = meta["dim"]
+        self.dtype = meta["dtype"]
+        self.generation = meta.get("generation", 0)
+        for name in ("records.jsonl", "payloads.jsonl"):
+            open(self._file(name), "ab").close()
+        self._map(meta["capacity"])
+        # Searches in flight keep the previous file object (and its rows) alive until they finish.
+        self._payloads = open(self._file("payloads.jsonl"), "rb")
+
+        self._ids: List[Any] = []
+        self._id_to_row: Dict[Any, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._offsets: List[Tuple[int, int]] = []
+        self._records_read = 0
+        self._records_since_snapshot = 0
+        self._ivf = None
+        self._load_snapshot()
+        self._replay()
+
+    def _map(self, capacity: int):
+        self._capacity = capacity
+        if capacity == 0:
+            self._vectors = np.zeros((0, self.dim), dtype=DTYPES[self.dtype])
+            self._scales = np.zeros(0, dtype=np.float32)
+            return
+        self._vectors = np.memmap(self._file("vectors.bin"), dtype=DTYPES[self.dtype], mode="r+", shape=(capacity, self.dim))
+        self._scales = np.memmap(self._file("scales.bin"), dtype=np.float32, mode="r+", shape=(capacity,))
+
+    def _allocate(self, capacity: int, generation: int):
+        itemsize = np.dtype(DTYPES[self.dtype]).itemsize
+        for name, size in (("vectors.bin", capacity * self.dim * itemsize), ("scales.bin", capacity * 4)):
+            with open(self._file(name, generation), "ab") as f:
+                f.truncate(size)
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2, 1024)
+        self._allocate(capacity, self.generation)
+        self._write_meta({"dim": self.dim, "dtype": self.dtype, "capacity": capacity, "generation": self.generation})
+        self._map(capacity)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return vectors.astype(DTYPES[self.dtype]), np.ones(len(vectors), dtype=np.float32)
+
+    @staticmethod
+    def _decode(view: _View, row: int) -> List[float]:
+        return (view.vectors[row].astype(np.float32) * view.scales[row]).tolist()
+
+    @staticmethod
+    def _payload(view: _View, row: int) -> Dict[str, Any]:
+        offset, length = view.offsets[row]
+        return json.loads(os.pread(view.payloads.fileno(), length, offset))
+
+    # Record log and snapshot
+
+    def _replay(self):
+        """Apply records appended since the last replay (by this or another process)."""
+        try:
+            with open(self._file("records.jsonl"), "rb") as f:
+                f.seek(self._records_read)
+                data = f.read()
+        except FileNotFoundError:
+            # Another process compacted the index and removed this generation.
+            self._load()
+            return
+
+        end = data.rfind(b"\n") + 1
+        if end:
+            lines = data[:end].splitlines()
+            for line in lines:
+                self._apply(json.loads(line))
+            self._records_read += end
+            self._records_since_snapshot += len(lines)
+
+        meta = self._read_meta()
+        if meta.get("generation", 0) != self.generation:
+            self._load()
+        elif meta["capacity"] != self._capacity:
+            self._map(meta["capacity"])
+
+    def _apply(self, record: Dict[str, Any]):
+        point_id = record["id"]
+        old_row = self._id_to_row.pop(point_id, None)
+        if old_row is not None:
+            self._alive[old_row] = False
+        if record.get("deleted"):
+            return
+
+        row = record["row"]
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._offsets.append((0, 0))
+        if len(self._alive) < len(self._ids):
+            self._alive = np.concatenate([self._alive, np.zeros(max(len(self._ids), 2 * len(self._alive)) - len(self._alive), dtype=bool)])
+        self._ids[row] = point_id
+        self._offsets[row] = (record["offset"], record["length"])
+        self._alive[row] = True
+        self._id_to_row[point_id] = row
+
+    def _append_records(self, records: List[Dict[str, Any]]):
+        with open(self._file("records.jsonl"), "ab") as f:
+            f.write(b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _load_snapshot(self):
+        path = self._file("snapshot.npz")
+        if not os.path.exists(path):
+            return
+        with np.load(path) as snapshot:
+            self._ids = json.loads(snapshot["ids"].tobytes())
+            self._offsets = [tuple(pair) for pair in snapshot["offsets"].tolist()]
+            self._alive = snapshot["alive"].copy()
+            self._records_read = int(snapshot["records_read"])
+        self._id_to_row = {point_id: row for row, point_id in enumerate(self._ids) if self._alive[row]}
+
+    def _write_snapshot(self, generation: Optional[int] = None, ids=None, offsets=None, alive=None, records_read: Optional[int] = None):
+        """Save the id -> row map; the current state unless a new generation's is given. The caller holds the write lock."""
+        if generation is None:
+            generation, ids, offsets, alive, records_read = self.generation, self._ids, self._offsets, self._alive[:self.count], self._records_read
+        path = self._file("snapshot.npz", generation)
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(
+                f,
+                ids=np.frombuffer(json.dumps(ids).encode("utf-8"), dtype=np.uint8),
+                offsets=np.asarray(offsets, dtype=np.int64).reshape(-1, 2),
+                alive=np.asarray(alive, dtype=bool),
+                records_read=np.int64(records_read),
+            )
+        os.replace(f"{path}.tmp", path)
+        if generation == self.generation:
+            self._records_since_snapshot = 0
+
+    def _write_locked(self):
+        """Exclusive lock across processes; the caller holds self._lock."""
+        lock_file = open(os.path.join(self.path, ".lock"), "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def point_ids(self) -> List[Any]:
+        with self._lock:
+            self._replay()
+            return list(self._id_to_row)
+
+    def refresh(self):
+        with self._lock:
+            try:
+                changed = os.path.getsize(self._file("records.jsonl")) != self._records_read
+            except FileNotFoundError:
+                changed = True
+            if changed:
+                self._replay()
+
+    # Writes
+
+    def upsert(self, ids: List[Any], vectors: List[List[float]], payloads: List[Dict[str, Any]]):
+        if not ids:
+            return
+        ids = [str(point_id) if isinstance(point_id, uuid.UUID) else point_id for point_id in ids]
+        encoded, scales = self._encode(_normalize(vectors))
+
+        with self._lock, self._write_locked():
+            self._replay()
+            start = self.count
+            self._ensure_capacity(start + len(ids))
+            self._vectors[start:start + len(ids)] = encoded
+            self._scales[start:start + len(ids)] = scales
+            self._vectors.flush()
+            self._scales.flush()
+
+            lines = [json.dumps(payload).encode("utf-8") + b"\n" for payload in payloads]
+            with open(self._file("payloads.jsonl"), "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+            records = []
+            for row, (point_id, line) in enumerate(zip(ids, lines), start=start):
+                records.append({"id": point_id, "row": row, "offset": offset, "length": len(line)})
+                offset += len(line)
+            # The record log is the commit point: rows written above are invisible until it is appended.
+            self._append_records(records)
+            self._replay()
+            self._maintain()
+
+    def delete(self, ids: Iterable[Any]):
+        with self._lock, self._write_locked():
+            self._replay()
+            records = [{"id": point_id, "deleted": True} for point_id in ids if point_id in self._id_to_row]
+            if records:
+                self._append_records(records)
+                self._replay()
+                self._maintain()
+
+    def _maintain(self):
+        """Compact or snapshot after a write; the caller holds the write lock."""
+        dead = self.count - self.points_count
+        if dead >= COMPACT_MIN_DEAD_ROWS and dead > self.compact_dead_fraction * self.count:
+            self._compact()
+        elif self._records_since_snapshot >= SNAPSHOT_RECORDS:
+            self._write_snapshot()
+
+    def _compact(self):
+        """Copy the live rows into a new generation and switch meta.json to it; the caller holds the write lock."""
+        count = self.count
+        live = np.flatnonzero(self._alive[:count])
+        old_generation, generation = self.generation, self.generation + 1
+        capacity = max(len(live), 1024)
+        self._allocate(capacity, generation)
+
+        vectors = np.memmap(self._file("vectors.bin", generation), dtype=DTYPES[self.dtype], mode="r+", shape=(capacity, self.dim))
+        scales = np.memmap(self._file("scales.bin", generation), dtype=np.float32, mode="r+", shape=(capacity,))
+        for start in range(0, len(live), BLOCK_ROWS):
+            rows = live[start:start + BLOCK_ROWS]
+            vectors[start:start + len(rows)] = self._vectors[rows]
+            scales[start:start + len(rows)] = self._scales[rows]
+        vectors.flush()
+        scales.flush()
+        del vectors, scales
+
+        offsets, position = [], 0
+        with open(self._file("payloads.jsonl", generation), "wb") as f:
+            for row in live:
+                offset, length = self._offsets[row]
+                f.write(os.pread(self._payloads.fileno(), length, offset))
+                offsets.append((position, length))
+                position += length
+            f.flush()
+            os.fsync(f.fileno())
+        open(self._file("records.jsonl", generation), "wb").close()
+        self._write_snapshot(generation, [self._ids[row] for row in live], offsets, np.ones(len(live), dtype=bool), 0)
+
+        # meta.json is the commit point; readers of the old generation reload once they see it.
+        self._write_meta({"dim": self.dim, "dtype": self.dtype, "capacity": capacity, "generation": generation})
+        for name in GENERATION_FILES:
+            try:
+                os.remove(self._file(name, old_generation))
+            except FileNotFoundError:
+                pass
+        self._load()
+        logger.info(f"Compacted local vector index {self.path}: {count} rows -> {len(live)} (generation {generation}).")
+
+    # Search
+
+    def _view(self) -> _View:
+        count = self.count
+        return _View(self.generation, count, self._vectors, self._scales, self._alive[:count], self._ids, self._offsets, self._payloads)
+
+    def search_batch(self, vectors: List[List[float]], k: int, with_vectors: bool = False) -> List[List[LocalPoint]]:
+        if not len(vectors):
+            return []
+        self.refresh()
+        queries = _normalize(vectors)
+
+        with self._lock:
+            view = self._view()
+        if view.count == 0:
+            return [[] for _ in range(len(queries))]
+
+        ivf = self._approximate_index(view) if self.approximate else None
+        if ivf is None:
+            scores = self._score_all(view, queries)
+            return [self._top_k(view, scores[i], None, k, with_vectors) for i in range(len(queries))]
+
+        results = []
+        for query, candidates in zip(queries, self._probe(ivf, queries, view.count)):
+            candidates = candidates[view.alive[candidates]]
+            block = view.vectors[candidates].astype(np.float32) @ query * view.scales[candidates]
+            results.append(self._top_k(view, block, candidates, k, with_vectors))
+        return results
+
+    @staticmethod
+    def _score_all(view: _View, queries: np.ndarray) -> np.ndarray:
+        scores = np.empty((len(queries), view.count), dtype=np.float32)
+        for start in range(0, view.count, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, view.count)
+            block = view.vectors[start:end].astype(np.float32)
+            scores[:, start:end] = (queries @ block.T) * view.scales[start:end]
+        scores[:, ~view.alive] = -np.inf
+        return scores
+
+    def _top_k(self, view: _View, scores: np.ndarray, rows: Optional[np.ndarray], k: int, with_vectors: bool) -> List[LocalPoint]:
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        hits = []
+        for position in top:
+            if not np.isfinite(scores[position]):
+                continue
+            row = int(position if rows is None else rows[position])
+            hits.append(LocalPoint(
+                id=view.ids[row],
+                score=float(scores[position]),
+                payload=self._payload(view, row),
+                vector=self._decode(view, row) if with_vectors else None,
+            ))
+        return hits
+
+    # Approximate search: spherical k-means inverted lists, probed per query.
+
+    def _approximate_index(self, view: _View) -> Optional[Dict[str, Any]]:
+        if view.count < APPROXIMATE_MIN_ROWS:
+            return None
+        ivf = self._ivf
+        current = ivf if ivf is not None and ivf["generation"] == view.generation else None
+        if current is not None and view.count <= current["built_count"] * 1.2:
+            return current
+
+        # Built without holding self._lock, so writers are not blocked meanwhile; one build
+        # at a time, and concurrent searches keep using the previous lists (or exact search).
+        if not self._ivf_lock.acquire(blocking=False):
+            return current
+        try:
+            ivf = self._build_ivf(view)
+            with self._lock:
+                if self.generation == view.generation:
+                    self._ivf = ivf
+            return ivf
+        finally:
+            self._ivf_lock.release()
+
+    def _build_ivf(self, view: _View) -> Dict[str, Any]:
+        count = view.count
+        rng = np.random.default_rng(0)
+        lists = max(1, int(np.sqrt(count)))
+        sample_rows = np.sort(rng.choice(count, size=min(count, lists * 64), replace=False))
+        sample = _normalize(view.vectors[sample_rows].astype(np.float32) * view.scales[sample_rows, None])
+        centroids = sample[rng.choice(len(sample), size=lists, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(lists):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        assignment = np.empty(count, dtype=np.int32)
+        for start in range(0, count, BLOCK_ROWS):
+            end = min(start + BLOCK_ROWS, count)
+            assignment[start:end] = np.argmax(view.vectors[start:end].astype(np.float32) @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(lists + 1))
+        logger.info(f"Built approximate index for {self.path}: {count} vectors in {lists} lists.")
+        return {"centroids": centroids, "order": order, "bounds": bounds, "built_count": count, "generation": view.generation}
+
+    def _probe(self, ivf: Dict[str, Any], queries: np.ndarray, count: int) -> List[np.ndarray]:
+        """Candidate rows per query: its nprobe closest lists plus rows added after the build."""
+        nprobe = min(self.nprobe, len(ivf["centroids"]))
+        closest = np.argsort(-(queries @ ivf["centroids"].T), axis=1)[:, :nprobe]
+        tail = np.arange(ivf["built_count"], count)
+        order, bounds = ivf["order"], ivf["bounds"]
+        return [
+            np.concatenate([order[bounds[cluster]:bounds[cluster + 1]] for cluster in clusters] + [tail])
+            for clusters in closest
+        ]
+
+    def close(self):
+        self._payloads.close()
+
+_indexes: Dict[str, LocalIndex] = {}
+_indexes_lock = threading.Lock()
+
+def open_index(path: str, **kwargs) -> LocalIndex:
+    """One shared LocalIndex per directory, so ingestion and retrieval see the same state."""
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = LocalIndex(path, **kwargs)
+        return _indexes[path]
+
+class LocalVectorStore(VectorStore):
+    """LangChain VectorStore over a LocalIndex, mirroring the QdrantVectorStore calls the app uses."""
+    def __init__(self, client: LocalIndex, collection_name: str, embedding: Embeddings):
+        self.client = client
+        self.collection_name = collection_name
+        self.embedding = embedding
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        from src.adapters.vector_store import CONTENT_KEY, METADATA_KEY
+
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = self.embedding.embed_documents(texts)
+        self.client.upsert(ids, vectors, [{CONTENT_KEY: text, METADATA_KEY: metadata} for text, metadata in zip(texts, metadatas)])
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> bool:
+        self.client.delete(ids or [])
+        return True
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        from src.adapters.vector_store import point_to_document
+
+        return [(point_to_document(hit, self.collection_name), hit.score) for hit in self.client.search_batch([embedding], k)[0]]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None, *, path: str, collection_name: str = "documents", **kwargs):
+        store = cls(open_index(path), collection_name, embedding)
+        store.add_texts(texts, metadatas, ids=kwargs.get("ids"))
+        return store
@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.models import (
+    CollectionStatus,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    HnswConfigDiff,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from src.adapters.qdrant_registry import awith_retries, create_payload_indexes, get_client, with_retries
+from src.config import (
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_SEARCH_HNSW_EF,
+    QDRANT_QUANTIZATION_OVERSAMPLING,
+    QDRANT_MIGRATION_WAIT_SECONDS,
+    QDRANT_TIMEOUT_SECONDS,
+)
+from src.logger import logger
+
+class CollectionProfile(NamedTuple):
+    """How a Qdrant collection stores, indexes and searches its vectors."""
+    name: str
+    on_disk: bool = False
+    quantized: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_ef: Optional[int] = None
+    oversampling: Optional[float] = None
+    payload_indexes: Tuple[Tuple[str, PayloadSchemaType], ...] = ()
+
+    def create_options(self, size: int, distance: Distance) -> dict:
+        """Keyword arguments for `create_collection`."""
+        options = {"vectors_config": VectorParams(size=size, distance=distance, on_disk=self.on_disk or None)}
+        if self.hnsw_m or self.hnsw_ef_construct:
+            options["hnsw_config"] = HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+        if self.quantized:
+            # The int8 copy always stays in RAM; only the float32 originals follow `on_disk`.
+            options["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        return options
+
+    def search_params(self) -> Optional[SearchParams]:
+        """Per-query parameters: HNSW beam width, and rescoring of the quantized candidates."""
+        if not self.quantized and not self.hnsw_ef:
+            return None
+        quantization = QuantizationSearchParams(rescore=True, oversampling=self.oversampling) if self.quantized else None
+        return SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+SOURCE_INDEX = (("metadata.source", PayloadSchemaType.KEYWORD),)
+
+PROFILES: Dict[str, CollectionProfile] = {
+    "default": CollectionProfile("default"),
+    "quantized": CollectionProfile(
+        "quantized",
+        quantized=True,
+        hnsw_m=QDRANT_HNSW_M,
+        hnsw_ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+        hnsw_ef=QDRANT_SEARCH_HNSW_EF,
+        oversampling=QDRANT_QUANTIZATION_OVERSAMPLING,
+        payload_indexes=SOURCE_INDEX,
+    ),
+    "quantized_disk": CollectionProfile(
+        "quantized_disk",
+        on_disk=True,
+        quantized=True,
+        hnsw_m=QDRANT_HNSW_M,
+        hnsw_ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+        hnsw_ef=QDRANT_SEARCH_HNSW_EF,
+        oversampling=QDRANT_QUANTIZATION_OVERSAMPLING,
+        payload_indexes=SOURCE_INDEX,
+    ),
+}
+
+def get_profile(name: str) -> CollectionProfile:
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}'. Expected one of {tuple(PROFILES)}.")
+    return PROFILES[name]
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """The collection `alias` points to, or None when it is not an alias."""
+    for description in with_retries(client.get_aliases).aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+def wait_until_green(client: QdrantClient, collection_name: str, timeout: float = 600.0, interval: float = 1.0):
+    """Wait until the optimizer has finished indexing and quantizing the collection."""
+    deadline = time.monotonic() + timeout
+    while with_retries(client.get_collection, collection_name).status != CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Collection '{collection_name}' was not indexed within {timeout:.0f}s.")
+        time.sleep(interval)
+
+def migration_marker(alias: str) -> str:
+    """Collection whose existence tells ingestion into `alias` to pause."""
+    return f"{alias}__migrating"
+
+def wait_while_migrating(client: QdrantClient, collection_name: str, timeout: float = QDRANT_MIGRATION_WAIT_SECONDS, interval: float = 0.5):
+    """Block an ingestion write while `migrate` holds the pause for `collection_name`."""
+    marker = migration_marker(collection_name)
+    if not with_retries(client.collection_exists, marker):
+        return
+    logger.info(f"'{collection_name}' is being migrated. Waiting to write...")
+    deadline = time.monotonic() + timeout
+    while with_retries(client.collection_exists, marker):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Migration of '{collection_name}' still pauses ingestion after {timeout:.0f}s.")
+        time.sleep(interval)
+
+def wait_for_switch(client: QdrantClient, collection_name: str, timeout: float = QDRANT_TIMEOUT_SECONDS, interval: float = 0.1) -> bool:
+    """
+    Let a failed read wait out the moment `migrate` swaps a plain collection for an alias,
+    when `collection_name` does not exist. True when the read should be retried.
+    """
+    marker = migration_marker(collection_name)
+    if with_retries(client.collection_exists, collection_name) or not with_retries(client.collection_exists, marker):
+        return False
+    deadline = time.monotonic() + timeout
+    while not with_retries(client.collection_exists, collection_name):
+        if time.monotonic() > deadline or not with_retries(client.collection_exists, marker):
+            return False
+        time.sleep(interval)
+    return True
+
+async def await_for_switch(client: AsyncQdrantClient, collection_name: str, timeout: float = QDRANT_TIMEOUT_SECONDS, interval: float = 0.1) -> bool:
+    """Async `wait_for_switch`."""
+    marker = migration_marker(collection_name)
+    if await awith_retries(client.collection_exists, collection_name) or not await awith_retries(client.collection_exists, marker):
+        return False
+    deadline = time.monotonic() + timeout
+    while not await awith_retries(client.collection_exists, collection_name):
+        if time.monotonic() > deadline or not await awith_retries(client.collection_exists, marker):
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+class _Fingerprint(NamedTuple):
+    payload: str
+    sketch: np.ndarray
+
+    def matches(self, other: Optional["_Fingerprint"]) -> bool:
+        # Qdrant renormalizes cosine vectors on every write, so a copied vector
+        # differs from its source in the last bits; compare the sketch loosely.
+        return other is not None and self.payload == other.payload and np.allclose(self.sketch, other.sketch, atol=1e-4)
+
+def _fingerprints(client: QdrantClient, collection_name: str, batch_size: int, dim: int) -> Dict:
+    """Point id -> hash of its payload and 8 fixed random projections of its vector."""
+    projection = np.random.default_rng(0).normal(size=(dim, 8)).astype(np.float32)
+    fingerprints, offset = {}, None
+    while True:
+        records, offset = with_retries(
+            client.scroll, collection_name=collection_name, limit=batch_size, offset=offset, with_payload=True, with_vectors=True
+        )
+        for record in records:
+            payload = hashlib.sha1(json.dumps(record.payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+            fingerprints[record.id] = _Fingerprint(payload, np.asarray(record.vector, dtype=np.float32) @ projection)
+        if offset is None:
+            return fingerprints
+
+def _copy_points(client: QdrantClient, source: str, target: str, batch_size: int, ids: Optional[List] = None) -> int:
+    """Copy points (payloads and vectors) from `source` to `target`: all of them, or only `ids`."""
+    copied, offset = 0, None
+    while True:
+        if ids is None:
+            records, offset = with_retries(
+                client.scroll, collection_name=source, limit=batch_size, offset=offset, with_payload=True, with_vectors=True
+            )
+        else:
+            chunk, ids = ids[:batch_size], ids[batch_size:]
+            records = with_retries(client.retrieve, collection_name=source, ids=chunk, with_payload=True, with_vectors=True) if chunk else []
+        if records:
+            points = [PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records]
+            # Ids are copied as they are, so a retried batch overwrites instead of duplicating.
+            with_retries(client.upsert, collection_name=target, points=points, wait=True)
+            copied += len(points)
+        if (ids is None and offset is None) or (ids is not None and not ids):
+            return copied
+
+def _catch_up(client: QdrantClient, source: str, target: str, batch_size: int, dim: int, max_rounds: int) -> Tuple[int, int, bool]:
+    """
+    Copy points added or changed in `source` since they were copied and delete
+    points removed from it, until both collections hold the same ids, payloads
+    and vectors or `max_rounds` passes are done. Returns (copied, removed, in_sync).
+    """
+    copied = removed = 0
+    for _ in range(max_rounds):
+        source_points, target_points = _fingerprints(client, source, batch_size, dim), _fingerprints(client, target, batch_size, dim)
+        changed = [point_id for point_id, fingerprint in source_points.items() if not fingerprint.matches(target_points.get(point_id))]
+        stale = [point_id for point_id in target_points if point_id not in source_points]
+        if not changed and not stale:
+            return copied, removed, True
+        copied += _copy_points(client, source, target, batch_size, ids=changed)
+        if stale:
+            with_retries(client.delete, collection_name=target, points_selector=PointIdsList(points=stale), wait=True)
+            removed += len(stale)
+    return copied, removed, False
+
+def _restore_collection(client: QdrantClient, name: str, info, source: str, batch_size: int):
+    """Recreate `name` as a plain collection with the settings in `info` and copy the points of `source` into it."""
+    config = info.config
+    with_retries(
+        client.create_collection,
+        collection_name=name,
+        vectors_config=config.params.vectors,
+        hnsw_config=HnswConfigDiff(**config.hnsw_config.model_dump()),
+        quantization_config=config.quantization_config,
+    )
+    for field_name, schema in (info.payload_schema or {}).items():
+        with_retries(client.create_payload_index, collection_name=name, field_name=field_name, field_schema=schema.data_type, wait=True)
+    _copy_points(client, source, name, batch_size)
+
+def migrate(
+    client: QdrantClient,
+    alias: str,
+    profile: CollectionProfile,
+    batch_size: int = 256,
+    drop_old: bool = False,
+    max_rounds: int = 5,
+    settle_seconds: float = 2.0,
+) -> dict:
+    """
+    Rebuild the collection served under `alias` with `profile`, then switch `alias` to it:
+    1. Create `<alias>_<profile>_<timestamp>` and copy every point into it
+    2. Wait until Qdrant has built its index, then catch up with points written,
+       changed or deleted in the old collection meanwhile, for up to `max_rounds` passes
+    3. Pause ingestion into `alias` (see `wait_while_migrating`), wait `settle_seconds`
+       for writes already in flight, and catch up until nothing differs
+    4. Point `alias` at the new collection and lift the pause
+
+    Readers keep using `alias` throughout and ingestion waits only during steps 3-4.
+    If `alias` is still a plain collection it is deleted right before the alias takes
+    its name, since Qdrant does not let an alias shadow a collection nor delete a
+    collection in an alias operation; reads missing it then retry once the alias
+    exists (see `wait_for_switch`). Should creating the alias fail, `alias` is
+    rebuilt as a plain collection from the new one before the pause is lifted.
+    """
+    started = time.perf_counter()
+    source = resolve_alias(client, alias)
+    is_alias = source is not None
+    source = source or alias
+    if not with_retries(client.collection_exists, source):
+        raise ValueError(f"Collection '{alias}' does not exist.")
+
+    info = with_retries(client.get_collection, source)
+    vectors = info.config.params.vectors
+    if not isinstance(vectors, VectorParams):
+        raise ValueError(f"Collection '{source}' uses named vectors, which migration does not support.")
+
+    target = f"{alias}_{profile.name}_{int(time.time())}"
+    logger.info(f"Migrating '{alias}' ({source}) to profile '{profile.name}' as '{target}'...")
+    with_retries(client.create_collection, collection_name=target, **profile.create_options(vectors.size, vectors.distance))
+    create_payload_indexes(client, target, profile)
+
+    copied = _copy_points(client, source, target, batch_size)
+    wait_until_green(client, target)
+    added, removed, _ = _catch_up(client, source, target, batch_size, vectors.size, max_rounds)
+
+    marker = migration_marker(alias)
+    with_retries(client.create_collection, collection_name=marker, vectors_config=VectorParams(size=1, distance=Distance.DOT))
+    try:
+        logger.info(f"Ingestion into '{alias}' paused for the switch.")
+        time.sleep(settle_seconds)
+        paused_added, paused_removed, in_sync = _catch_up(client, source, target, batch_size, vectors.size, max_rounds)
+        if not in_sync:
+            raise RuntimeError(f"'{source}' kept changing while ingestion was paused; '{alias}' was not switched.")
+        added, removed = added + paused_added, removed + paused_removed
+
+        if is_alias:
+            operations = [
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)),
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias)),
+            ]
+            with_retries(client.update_collection_aliases, change_aliases_operations=operations)
+        else:
+            # The paused catch-up left the source identical to the target, so it can be rebuilt from it.
+            with_retries(client.delete_collection, alias)
+            try:
+                with_retries(
+                    client.update_collection_aliases,
+                    change_aliases_operations=[CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))],
+                )
+            except Exception as e:
+                logger.error(f"Creating alias '{alias}' failed: {e}. Restoring '{alias}' from '{target}'...")
+                _restore_collection(client, alias, info, target, batch_size)
+                raise RuntimeError(f"Switching '{alias}' to '{target}' failed; '{alias}' was restored as a plain collection.") from e
+        logger.info(f"Alias '{alias}' now points to '{target}'.")
+    finally:
+        with_retries(client.delete_collection, marker)
+
+    if is_alias and drop_old:
+        with_retries(client.delete_collection, source)
+        logger.info(f"Deleted previous collection '{source}'.")
+
+    return {
+        "alias": alias,
+        "source": source,
+        "target": target,
+        "profile": profile.name,
+        "points_copied": copied + added,
+        "points_caught_up": added,
+        "points_removed": removed,
+        "source_dropped": drop_old or not is_alias,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild a Qdrant collection with another profile and switch its alias to it.")
+    parser.add_argument("--collection", default="documents", help="Collection or alias name the application uses.")
+    parser.add_argument("--profile", required=True, choices=sorted(PROFILES))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--drop-old", action="store_true", help="Delete the previous collection after the switch.")
+    parser.add_argument("--settle-seconds", type=float, default=2.0, help="Wait for in-flight writes after pausing ingestion.")
+    args = parser.parse_args()
+
+    summary = migrate(get_client(), args.collection, get_profile(args.profile), args.batch_size, args.drop_old, settle_seconds=args.settle_seconds)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+from typing import Any, Callable, Optional, Set
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.http.models import Distance, VectorParams
+
+from src.config import (
+    QDRANT_URL,
+    QDRANT_API_KEY,
+    QDRANT_PREFER_GRPC,
+    QDRANT_GRPC_PORT,
+    QDRANT_POOL_SIZE,
+    QDRANT_TIMEOUT_SECONDS,
+    QDRANT_RETRIES,
+    QDRANT_RETRY_BACKOFF_SECONDS,
+)
+from src.logger import logger
+
+# HTTP statuses worth retrying: rate limiting and gateway/overload errors.
+TRANSIENT_STATUSES = {429, 502, 503, 504}
+
+_lock = threading.Lock()
+_client: Optional[QdrantClient] = None
+_async_client: Optional[AsyncQdrantClient] = None
+_verified_collections: Set[str] = set()
+
+def _client_options():
+    return dict(
+        url=QDRANT_URL,
+        api_key=QDRANT_API_KEY or None,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        grpc_port=QDRANT_GRPC_PORT,
+        pool_size=QDRANT_POOL_SIZE,
+        timeout=QDRANT_TIMEOUT_SECONDS,
+    )
+
+def get_client() -> QdrantClient:
+    """Process-wide sync client; its connection pool is shared by every caller."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = QdrantClient(**_client_options())
+                logger.info(f"Connected Qdrant client to {QDRANT_URL} ({'gRPC' if QDRANT_PREFER_GRPC else 'REST'}).")
+    return _client
+
+def get_async_client() -> AsyncQdrantClient:
+    """Process-wide async client, for use from the server's event loop."""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncQdrantClient(**_client_options())
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
+
+def close_client():
+    global _client
+    with _lock:
+        client, _client = _client, None
+        _verified_collections.clear()
+    if client is not None:
+        client.close()
+
+def ensure_collection(client: QdrantClient, collection_name: str, size: int, distance: Distance = Distance.COSINE, profile=None):
+    """
+    Create the collection if it is missing, or check that its vectors match
+    `size` and `distance`. Verified once per process. A new collection is created
+    with the storage, index and quantization settings of `profile` (a
+    qdrant_profiles.CollectionProfile); an existing one keeps its own.
+    """
+    if collection_name in _verified_collections:
+        return
+
+    if not with_retries(client.collection_exists, collection_name):
+        options = profile.create_options(size, distance) if profile else {"vectors_config": VectorParams(size=size, distance=distance)}
+        with_retries(client.create_collection, collection_name=collection_name, **options)
+        if profile:
+            create_payload_indexes(client, collection_name, profile)
+    else:
+        vectors = with_retries(client.get_collection, collection_name).config.params.vectors
+        if isinstance(vectors, VectorParams) and (vectors.size != size or vectors.distance != distance):
+            raise ValueError(
+                f"Collection '{collection_name}' stores {vectors.size}-d {vectors.distance} vectors, "
+                f"expected {size}-d {distance}."
+            )
+    _verified_collections.add(collection_name)
+
+def create_payload_indexes(client: QdrantClient, collection_name: str, profile):
+    for field_name, schema in profile.payload_indexes:
+        with_retries(client.create_payload_index, collection_name=collection_name, field_name=field_name, field_schema=schema, wait=True)
+
+def is_transient(error: Exception) -> bool:
+    """Connection errors, timeouts and overload responses; anything else is raised at once."""
+    if isinstance(error, ResponseHandlingException):
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in TRANSIENT_STATUSES
+    try:
+        import grpc
+    except ImportError:
+        return False
+    return isinstance(error, grpc.RpcError) and error.code() in (
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    )
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    delay = QDRANT_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+    logger.warning(f"Qdrant call failed ({error}). Retrying in {delay:.2f}s ({attempt + 1}/{QDRANT_RETRIES}).")
+    return delay
+
+def with_retries(call: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run `call`, retrying transient failures with exponential backoff."""
+    for attempt in range(QDRANT_RETRIES + 1):
+        try:
+            return call(*args, **kwargs)
+        except Exception as e:
+            if attempt == QDRANT_RETRIES or not is_transient(e):
+                raise
+            time.sleep(_retry_delay(attempt, e))
+
+async def awith_retries(call: Callable[..., Any], *args, **kwargs) -> Any:
+    for attempt in range(QDRANT_RETRIES + 1):
+        try:
+            return await call(*args, **kwargs)
+        except Exception as e:
+            if attempt == QDRANT_RETRIES or not is_transient(e):
+                raise
+            await asyncio.sleep(_retry_delay(attempt, e))
@@ -1,22 +1,182 @@
+import asyncio
+import os
+
+from typing import List, Optional, Set, Tuple
+
 from langchain_qdrant import QdrantVectorStore
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import QueryRequest, PointStruct, SearchParams
+
+from src.adapters import qdrant_registry
+from src.adapters.qdrant_profiles import await_for_switch, get_profile, wait_for_switch, wait_while_migrating
+from src.adapters.qdrant_registry import awith_retries, ensure_collection, with_retries
+from src.config import (
+    QDRANT_COLLECTION_PROFILE,
+    VECTOR_STORE_BACKEND,
+    LOCAL_VECTOR_STORE_DIR,
+    LOCAL_VECTOR_STORE_DTYPE,
+    LOCAL_VECTOR_STORE_APPROXIMATE,
+    LOCAL_VECTOR_STORE_COMPACT_DEAD_FRACTION,
+    LOCAL_VECTOR_STORE_NPROBE,
+)
+
+CONTENT_KEY = "page_content"
+METADATA_KEY = "metadata"
+
+EMBEDDING_DIM = 384
+
+PROFILE = get_profile(QDRANT_COLLECTION_PROFILE)
+SEARCH_PARAMS = PROFILE.search_params()
 
-from src.config import QDRANT_URL
+def _local_index(collection_name: str):
+    from src.adapters.local_vector_store import open_index
+
+    return open_index(
+        os.path.join(LOCAL_VECTOR_STORE_DIR, collection_name),
+        dim=EMBEDDING_DIM,
+        dtype=LOCAL_VECTOR_STORE_DTYPE,
+        approximate=LOCAL_VECTOR_STORE_APPROXIMATE,
+        nprobe=LOCAL_VECTOR_STORE_NPROBE,
+        compact_dead_fraction=LOCAL_VECTOR_STORE_COMPACT_DEAD_FRACTION,
+    )
+
+def _is_local(client) -> bool:
+    from src.adapters.local_vector_store import LocalIndex
+
+    return isinstance(client, LocalIndex)
 
 def get_vector_store(collection_name: str = "documents", embedding: Embeddings = None):
-    client = QdrantClient(url=QDRANT_URL)
+    """
+    Vector store for `collection_name` on the configured backend: a Qdrant
+    collection, or an in-process LocalVectorStore when VECTOR_STORE_BACKEND=local.
+    """
+    if VECTOR_STORE_BACKEND == "local":
+        from src.adapters.local_vector_store import LocalVectorStore
 
-    if not client.collection_exists(collection_name):
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=384, distance=Distance.COSINE),
-        )
+        return LocalVectorStore(_local_index(collection_name), collection_name, embedding)
+
+    client = qdrant_registry.get_client()
+    ensure_collection(client, collection_name, EMBEDDING_DIM, profile=PROFILE)
 
     return QdrantVectorStore(
         client=client,
         collection_name=collection_name,
         embedding=embedding,
+        validate_collection_config=False,
     )
+
+def get_async_client(collection_name: str = "documents"):
+    """Async search client; the local backend shares its index with get_vector_store."""
+    if VECTOR_STORE_BACKEND == "local":
+        return _local_index(collection_name)
+    return qdrant_registry.get_async_client()
+
+async def close_async_client(client):
+    if not _is_local(client):
+        await qdrant_registry.close_async_client()
+
+def point_to_document(point, collection_name: str) -> Document:
+    """Build a Document from a Qdrant point written by QdrantVectorStore."""
+    payload = point.payload or {}
+    metadata = dict(payload.get(METADATA_KEY) or {})
+    metadata["_id"] = point.id
+    metadata["_collection_name"] = collection_name
+    if getattr(point, "vector", None) is not None:
+        metadata["_vector"] = point.vector
+    return Document(page_content=payload.get(CONTENT_KEY, ""), metadata=metadata)
+
+def _batch_requests(vectors: List[List[float]], k: int, with_vectors: bool, params: Optional[SearchParams]) -> List[QueryRequest]:
+    return [QueryRequest(query=vector, limit=k, params=params, with_payload=True, with_vector=with_vectors) for vector in vectors]
+
+def search_batch(
+    client: QdrantClient,
+    collection_name: str,
+    vectors: List[List[float]],
+    k: int,
+    with_vectors: bool = False,
+    params: Optional[SearchParams] = SEARCH_PARAMS,
+) -> List[List[Tuple[Document, float]]]:
+    """
+    Run one Qdrant batch query for several vectors; one hit list per vector.
+    With `with_vectors`, each Document carries its stored vector in metadata["_vector"].
+    `params` defaults to the search parameters of QDRANT_COLLECTION_PROFILE.
+    """
+    if not vectors:
+        return []
+    if _is_local(client):
+        return _local_hits(client.search_batch(vectors, k, with_vectors), collection_name)
+    requests = _batch_requests(vectors, k, with_vectors, params)
+    try:
+        responses = with_retries(client.query_batch_points, collection_name=collection_name, requests=requests)
+    except Exception:
+        # A migration swapping the plain collection for an alias leaves the name missing for a moment.
+        if not wait_for_switch(client, collection_name):
+            raise
+        responses = with_retries(client.query_batch_points, collection_name=collection_name, requests=requests)
+    return [[(point_to_document(point, collection_name), point.score) for point in response.points] for response in responses]
+
+async def asearch_batch(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    vectors: List[List[float]],
+    k: int,
+    with_vectors: bool = False,
+    params: Optional[SearchParams] = SEARCH_PARAMS,
+) -> List[List[Tuple[Document, float]]]:
+    if not vectors:
+        return []
+    if _is_local(client):
+        # NumPy releases the GIL during the matrix product, so a worker thread keeps the event loop free.
+        return _local_hits(await asyncio.to_thread(client.search_batch, vectors, k, with_vectors), collection_name)
+    requests = _batch_requests(vectors, k, with_vectors, params)
+    try:
+        responses = await awith_retries(client.query_batch_points, collection_name=collection_name, requests=requests)
+    except Exception:
+        if not await await_for_switch(client, collection_name):
+            raise
+        responses = await awith_retries(client.query_batch_points, collection_name=collection_name, requests=requests)
+    return [[(point_to_document(point, collection_name), point.score) for point in response.points] for response in responses]
+
+def _local_hits(results, collection_name: str) -> List[List[Tuple[Document, float]]]:
+    return [[(point_to_document(point, collection_name), point.score) for point in hits] for hits in results]
+
+def point_ids(vector_store: QdrantVectorStore, batch_size: int = 1000) -> Set[str]:
+    """Ids of every point in the collection."""
+    if _is_local(vector_store.client):
+        return {str(point_id) for point_id in vector_store.client.point_ids()}
+    ids, offset = set(), None
+    while True:
+        records, offset = with_retries(
+            vector_store.client.scroll,
+            collection_name=vector_store.collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids.update(str(record.id) for record in records)
+        if offset is None:
+            return ids
+
+def wait_for_writes(vector_store: QdrantVectorStore):
+    """Block until a running `qdrant_profiles` migration of the collection lets ingestion write again."""
+    if not _is_local(vector_store.client):
+        wait_while_migrating(vector_store.client, vector_store.collection_name)
+
+def upsert_embeddings(vector_store: QdrantVectorStore, ids: List[str], vectors: List[List[float]], documents: List[Document]):
+    """Write precomputed vectors using the same payload layout as QdrantVectorStore."""
+    wait_for_writes(vector_store)
+    if _is_local(vector_store.client):
+        payloads = [{CONTENT_KEY: doc.page_content, METADATA_KEY: doc.metadata} for doc in documents]
+        vector_store.client.upsert(ids, vectors, payloads)
+        return
+
+    points = [
+        PointStruct(id=point_id, vector=vector, payload={CONTENT_KEY: doc.page_content, METADATA_KEY: doc.metadata})
+        for point_id, vector, doc in zip(ids, vectors, documents)
+    ]
+    # Point ids are deterministic, so a retried upsert cannot duplicate points.
+    with_retries(vector_store.client.upsert, collection_name=vector_store.collection_name, points=points)
@@ -0,0 +1,89 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from src.config import (
+    INGEST_MAX_CONCURRENT_JOBS,
+    INGEST_JOB_PARSE_WORKERS,
+    INGEST_JOB_NICENESS,
+    INGEST_JOB_EMBED_THREADS,
+    INGEST_JOB_HISTORY,
+    OFFLINE_MODE,
+)
+from src.logger import logger
+
+def _warm_up():
+    """
+    Build the shared Orchestrator and force the lazy parts (embedding model,
+    vector store connection) to load before the first request arrives.
+    """
+    from src.assets import check_assets
+    from src.engine.orchestrator import Orchestrator
+
+    problems = check_assets()
+    for problem in problems:
+        logger.warning(f"{problem}. Run `python -m src.assets` to prepare the local asset cache.")
+    if problems and OFFLINE_MODE:
+        logger.warning("OFFLINE_MODE is set, so missing assets will not be downloaded.")
+
+    orchestrator = Orchestrator()
+    orchestrator.retriever.rag_retriever.embedding.embed_query("warm-up")
+    return orchestrator
+
+def _build_job_manager():
+    from src.rag.jobs import IngestionJobManager
+
+    return IngestionJobManager(
+        max_concurrent_jobs=INGEST_MAX_CONCURRENT_JOBS,
+        parse_workers=INGEST_JOB_PARSE_WORKERS,
+        niceness=INGEST_JOB_NICENESS,
+        embed_threads=INGEST_JOB_EMBED_THREADS,
+        history=INGEST_JOB_HISTORY,
+    )
+
+async def _warm_up_in_background(app: FastAPI):
+    logger.info("Warming up shared resources...")
+    try:
+        app.state.orchestrator = await run_in_threadpool(_warm_up)
+        app.state.ready = True
+        logger.info("Warm-up complete. Ready to serve traffic.")
+    except Exception as e:
+        app.state.startup_error = str(e)
+        logger.error(f"Warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.orchestrator = None
+    app.state.ready = False
+    app.state.startup_error = None
+    app.state.ingestion_jobs = _build_job_manager()
+
+    # Heavy imports and model loading happen after the server starts
+    # listening; /health reports "starting" until they are done.
+    warm_up = asyncio.create_task(_warm_up_in_background(app))
+
+    yield
+
+    await warm_up
+    app.state.ready = False
+    app.state.ingestion_jobs.shutdown()
+    if app.state.orchestrator is not None:
+        await app.state.orchestrator.aclose()
+    app.state.orchestrator = None
+
+    from src.adapters.qdrant_registry import close_client
+
+    close_client()
+
+def get_orchestrator(request: Request):
+    """FastAPI dependency returning the process-wide Orchestrator."""
+    if not request.app.state.ready:
+        raise HTTPException(status_code=503, detail="Service is warming up or unavailable.")
+    return request.app.state.orchestrator
+
+def get_ingestion_jobs(request: Request):
+    """FastAPI dependency returning the background ingestion job manager."""
+    return request.app.state.ingestion_jobs
@@ -1,8 +1,18 @@
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.config import BATCH_MAX_CONCURRENCY
 
 class QueryRequest(BaseModel):
     query: str
     role: str = "standard"
 
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest]
+    concurrency: Optional[int] = Field(default=None, ge=1, le=BATCH_MAX_CONCURRENCY)
+
 class IngestRequest(BaseModel):
     directory_path: str = "docs"
+    parallel: Optional[bool] = None
+    rebuild: bool = False
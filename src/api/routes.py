@@ -1,38 +1,126 @@
+import json
 import os
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
-from src.api.models import QueryRequest, IngestRequest
+from src.api.lifespan import lifespan, get_orchestrator, get_ingestion_jobs
+from src.api.models import BatchQueryRequest, QueryRequest, IngestRequest
+from src.config import BATCH_MAX_QUERIES, METRICS_ENABLED
+from src.metrics import render
+from src.tracing import current_trace_id, start_trace
 
-app = FastAPI(title="Multi-Agent RAG System API")
+app = FastAPI(title="Multi-Agent RAG System API", lifespan=lifespan)
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Give each request a trace id (the caller's X-Trace-Id if sent), echoed in the response headers."""
+    trace_id = start_trace(request.headers.get("X-Trace-Id"))
+    response = await call_next(request)
+    response.headers["X-Trace-Id"] = trace_id
+    return response
 
 @app.get("/health")
-def health_check():
+async def health_check(request: Request):
+    if not request.app.state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable" if request.app.state.startup_error else "starting",
+                     "detail": request.app.state.startup_error}
+        )
     return {"status": "ok"}
 
 @app.post("/ask")
-def ask_agent(request: QueryRequest):
-    from src.engine.orchestrator import Orchestrator
-
+async def ask_agent(request: QueryRequest, orchestrator=Depends(get_orchestrator)):
     try:
-        orchestrator = Orchestrator()
-        
-        response = orchestrator.run(request.query, request.role)
+        response = await orchestrator.arun(request.query, request.role)
+        response["trace_id"] = current_trace_id()
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/ingest")
-def ingest_documents(request: IngestRequest):
-    from src.rag.ingestion import RAGIngestion
+@app.post("/ask/stream")
+async def ask_agent_stream(request: QueryRequest, orchestrator=Depends(get_orchestrator)):
+    async def event_stream():
+        try:
+            async for event in orchestrator.astream(request.query, request.role):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
 
-    try:
-        if not os.path.exists(request.directory_path):
-             raise HTTPException(status_code=400, detail=f"Directory '{request.directory_path}' not found.")
-        
-        rag = RAGIngestion()
-        rag.ingest(request.directory_path)
-        
-        return {"status": "success", "message": f"Ingestion completed for directory: {request.directory_path}"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/ask/batch")
+async def ask_agent_batch(request: BatchQueryRequest, orchestrator=Depends(get_orchestrator)):
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_QUERIES} queries per batch.")
+
+    items = [(item.query, item.role) for item in request.queries]
+
+    async def event_stream():
+        try:
+            async for event in orchestrator.astream_batch(items, request.concurrency):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/cache/stats")
+async def cache_stats(orchestrator=Depends(get_orchestrator)):
+    stats = {"enabled": False} if orchestrator.cache is None else {"enabled": True, **orchestrator.cache.snapshot()}
+    if hasattr(orchestrator.embedding, "snapshot"):
+        stats["embedding_cache"] = orchestrator.embedding.snapshot()
+    return stats
+
+@app.get("/metrics")
+async def metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm/stats")
+async def llm_stats(orchestrator=Depends(get_orchestrator)):
+    # Imported here: the LLM clients load with the orchestrator, not with the app.
+    from src.engine.llm import LATENCY
+    return {"models": LATENCY.snapshot()}
+
+@app.get("/router/stats")
+async def router_stats(orchestrator=Depends(get_orchestrator)):
+    if orchestrator.router is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.router.snapshot()}
+
+@app.post("/ingest", status_code=202)
+async def ingest_documents(request: IngestRequest, jobs=Depends(get_ingestion_jobs)):
+    if not os.path.exists(request.directory_path):
+        raise HTTPException(status_code=400, detail=f"Directory '{request.directory_path}' not found.")
+
+    job = jobs.submit(request.directory_path, parallel=request.parallel, rebuild=request.rebuild)
+    return {"status": "accepted", "job_id": job.id, "message": f"Ingestion queued for directory: {request.directory_path}"}
+
+@app.get("/ingest/jobs")
+async def list_ingestion_jobs(jobs=Depends(get_ingestion_jobs)):
+    return {"jobs": [job.to_dict() for job in jobs.list()]}
+
+@app.get("/ingest/jobs/{job_id}")
+async def get_ingestion_job(job_id: str, jobs=Depends(get_ingestion_jobs)):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job.to_dict()
+
+@app.post("/ingest/jobs/{job_id}/cancel")
+async def cancel_ingestion_job(job_id: str, jobs=Depends(get_ingestion_jobs)):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job.to_dict()
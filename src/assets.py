@@ -0,0 +1,106 @@
+import argparse
+import os
+import ssl
+
+from functools import lru_cache
+from typing import List
+
+from src.config import (
+    ASSET_CACHE_DIR,
+    NLTK_DATA_DIR,
+    OFFLINE_MODE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZED,
+    CONTEXT_TOKENIZER_MODEL,
+)
+from src.logger import logger
+
+# NLTK packages used by the unstructured Markdown loader, with the resource path NLTK looks up.
+NLTK_PACKAGES = {
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger": "taggers/averaged_perceptron_tagger",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+}
+
+def missing_nltk_packages() -> List[str]:
+    import nltk
+
+    missing = []
+    for name, resource in NLTK_PACKAGES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+@lru_cache(maxsize=None)
+def nltk_available() -> bool:
+    """True when every NLTK package is installed locally, checked once per process."""
+    return not missing_nltk_packages()
+
+def prepare_nltk(verify_ssl: bool = True):
+    """
+    Download the NLTK packages into NLTK_DATA_DIR. SSL verification can be
+    turned off for this call only, for proxies that re-sign certificates.
+    """
+    import nltk
+
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    default_context = ssl._create_default_https_context
+    if not verify_ssl:
+        ssl._create_default_https_context = ssl._create_unverified_context
+    try:
+        for name in NLTK_PACKAGES:
+            nltk.download(name, download_dir=NLTK_DATA_DIR, quiet=True, raise_on_error=True)
+    finally:
+        ssl._create_default_https_context = default_context
+    logger.info(f"NLTK data saved to {NLTK_DATA_DIR}.")
+
+def prepare_embedding_model(backend: str = EMBEDDING_BACKEND):
+    """Fetch the embedding model for `backend` into the local cache."""
+    if backend == "onnx":
+        from src.rag.onnx_embedding import prepare_model
+
+        prepare_model(EMBEDDING_ONNX_DIR, quantize=EMBEDDING_ONNX_QUANTIZED)
+        return
+
+    from src.rag.embedding import build_embedding_model
+
+    model, _ = build_embedding_model("torch")
+    model.embed_query("prepare")
+    logger.info(f"Embedding model cached under {os.environ['HF_HOME']}.")
+
+def prepare_tokenizer(model: str = CONTEXT_TOKENIZER_MODEL):
+    """Fetch the tiktoken encoding used to count context tokens."""
+    import tiktoken
+
+    tiktoken.encoding_for_model(model)
+    logger.info(f"Tokenizer for {model} cached under {os.environ['TIKTOKEN_CACHE_DIR']}.")
+
+def check_assets() -> List[str]:
+    """Describe the assets missing from the local cache, for the startup log."""
+    problems = []
+    missing = missing_nltk_packages()
+    if missing:
+        problems.append(f"NLTK packages not found: {', '.join(missing)}")
+    if EMBEDDING_BACKEND == "onnx" and not os.path.isdir(EMBEDDING_ONNX_DIR):
+        problems.append(f"ONNX model directory not found: {EMBEDDING_ONNX_DIR}")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Download runtime assets into {ASSET_CACHE_DIR}.")
+    parser.add_argument("--skip-nltk", action="store_true")
+    parser.add_argument("--skip-model", action="store_true")
+    parser.add_argument("--skip-tokenizer", action="store_true")
+    parser.add_argument("--no-verify-ssl", action="store_true", help="Disable certificate checks for the NLTK download.")
+    args = parser.parse_args()
+
+    if OFFLINE_MODE:
+        parser.error("OFFLINE_MODE is set; unset it to download assets.")
+    if not args.skip_nltk:
+        prepare_nltk(verify_ssl=not args.no_verify_ssl)
+    if not args.skip_model:
+        prepare_embedding_model()
+    if not args.skip_tokenizer:
+        prepare_tokenizer()
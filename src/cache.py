@@ -0,0 +1,66 @@
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+class LRUCache:
+    """
+    Thread-safe, bounded key/value cache with optional TTL. It holds at most
+    `max_entries` entries and, with `sizeof`, at most `max_bytes` bytes as
+    measured by `sizeof(value)`; either bound can be None.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10000,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds is not None and time.monotonic() - item[1] > self.ttl_seconds:
+                self._pop(key)
+                item = None
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return item[0]
+
+    def put(self, key: Any, value: Any):
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (value, time.monotonic(), size)
+            self.bytes += size
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self._pop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _pop(self, key: Any):
+        self.bytes -= self._entries.pop(key)[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,3 +1,4 @@
+import logging
 import os
 
 from dotenv import load_dotenv
@@ -15,3 +16,162 @@ if not os.getenv("QDRANT_URL"):
 OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
 QDRANT_URL=os.getenv("QDRANT_URL")
 QDRANT_API_KEY=os.getenv("QDRANT_API_KEY", "")
+
+# Shared Qdrant clients: transport, connection pool, timeouts and retries of transient failures.
+QDRANT_PREFER_GRPC=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT=int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_POOL_SIZE=int(os.getenv("QDRANT_POOL_SIZE", "0")) or None
+QDRANT_TIMEOUT_SECONDS=int(os.getenv("QDRANT_TIMEOUT_SECONDS", "10"))
+QDRANT_RETRIES=int(os.getenv("QDRANT_RETRIES", "2"))
+QDRANT_RETRY_BACKOFF_SECONDS=float(os.getenv("QDRANT_RETRY_BACKOFF_SECONDS", "0.2"))
+
+# Qdrant collection profile used when a collection is created and searched: "default" (float32 vectors
+# in RAM, default HNSW), "quantized" (int8 scalar quantization with rescoring, tuned HNSW, payload index
+# on metadata.source) or "quantized_disk" (as "quantized", with the original vectors on disk).
+# Existing collections move to another profile with `python -m src.adapters.qdrant_profiles`.
+QDRANT_COLLECTION_PROFILE=os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+QDRANT_HNSW_M=int(os.getenv("QDRANT_HNSW_M", "32"))
+QDRANT_HNSW_EF_CONSTRUCT=int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "256"))
+QDRANT_SEARCH_HNSW_EF=int(os.getenv("QDRANT_SEARCH_HNSW_EF", "128"))
+QDRANT_QUANTIZATION_OVERSAMPLING=float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+# Longest an ingestion write waits while a migration pauses ingestion for the final catch-up and switch.
+QDRANT_MIGRATION_WAIT_SECONDS=float(os.getenv("QDRANT_MIGRATION_WAIT_SECONDS", "600"))
+
+# "sequential" runs compliance -> decision -> retrieval -> answer one after another.
+# "speculative" starts decision and retrieval alongside compliance.
+# "triage" gets the compliance verdict and the routing decision from a single LLM call.
+ORCHESTRATOR_MODE=os.getenv("ORCHESTRATOR_MODE", "sequential")
+
+# Batch /ask: queries answered at once per batch (default when the request sets none, and the most a request may ask for) and batch size limit.
+BATCH_CONCURRENCY=int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY=int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+BATCH_MAX_QUERIES=int(os.getenv("BATCH_MAX_QUERIES", "1000"))
+# Shared retrieval of a batch: at most this many unique search terms per embedding/search call,
+# and how long a retrieval waits for more routed queries before it starts.
+BATCH_SEARCH_SIZE=int(os.getenv("BATCH_SEARCH_SIZE", "64"))
+BATCH_RETRIEVAL_WINDOW_SECONDS=float(os.getenv("BATCH_RETRIEVAL_WINDOW_SECONDS", "0.05"))
+
+# Number of chunks retrieved per search term.
+RETRIEVAL_K=int(os.getenv("RETRIEVAL_K", "5"))
+
+# Semantic response cache in front of the orchestrator.
+SEMANTIC_CACHE_ENABLED=os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_MAX_DISTANCE=float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.05"))
+SEMANTIC_CACHE_TTL_SECONDS=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+SEMANTIC_CACHE_MAX_MB=float(os.getenv("SEMANTIC_CACHE_MAX_MB", "64"))
+
+# Compliance heuristics: extra blocklist terms (one per line, hot-reloaded) and LLM verdict cache.
+COMPLIANCE_BLOCKLIST_PATH=os.getenv("COMPLIANCE_BLOCKLIST_PATH")
+COMPLIANCE_BLOCKLIST_RELOAD_SECONDS=float(os.getenv("COMPLIANCE_BLOCKLIST_RELOAD_SECONDS", "5"))
+COMPLIANCE_VERDICT_CACHE_SIZE=int(os.getenv("COMPLIANCE_VERDICT_CACHE_SIZE", "10000"))
+COMPLIANCE_VERDICT_CACHE_TTL_SECONDS=float(os.getenv("COMPLIANCE_VERDICT_CACHE_TTL_SECONDS", "3600"))
+
+# Local embedding router in front of the DecisionAgent LLM call.
+DECISION_ROUTER_ENABLED=os.getenv("DECISION_ROUTER_ENABLED", "false").lower() == "true"
+DECISION_ROUTER_EXAMPLES_PATH=os.getenv("DECISION_ROUTER_EXAMPLES_PATH")
+# JSON lines of {"query", "decision"} examples for your corpus, added to the built-in domain-neutral ones.
+DECISION_ROUTER_SEED_PATH=os.getenv("DECISION_ROUTER_SEED_PATH")
+DECISION_ROUTER_MIN_SIMILARITY=float(os.getenv("DECISION_ROUTER_MIN_SIMILARITY", "0.3"))
+DECISION_ROUTER_MIN_MARGIN=float(os.getenv("DECISION_ROUTER_MIN_MARGIN", "0.1"))
+DECISION_ROUTER_LEARN=os.getenv("DECISION_ROUTER_LEARN", "false").lower() == "true"
+DECISION_ROUTER_MAX_EXAMPLES_PER_LABEL=int(os.getenv("DECISION_ROUTER_MAX_EXAMPLES_PER_LABEL", "1000"))
+
+# Directory holding one ingestion manifest (file hashes and point ids) per collection.
+INGEST_MANIFEST_DIR=os.getenv("INGEST_MANIFEST_DIR", ".ingest_manifests")
+
+# Pipelined ingestion: parallel parsing, batched embedding and concurrent upserts.
+INGEST_PARALLEL=os.getenv("INGEST_PARALLEL", "false").lower() == "true"
+INGEST_PARSE_WORKERS=int(os.getenv("INGEST_PARSE_WORKERS", str(os.cpu_count() or 2)))
+INGEST_EMBED_BATCH_SIZE=int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+INGEST_UPSERT_WORKERS=int(os.getenv("INGEST_UPSERT_WORKERS", "4"))
+INGEST_QUEUE_SIZE=int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+
+# Background ingestion jobs: concurrency and CPU budget.
+INGEST_MAX_CONCURRENT_JOBS=int(os.getenv("INGEST_MAX_CONCURRENT_JOBS", "1"))
+INGEST_JOB_PARSE_WORKERS=int(os.getenv("INGEST_JOB_PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+INGEST_JOB_NICENESS=int(os.getenv("INGEST_JOB_NICENESS", "10"))
+# Jobs embed in a child process at INGEST_JOB_NICENESS with this many threads (0: in the server process).
+INGEST_JOB_EMBED_THREADS=int(os.getenv("INGEST_JOB_EMBED_THREADS", "1"))
+INGEST_JOB_HISTORY=int(os.getenv("INGEST_JOB_HISTORY", "50"))
+
+# Embedding cache: in-memory LRU plus an SQLite file (set EMBEDDING_CACHE_PATH empty for memory only).
+EMBEDDING_CACHE_ENABLED=os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH=os.getenv("EMBEDDING_CACHE_PATH", ".embedding_cache/embeddings.sqlite")
+EMBEDDING_CACHE_MEMORY_MB=float(os.getenv("EMBEDDING_CACHE_MEMORY_MB", "32"))
+
+# Embedding backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime, optional int8).
+EMBEDDING_BACKEND=os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_DIR=os.getenv("EMBEDDING_ONNX_DIR", "models/all-MiniLM-L6-v2-onnx")
+EMBEDDING_ONNX_QUANTIZED=os.getenv("EMBEDDING_ONNX_QUANTIZED", "false").lower() == "true"
+EMBEDDING_THREADS=int(os.getenv("EMBEDDING_THREADS", "0")) or None
+EMBEDDING_BATCH_SIZE=int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Local asset cache (NLTK data, Hugging Face models), filled once with `python -m src.assets`.
+# OFFLINE_MODE=true forbids runtime downloads, for air-gapped deployments.
+ASSET_CACHE_DIR=os.path.abspath(os.getenv("ASSET_CACHE_DIR", ".assets"))
+OFFLINE_MODE=os.getenv("OFFLINE_MODE", "false").lower() == "true"
+NLTK_DATA_DIR=os.path.join(ASSET_CACHE_DIR, "nltk_data")
+
+# NLTK and Hugging Face read these when first imported, so set them before anything else loads.
+os.environ.setdefault("NLTK_DATA", NLTK_DATA_DIR)
+os.environ.setdefault("HF_HOME", os.path.join(ASSET_CACHE_DIR, "huggingface"))
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(ASSET_CACHE_DIR, "tiktoken"))
+if OFFLINE_MODE:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+# RAG context packing: token budget, MMR diversification and near-duplicate suppression.
+CONTEXT_PACKING_ENABLED=os.getenv("CONTEXT_PACKING_ENABLED", "true").lower() == "true"
+CONTEXT_MAX_TOKENS=int(os.getenv("CONTEXT_MAX_TOKENS", "2500"))
+CONTEXT_MMR_LAMBDA=float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+CONTEXT_DUPLICATE_SIMILARITY=float(os.getenv("CONTEXT_DUPLICATE_SIMILARITY", "0.95"))
+CONTEXT_TOKENIZER_MODEL=os.getenv("CONTEXT_TOKENIZER_MODEL", "gpt-4o")
+# "tokenizer" counts with the CONTEXT_TOKENIZER_MODEL encoding, loaded at startup (which fails when it is
+# neither cached nor downloadable); "estimate" counts characters/4 and never loads it; "auto" uses the
+# encoding when it loads and otherwise falls back to the estimate with a warning.
+CONTEXT_TOKEN_COUNTING=os.getenv("CONTEXT_TOKEN_COUNTING", "auto").lower()
+
+# Vector store backend: "qdrant" (server) or "local" (in-process memory-mapped index).
+VECTOR_STORE_BACKEND=os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+LOCAL_VECTOR_STORE_DIR=os.getenv("LOCAL_VECTOR_STORE_DIR", ".vector_store")
+LOCAL_VECTOR_STORE_DTYPE=os.getenv("LOCAL_VECTOR_STORE_DTYPE", "float16")
+LOCAL_VECTOR_STORE_APPROXIMATE=os.getenv("LOCAL_VECTOR_STORE_APPROXIMATE", "false").lower() == "true"
+LOCAL_VECTOR_STORE_NPROBE=int(os.getenv("LOCAL_VECTOR_STORE_NPROBE", "8"))
+# Dead (re-upserted or deleted) fraction of rows after which the local index rewrites its live rows.
+LOCAL_VECTOR_STORE_COMPACT_DEAD_FRACTION=float(os.getenv("LOCAL_VECTOR_STORE_COMPACT_DEAD_FRACTION", "0.3"))
+
+# LLM clients: a model tier ("fast" or "quality") per agent, a deadline per call (per tier),
+# an opt-in hedged duplicate request once a call outlasts the model's recent latency quantile
+# (each hedge is a second paid completion), and a fallback model for failed or timed-out calls.
+# LLM_AGENT_TIERS lists agent=tier pairs, e.g. "compliance=fast,decision=fast,triage=fast"; unlisted
+# agents use "quality". Tiering is opt-in: with the empty default every agent stays on the quality model. LLM_FALLBACK_MODEL unset means the other tier's model, "none" disables it.
+LLM_QUALITY_MODEL=os.getenv("LLM_QUALITY_MODEL", "gpt-4o")
+LLM_FAST_MODEL=os.getenv("LLM_FAST_MODEL", "gpt-4o-mini")
+LLM_AGENT_TIERS=dict(
+    pair.strip().split("=", 1)
+    for pair in os.getenv("LLM_AGENT_TIERS", "").split(",")
+    if "=" in pair
+)
+LLM_FALLBACK_MODEL=os.getenv("LLM_FALLBACK_MODEL")
+LLM_QUALITY_TIMEOUT_SECONDS=float(os.getenv("LLM_QUALITY_TIMEOUT_SECONDS", "30"))
+LLM_FAST_TIMEOUT_SECONDS=float(os.getenv("LLM_FAST_TIMEOUT_SECONDS", "10"))
+LLM_MAX_RETRIES=int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_HEDGE_ENABLED=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_QUANTILE=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_SECONDS=float(os.getenv("LLM_HEDGE_MIN_SECONDS", "0.5"))
+LLM_LATENCY_WINDOW=int(os.getenv("LLM_LATENCY_WINDOW", "500"))
+
+# Structured agent output: "native" sends the output schema through the model's structured-output
+# API; "parser" appends format instructions to the prompt and parses the reply text.
+LLM_STRUCTURED_OUTPUT=os.getenv("LLM_STRUCTURED_OUTPUT", "native")
+
+# Observability: Prometheus /metrics, log verbosity and whether user queries appear in logs.
+# LLM prices (USD per 1K tokens) only feed the estimated cost metric.
+METRICS_ENABLED=os.getenv("METRICS_ENABLED", "true").lower() == "true"
+LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUERIES=os.getenv("LOG_QUERIES", "false").lower() == "true"
+LLM_PROMPT_PRICE_PER_1K=float(os.getenv("LLM_PROMPT_PRICE_PER_1K", "0.0025"))
+LLM_COMPLETION_PRICE_PER_1K=float(os.getenv("LLM_COMPLETION_PRICE_PER_1K", "0.01"))
+logging.getLogger().setLevel(LOG_LEVEL)
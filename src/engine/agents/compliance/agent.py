@@ -1,14 +1,24 @@
 from typing import Optional
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 
+from src.engine.agents.compliance.blocklist import Blocklist, normalize_text
 from src.engine.agents.compliance.model import ComplianceInput, ComplianceOutput
 from src.engine.agents.compliance.system_prompt import COMPLIANCE_SYSTEM_PROMPT
+from src.engine.agents.structured import compile_prompt, structured_chain
+from src.cache import LRUCache
 from src.engine.llm import get_llm
+from src.metrics import count_cache_lookup, instrumented
+from src.config import (
+    COMPLIANCE_BLOCKLIST_PATH,
+    COMPLIANCE_BLOCKLIST_RELOAD_SECONDS,
+    COMPLIANCE_VERDICT_CACHE_SIZE,
+    COMPLIANCE_VERDICT_CACHE_TTL_SECONDS,
+    LLM_STRUCTURED_OUTPUT,
+)
 
 class ComplianceAgent:
-    def __init__(self):
-        self.llm = get_llm()
+    def __init__(self, structured_output: str = LLM_STRUCTURED_OUTPUT):
+        self.llm = get_llm("compliance")
         self.parser = PydanticOutputParser(pydantic_object=ComplianceOutput)
         
         self.semantic_blocklist = [
@@ -19,10 +29,17 @@ class ComplianceAgent:
             "child porn",
             "credit card generator"
         ]
+        self.blocklist = Blocklist(
+            self.semantic_blocklist,
+            path=COMPLIANCE_BLOCKLIST_PATH,
+            reload_interval=COMPLIANCE_BLOCKLIST_RELOAD_SECONDS,
+        )
+        self.verdict_cache = LRUCache(
+            max_entries=COMPLIANCE_VERDICT_CACHE_SIZE,
+            ttl_seconds=COMPLIANCE_VERDICT_CACHE_TTL_SECONDS,
+        )
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", COMPLIANCE_SYSTEM_PROMPT),
-            ("human", """Input to Analyze:
+        self.prompt = compile_prompt(COMPLIANCE_SYSTEM_PROMPT, """Input to Analyze:
 \"\"\"
 {query}
 \"\"\"
@@ -30,22 +47,12 @@ class ComplianceAgent:
 Context/Metadata:
 - User Role: {user_role}
 
-Analyze the input above. JSON Output:""")
-        ])
-        
-        self.chain = self.prompt | self.llm | self.parser
+Analyze the input above. JSON Output:""", self.parser, structured_output)
+
+        self.chain = structured_chain(self.prompt, self.llm, self.parser, structured_output)
 
     def heuristic_check(self, query: str) -> Optional[ComplianceOutput]:
         """Fast-fail check for obvious blocks"""
-        query_lower = query.lower()
-        for term in self.semantic_blocklist:
-            if term in query_lower:
-                return ComplianceOutput(
-                    is_safe=False,
-                    reason=f"Blocked by heuristic: contains prohibited term '{term}'",
-                    category="heuristic_block",
-                    risk_level="high"
-                )
         if len(query) > 10000:
              return ComplianceOutput(
                 is_safe=False,
@@ -53,15 +60,53 @@ Analyze the input above. JSON Output:""")
                 category="dos_protection",
                 risk_level="medium"
             )
+        term = self.blocklist.find(query)
+        if term:
+            return ComplianceOutput(
+                is_safe=False,
+                reason=f"Blocked by heuristic: contains prohibited term '{term}'",
+                category="heuristic_block",
+                risk_level="high"
+            )
         return None
 
+    def _cache_key(self, input_data: ComplianceInput):
+        return (normalize_text(input_data.query), input_data.user_role)
+
+    @instrumented("compliance")
     def invoke(self, input_data: ComplianceInput) -> ComplianceOutput:
         heuristic_result = self.heuristic_check(input_data.query)
         if heuristic_result:
             return heuristic_result
-            
-        return self.chain.invoke({
+
+        cache_key = self._cache_key(input_data)
+        cached = self.verdict_cache.get(cache_key)
+        count_cache_lookup("compliance_verdict", cached is not None)
+        if cached:
+            return cached.model_copy()
+
+        result = self.chain.invoke({
+            "query": input_data.query,
+            "user_role": input_data.user_role,
+        })
+        self.verdict_cache.put(cache_key, result)
+        return result
+
+    @instrumented("compliance")
+    async def ainvoke(self, input_data: ComplianceInput) -> ComplianceOutput:
+        heuristic_result = self.heuristic_check(input_data.query)
+        if heuristic_result:
+            return heuristic_result
+
+        cache_key = self._cache_key(input_data)
+        cached = self.verdict_cache.get(cache_key)
+        count_cache_lookup("compliance_verdict", cached is not None)
+        if cached:
+            return cached.model_copy()
+
+        result = await self.chain.ainvoke({
             "query": input_data.query,
             "user_role": input_data.user_role,
-            "format_instructions": self.parser.get_format_instructions()
         })
+        self.verdict_cache.put(cache_key, result)
+        return result
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from src.logger import logger
+
+_ZERO_WIDTH = dict.fromkeys(map(ord, "​‌‍⁠﻿­"))
+
+# Common Cyrillic/Greek look-alikes of Latin letters that NFKC does not fold.
+_CONFUSABLES = str.maketrans({
+    "а": "a", "е": "e", "о": "o", "р": "p", "с": "c", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s",
+    "α": "a", "ε": "e", "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "ν": "v", "ι": "i", "κ": "k",
+})
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+def normalize_text(text: str) -> str:
+    """NFKC, case-fold and collapse whitespace. Used for cache keys."""
+    text = unicodedata.normalize("NFKC", text).translate(_ZERO_WIDTH).casefold()
+    return " ".join(text.split())
+
+def matching_form(text: str) -> str:
+    """
+    Aggressive normalization for blocklist matching: accents stripped,
+    look-alike letters folded and any punctuation/whitespace run turned into
+    a single space, so "Make-a  BÖMB" and "make a bomb" compare equal.
+    """
+    text = unicodedata.normalize("NFKD", normalize_text(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = text.translate(_CONFUSABLES)
+    return _NON_WORD.sub(" ", text).strip()
+
+class _Automaton:
+    """Aho-Corasick automaton over normalized terms."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Optional[str]] = [None]
+
+        for term in terms:
+            self._add(term)
+        self._link()
+
+    def _add(self, term: str):
+        pattern = matching_form(term)
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = next_state
+        if self.output[state] is None:
+            self.output[state] = term
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> Optional[str]:
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+class Blocklist:
+    """
+    Compiled multi-pattern blocklist. Terms come from `terms` plus an optional
+    file (one term per line, '#' for comments) that is re-read when its
+    modification time changes, checked at most every `reload_interval` seconds.
+    """
+
+    def __init__(self, terms: Iterable[str] = (), path: Optional[str] = None, reload_interval: float = 5.0):
+        self.base_terms = list(terms)
+        self.path = path
+        self.reload_interval = reload_interval
+
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.terms: List[str] = []
+        self._automaton = _Automaton([])
+        self.reload()
+
+    def reload(self):
+        file_terms = []
+        mtime = None
+        if self.path:
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, encoding="utf-8") as blocklist_file:
+                    file_terms = [line.strip() for line in blocklist_file if line.strip() and not line.lstrip().startswith("#")]
+            except OSError as e:
+                logger.error(f"Could not load blocklist file {self.path}: {e}")
+
+        terms = self.base_terms + file_terms
+        automaton = _Automaton(terms)
+        with self._lock:
+            self.terms = terms
+            self._automaton = automaton
+            self._mtime = mtime
+        logger.info(f"Compliance blocklist compiled with {len(terms)} terms.")
+
+    def maybe_reload(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the first blocked term found in `text`, if any."""
+        self.maybe_reload()
+        return self._automaton.search(matching_form(text))
@@ -1,29 +1,56 @@
-from langchain_core.prompts import ChatPromptTemplate
+import asyncio
+
+from typing import Optional
+
 from langchain_core.output_parsers import PydanticOutputParser
 
 from src.engine.agents.decision.system_prompt import DECISION_SYSTEM_PROMPT
 from src.engine.agents.decision.model import DecisionOutput
+from src.engine.agents.decision.router import LocalRouter
+from src.engine.agents.structured import compile_prompt, structured_chain
 from src.engine.llm import get_llm
+from src.metrics import instrumented
+from src.config import LLM_STRUCTURED_OUTPUT
 
 class DecisionAgent:
-    def __init__(self):
-        self.llm = get_llm()
+    def __init__(self, router: Optional[LocalRouter] = None, learn: bool = False, structured_output: str = LLM_STRUCTURED_OUTPUT):
+        self.router = router
+        self.learn = learn
+        self.llm = get_llm("decision")
         self.parser = PydanticOutputParser(pydantic_object=DecisionOutput)
         
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", DECISION_SYSTEM_PROMPT),
-            ("human", """Input to Analyze:
+        self.prompt = compile_prompt(DECISION_SYSTEM_PROMPT, """Input to Analyze:
 \"\"\"
 {query}
 \"\"\"
 
-Analyze the input above. JSON Output:""")
-        ])
-        
-        self.chain = self.prompt | self.llm | self.parser
+Analyze the input above. JSON Output:""", self.parser, structured_output)
+
+        self.chain = structured_chain(self.prompt, self.llm, self.parser, structured_output)
 
+    @instrumented("decision")
     def invoke(self, query: str) -> DecisionOutput:
-        return self.chain.invoke({
-            "query": query,
-            "format_instructions": self.parser.get_format_instructions()
-        })
+        vector = None
+        if self.router:
+            local_result, vector = self.router.route(query)
+            if local_result:
+                return local_result
+
+        result = self.chain.invoke({"query": query})
+        if self.router and self.learn:
+            self.router.record(query, result, vector)
+        return result
+
+    @instrumented("decision")
+    async def ainvoke(self, query: str) -> DecisionOutput:
+        vector = None
+        if self.router:
+            local_result, vector = await self.router.aroute(query)
+            if local_result:
+                return local_result
+
+        result = await self.chain.ainvoke({"query": query})
+        if self.router and self.learn:
+            # Centroid update and log append stay off the event loop.
+            await asyncio.to_thread(self.router.record, query, result, vector)
+        return result
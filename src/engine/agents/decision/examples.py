@@ -0,0 +1,33 @@
+# Built-in seed examples. They are kept domain-neutral (greetings, general knowledge,
+# questions about "our" documents and policies), so that routing is not anchored on one
+# corpus; corpus-specific examples are loaded from DECISION_ROUTER_SEED_PATH.
+ROUTING_EXAMPLES = {
+    "direct": [
+        "Hello",
+        "Hi there!",
+        "Good morning, how are you?",
+        "Thanks a lot!",
+        "Who are you?",
+        "What can you do?",
+        "What is Python?",
+        "Explain what a REST API is.",
+        "How do I reverse a list in Python?",
+        "What is 15 times 12?",
+        "Write a short poem about the sea.",
+        "What is the difference between TCP and UDP?",
+    ],
+    "rag": [
+        "What does our internal policy say about remote work?",
+        "How is the compliance module configured?",
+        "What is the process for requesting vacation?",
+        "According to the documentation, how do we deploy the service?",
+        "What are the onboarding steps for new employees?",
+        "What do the uploaded documents say about this?",
+        "Summarize the main points of the document.",
+        "Where in the handbook are expenses explained?",
+        "Which section of the report covers the results?",
+        "What does the contract say about termination?",
+        "Find the part of the documentation about security.",
+        "What is described in the attached file?",
+    ],
+}
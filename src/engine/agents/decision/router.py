@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.engine.agents.decision.examples import ROUTING_EXAMPLES
+from src.engine.agents.decision.model import DecisionOutput
+from src.logger import logger
+
+class LocalRouter:
+    """
+    Embedding-based router that scores a query against the centroid of the
+    labeled examples for each strategy. It only answers when the best centroid
+    is similar enough and beats the runner-up by `min_margin`; otherwise the
+    caller falls back to the LLM.
+
+    Examples come from the built-in domain-neutral set, the corpus seed file
+    `seed_path` and the log of learned decisions `examples_path` (both JSON
+    lines with "query" and "decision").
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        examples_path: Optional[str] = None,
+        seed_path: Optional[str] = None,
+        min_similarity: float = 0.3,
+        min_margin: float = 0.1,
+        max_examples_per_label: int = 1000,
+    ):
+        self.embedding = embedding
+        self.examples_path = examples_path
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.max_examples_per_label = max_examples_per_label
+
+        self._sums: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        # Normalized queries already learned, and how many were learned per label.
+        self._learned: Set[str] = set()
+        self._learned_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "llm": 0, "learned": 0, "local_by_decision": {"direct": 0, "rag": 0}}
+
+        for decision, queries in ROUTING_EXAMPLES.items():
+            self._add_examples(decision, queries)
+        if seed_path:
+            self.load_seed_examples(seed_path)
+        if examples_path:
+            self.load_examples(examples_path)
+
+    def load_seed_examples(self, path: str):
+        """
+        Load corpus-specific examples. Unlike the learned log, the file must
+        exist, is never rewritten and does not count towards `max_examples_per_label`.
+        """
+        grouped: Dict[str, List[str]] = {}
+        with open(path, encoding="utf-8") as seed_file:
+            for line in seed_file:
+                if line.strip():
+                    record = json.loads(line)
+                    if record["decision"] not in ("direct", "rag"):
+                        raise ValueError(f"Unknown decision '{record['decision']}' in router seed file {path}.")
+                    grouped.setdefault(record["decision"], []).append(record["query"])
+
+        for decision, queries in grouped.items():
+            self._add_examples(decision, queries)
+            with self._lock:
+                # Known already, so not learned again from the LLM.
+                self._learned.update(self._normalize(query) for query in queries)
+        logger.info(f"Local router loaded {sum(len(q) for q in grouped.values())} seed examples from {path}.")
+
+    def load_examples(self, path: str):
+        """
+        Load logged decisions (JSON lines with "query" and "decision"), skipping
+        repeated queries and keeping at most `max_examples_per_label` per decision.
+        A log that held skipped lines is rewritten without them.
+        """
+        grouped: Dict[str, List[str]] = {}
+        lines = 0
+        try:
+            with open(path, encoding="utf-8") as examples_file:
+                for line in examples_file:
+                    if line.strip():
+                        lines += 1
+                        record = json.loads(line)
+                        if self._claim(record["query"], record["decision"]):
+                            grouped.setdefault(record["decision"], []).append(record["query"])
+        except FileNotFoundError:
+            return
+
+        for decision, queries in grouped.items():
+            self._add_examples(decision, queries)
+        kept = sum(len(q) for q in grouped.values())
+        if kept < lines:
+            self._rewrite_examples(path, grouped)
+        logger.info(f"Local router loaded {kept} logged examples from {path} ({lines - kept} duplicates or over the cap dropped).")
+
+    def _rewrite_examples(self, path: str, grouped: Dict[str, List[str]]):
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as examples_file:
+            for decision, queries in grouped.items():
+                for query in queries:
+                    examples_file.write(json.dumps({"query": query, "decision": decision}) + "\n")
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _claim(self, query: str, decision: str) -> bool:
+        """Reserve a learning slot for `query`: False if it is known or `decision` is full. Call under the lock."""
+        key = self._normalize(query)
+        if key in self._learned or self._learned_counts.get(decision, 0) >= self.max_examples_per_label:
+            return False
+        self._learned.add(key)
+        self._learned_counts[decision] = self._learned_counts.get(decision, 0) + 1
+        return True
+
+    def _add_examples(self, decision: str, queries: List[str]):
+        vectors = np.asarray(self.embedding.embed_documents(queries), dtype=np.float32)
+        self._add_vectors(decision, vectors)
+
+    def _add_vectors(self, decision: str, vectors: np.ndarray):
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        with self._lock:
+            self._sums[decision] = self._sums.get(decision, 0) + vectors.sum(axis=0)
+            self._counts[decision] = self._counts.get(decision, 0) + len(vectors)
+
+    def route(self, query: str) -> Tuple[Optional[DecisionOutput], List[float]]:
+        """The local decision (None to ask the LLM), and the query vector for `record`."""
+        vector = self.embedding.embed_query(query)
+        return self._classify(query, vector), vector
+
+    async def aroute(self, query: str) -> Tuple[Optional[DecisionOutput], List[float]]:
+        vector = await self.embedding.aembed_query(query)
+        return self._classify(query, vector), vector
+
+    def _classify(self, query: str, vector: List[float]) -> Optional[DecisionOutput]:
+        query_vector = np.asarray(vector, dtype=np.float32)
+        query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+
+        with self._lock:
+            scores = {}
+            for decision, total in self._sums.items():
+                centroid = total / max(float(np.linalg.norm(total)), 1e-12)
+                scores[decision] = float(centroid @ query_vector)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_decision, best_score = ranked[0]
+        margin = best_score - (ranked[1][1] if len(ranked) > 1 else 0.0)
+
+        if best_score < self.min_similarity or margin < self.min_margin:
+            with self._lock:
+                self.stats["llm"] += 1
+            return None
+
+        with self._lock:
+            self.stats["local"] += 1
+            self.stats["local_by_decision"][best_decision] = self.stats["local_by_decision"].get(best_decision, 0) + 1
+        return DecisionOutput(
+            decision=best_decision,
+            reason=f"Local router: closest to '{best_decision}' examples (similarity {best_score:.2f}, margin {margin:.2f}).",
+            search_terms=[query] if best_decision == "rag" else [],
+        )
+
+    def record(self, query: str, decision: DecisionOutput, vector: Optional[List[float]] = None):
+        """
+        Learn from an LLM decision and append it to the examples log, reusing the
+        query vector from `route` when given. Blocking; async callers run it in a thread.
+        """
+        with self._lock:
+            if not self._claim(query, decision.decision):
+                return
+        if vector is None:
+            vector = self.embedding.embed_query(query)
+        self._add_vectors(decision.decision, np.asarray([vector], dtype=np.float32))
+        with self._lock:
+            self.stats["learned"] += 1
+            if self.examples_path:
+                with open(self.examples_path, "a", encoding="utf-8") as examples_file:
+                    examples_file.write(json.dumps({"query": query, "decision": decision.decision}) + "\n")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = {**self.stats, "local_by_decision": dict(self.stats["local_by_decision"])}
+            counts = dict(self._counts)
+        total = stats["local"] + stats["llm"]
+        return {
+            **stats,
+            "local_hit_rate": round(stats["local"] / total, 4) if total else 0.0,
+            "examples": counts,
+            "min_similarity": self.min_similarity,
+            "min_margin": self.min_margin,
+        }
@@ -1,7 +1,4 @@
-DECISION_SYSTEM_PROMPT = """You are the **Decision Authority** of this multi-agent system.
-Your goal is to route the user's query to the correct processing strategy: **Direct LLM** or **RAG (Retrieval-Augmented Generation)**.
-
-### DECISION CRITERIA
+DECISION_CRITERIA = """### DECISION CRITERIA
 
 **1. USE 'DIRECT' STRATEGY IF:**
 - The query is a greeting, pleasantry, or social conversation.
@@ -13,7 +10,12 @@ Your goal is to route the user's query to the correct processing strategy: **Dir
 - The query implies looking up a file, rule, or specific entity not known to the general public.
 - You are unsure if the answer is general or private (err on the side of RAG).
 
-### OUTPUT FORMAT
+"""
+
+DECISION_SYSTEM_PROMPT = """You are the **Decision Authority** of this multi-agent system.
+Your goal is to route the user's query to the correct processing strategy: **Direct LLM** or **RAG (Retrieval-Augmented Generation)**.
+
+""" + DECISION_CRITERIA + """### OUTPUT FORMAT
 You must output a valid JSON object ONLY.
 
 Example for DIRECT:
@@ -1,11 +1,14 @@
+from typing import AsyncIterator
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from src.engine.llm import get_llm
+from src.metrics import instrumented
 
 class DirectAnswerAgent:
     def __init__(self):
-        self.llm = get_llm(temperature=0.7)
+        self.llm = get_llm("direct_answer", temperature=0.7)
         self.parser = StrOutputParser()
         
         self.prompt = ChatPromptTemplate.from_messages([
@@ -23,5 +26,14 @@ Keep your answers helpful but concise.
         
         self.chain = self.prompt | self.llm | self.parser
 
+    @instrumented("direct_answer")
     def invoke(self, query: str) -> str:
         return self.chain.invoke({"query": query})
+
+    @instrumented("direct_answer")
+    async def ainvoke(self, query: str) -> str:
+        return await self.chain.ainvoke({"query": query})
+
+    async def astream(self, query: str) -> AsyncIterator[str]:
+        async for token in self.chain.astream({"query": query}):
+            yield token
@@ -1,31 +1,60 @@
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
+from typing import Any, AsyncIterator, Tuple
+
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 
 from src.engine.agents.rag_answer.system_prompt import RAG_ANSWER_SYSTEM_PROMPT
 from src.engine.agents.rag_answer.model import RAGAnswerOutput
+from src.engine.agents.rag_answer.streaming import JsonStringFieldStreamer
+from src.engine.agents.structured import compile_prompt, structured_chain
 from src.engine.llm import get_llm
+from src.metrics import instrumented
+from src.config import LLM_STRUCTURED_OUTPUT
 
 class RAGAnswerAgent:
-    def __init__(self):
-        self.llm = get_llm()
+    def __init__(self, structured_output: str = LLM_STRUCTURED_OUTPUT):
+        self.llm = get_llm("rag_answer")
         self.parser = PydanticOutputParser(pydantic_object=RAGAnswerOutput)
         
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", RAG_ANSWER_SYSTEM_PROMPT),
-            ("human", """User Question:
+        self.prompt = compile_prompt(RAG_ANSWER_SYSTEM_PROMPT, """User Question:
 {question}
 
 Retrieved Context:
 {context}
 
-Analyze the context and provide the answer in JSON format:""")
-        ])
-        
-        self.chain = self.prompt | self.llm | self.parser
+Analyze the context and provide the answer in JSON format:""", self.parser, structured_output)
+
+        self.chain = structured_chain(self.prompt, self.llm, self.parser, structured_output)
+        # Streaming reads the raw JSON text; in native mode the API still enforces the schema.
+        stream_llm = self.llm.bind(response_format=RAGAnswerOutput) if structured_output == "native" else self.llm
+        self.text_chain = self.prompt | stream_llm | StrOutputParser()
 
+    @instrumented("rag_answer")
     def invoke(self, question: str, context: str) -> RAGAnswerOutput:
         return self.chain.invoke({
             "question": question,
             "context": context,
-            "format_instructions": self.parser.get_format_instructions()
         })
+
+    @instrumented("rag_answer")
+    async def ainvoke(self, question: str, context: str) -> RAGAnswerOutput:
+        return await self.chain.ainvoke({
+            "question": question,
+            "context": context,
+        })
+
+    async def astream(self, question: str, context: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream the answer as it is generated. Yields ("token", str) for each
+        new piece of the `answer` field, then ("result", RAGAnswerOutput) once
+        the full JSON has been parsed.
+        """
+        streamer = JsonStringFieldStreamer("answer")
+        async for chunk in self.text_chain.astream({
+            "question": question,
+            "context": context,
+        }):
+            token = streamer.feed(chunk)
+            if token:
+                yield "token", token
+
+        yield "result", self.parser.parse(streamer.buffer)
@@ -0,0 +1,58 @@
+import json
+import re
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally extracts the value of one top-level string field from a JSON
+    document that arrives in chunks, so it can be forwarded token by token
+    before the document is complete.
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self.buffer = ""
+        self.position = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the newly decoded part of the field value."""
+        self.buffer += chunk
+        if self.done:
+            return ""
+
+        if self.position is None:
+            match = self._key.search(self.buffer)
+            if not match:
+                return ""
+            self.position = match.end()
+
+        decoded = []
+        buffer, i = self.buffer, self.position
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char == "\\":
+                if i + 1 >= len(buffer):
+                    break
+                escape = buffer[i + 1]
+                if escape == "u":
+                    # Surrogate pairs arrive as two consecutive \uXXXX escapes.
+                    length = 12 if buffer[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else 6
+                    if i + length > len(buffer):
+                        break
+                    decoded.append(json.loads(f'"{buffer[i:i + length]}"'))
+                    i += length
+                    continue
+                decoded.append(_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            decoded.append(char)
+            i += 1
+
+        self.position = i
+        return "".join(decoded)
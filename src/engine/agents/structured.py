@@ -0,0 +1,29 @@
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+
+STRUCTURED_OUTPUT_MODES = ("native", "parser")
+
+def _check_mode(mode: str):
+    if mode not in STRUCTURED_OUTPUT_MODES:
+        raise ValueError(f"Unknown structured output mode '{mode}'. Expected one of {STRUCTURED_OUTPUT_MODES}.")
+
+def compile_prompt(system_prompt: str, human_template: str, parser: PydanticOutputParser, mode: str) -> ChatPromptTemplate:
+    """
+    Build an agent prompt whose system message is rendered once, at startup.
+    Only the "parser" mode puts the format instructions in it; "native" sends the
+    schema along with the call. The system message is fully static and comes
+    first, so providers can serve it from their prompt-prefix cache.
+    """
+    _check_mode(mode)
+    instructions = parser.get_format_instructions() if mode == "parser" else ""
+    system = system_prompt.format(format_instructions=instructions).rstrip() + "\n"
+    return ChatPromptTemplate.from_messages([SystemMessage(content=system), ("human", human_template)])
+
+def structured_chain(prompt: ChatPromptTemplate, llm: Runnable, parser: PydanticOutputParser, mode: str) -> Runnable:
+    """prompt -> model -> `parser.pydantic_object`, parsed by the model API ("native") or by `parser`."""
+    _check_mode(mode)
+    if mode == "native":
+        return prompt | llm.with_structured_output(parser.pydantic_object)
+    return prompt | llm | parser
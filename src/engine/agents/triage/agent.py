@@ -0,0 +1,89 @@
+from langchain_core.output_parsers import PydanticOutputParser
+
+from src.engine.agents.compliance.agent import ComplianceAgent
+from src.engine.agents.compliance.blocklist import normalize_text
+from src.engine.agents.compliance.model import ComplianceInput
+from src.engine.agents.structured import compile_prompt, structured_chain
+from src.engine.agents.triage.model import TriageOutput
+from src.engine.agents.triage.system_prompt import TRIAGE_SYSTEM_PROMPT
+from src.cache import LRUCache
+from src.engine.llm import get_llm
+from src.metrics import count_cache_lookup, instrumented
+from src.config import (
+    COMPLIANCE_VERDICT_CACHE_SIZE,
+    COMPLIANCE_VERDICT_CACHE_TTL_SECONDS,
+    LLM_STRUCTURED_OUTPUT,
+)
+
+class TriageAgent:
+    """
+    Compliance and routing in a single LLM call. The compliance agent's
+    heuristic check (length limit, blocklist) still runs first.
+    """
+    def __init__(self, compliance_agent: ComplianceAgent, structured_output: str = LLM_STRUCTURED_OUTPUT):
+        self.compliance_agent = compliance_agent
+        self.llm = get_llm("triage")
+        self.parser = PydanticOutputParser(pydantic_object=TriageOutput)
+        self.verdict_cache = LRUCache(
+            max_entries=COMPLIANCE_VERDICT_CACHE_SIZE,
+            ttl_seconds=COMPLIANCE_VERDICT_CACHE_TTL_SECONDS,
+        )
+
+        self.prompt = compile_prompt(TRIAGE_SYSTEM_PROMPT, """Input to Analyze:
+\"\"\"
+{query}
+\"\"\"
+
+Context/Metadata:
+- User Role: {user_role}
+
+Analyze the input above. JSON Output:""", self.parser, structured_output)
+
+        self.chain = structured_chain(self.prompt, self.llm, self.parser, structured_output)
+
+    def _heuristic_check(self, query: str):
+        heuristic_result = self.compliance_agent.heuristic_check(query)
+        if heuristic_result:
+            return TriageOutput(**heuristic_result.model_dump())
+        return None
+
+    def _cache_key(self, input_data: ComplianceInput):
+        return (normalize_text(input_data.query), input_data.user_role)
+
+    @instrumented("triage")
+    def invoke(self, input_data: ComplianceInput) -> TriageOutput:
+        heuristic_result = self._heuristic_check(input_data.query)
+        if heuristic_result:
+            return heuristic_result
+
+        cache_key = self._cache_key(input_data)
+        cached = self.verdict_cache.get(cache_key)
+        count_cache_lookup("triage_verdict", cached is not None)
+        if cached:
+            return cached.model_copy()
+
+        result = self.chain.invoke({
+            "query": input_data.query,
+            "user_role": input_data.user_role,
+        })
+        self.verdict_cache.put(cache_key, result)
+        return result
+
+    @instrumented("triage")
+    async def ainvoke(self, input_data: ComplianceInput) -> TriageOutput:
+        heuristic_result = self._heuristic_check(input_data.query)
+        if heuristic_result:
+            return heuristic_result
+
+        cache_key = self._cache_key(input_data)
+        cached = self.verdict_cache.get(cache_key)
+        count_cache_lookup("triage_verdict", cached is not None)
+        if cached:
+            return cached.model_copy()
+
+        result = await self.chain.ainvoke({
+            "query": input_data.query,
+            "user_role": input_data.user_role,
+        })
+        self.verdict_cache.put(cache_key, result)
+        return result
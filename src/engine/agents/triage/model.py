@@ -0,0 +1,23 @@
+from typing import List, Literal, Optional, Tuple
+from pydantic import Field
+
+from src.engine.agents.compliance.model import ComplianceOutput
+from src.engine.agents.decision.model import DecisionOutput
+
+class TriageOutput(ComplianceOutput):
+    decision: Optional[Literal["direct", "rag"]] = Field(None, description="The strategy to use if safe: 'direct' or 'rag'. Null if blocked.")
+    decision_reason: Optional[str] = Field(None, description="Explanation for the decision.")
+    search_terms: List[str] = Field(default_factory=list, description="Optimized search keywords if RAG is chosen, built from the sanitized query.")
+
+    def split(self) -> Tuple[ComplianceOutput, Optional[DecisionOutput]]:
+        """The compliance verdict and, for safe queries, the routing decision."""
+        compliance = ComplianceOutput(**self.model_dump(include=set(ComplianceOutput.model_fields)))
+        if not self.is_safe:
+            return compliance, None
+        # Same fallback as the decision prompt: when unsure, prefer RAG.
+        decision = DecisionOutput(
+            decision=self.decision or "rag",
+            reason=self.decision_reason or "No reason given.",
+            search_terms=self.search_terms,
+        )
+        return compliance, decision
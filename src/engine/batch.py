@@ -0,0 +1,218 @@
+import asyncio
+import time
+
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from src.config import BATCH_MAX_CONCURRENCY, BATCH_SEARCH_SIZE, BATCH_RETRIEVAL_WINDOW_SECONDS
+from src.engine.agents.decision.model import DecisionOutput
+from src.metrics import STAGE_SECONDS, count_response
+from src.logger import logger
+
+Key = Tuple[str, str]
+
+_DONE = object()
+
+class _PendingRAG(NamedTuple):
+    key: Key
+    safe_query: str
+    decision: DecisionOutput
+    vector: Optional[List[float]]
+    search_terms: List[str]
+
+class BatchRunner:
+    """
+    Answers a batch of (query, role) pairs through one Orchestrator:
+    1. Identical queries from the same role are answered once
+    2. Compliance and decision run for every query, at most `concurrency` at a time;
+       blocked and direct answers are emitted as soon as they are ready
+    3. RAG-routed queries are grouped as they are routed: a group is retrieved once it
+       has `search_size` unique search terms or `window` seconds after its first query,
+       with one batched embedding and vector search per group
+    4. RAG answers are generated, again bounded by `concurrency`
+
+    A failed retrieval only fails the queries of its group.
+
+    Speculative mode does not apply here; triage mode does.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        concurrency: int,
+        search_size: int = BATCH_SEARCH_SIZE,
+        window: float = BATCH_RETRIEVAL_WINDOW_SECONDS,
+    ):
+        self.orchestrator = orchestrator
+        self.concurrency = min(max(1, concurrency), BATCH_MAX_CONCURRENCY)
+        self.search_size = max(1, search_size)
+        self.window = window
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.groups: Dict[Key, List[int]] = {}
+        self.outcomes: Counter = Counter()
+        self.search_terms = 0
+        self.unique_search_terms = 0
+        self.retrieval_batches = 0
+        self.generation = None
+        self._carried: Optional[_PendingRAG] = None
+
+    async def run(self, items: List[Tuple[str, str]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields {"event": "result", "data": {"index", "response"}} per query, in
+        completion order, then one {"event": "summary", ...} with throughput.
+        """
+        started = time.perf_counter()
+        if self.orchestrator.cache is not None:
+            # Read once before any lookup: answers of a batch that overlaps an ingest are not cached.
+            self.generation = self.orchestrator.cache.generation
+        for index, (query, role) in enumerate(items):
+            self.groups.setdefault((query.strip(), role), []).append(index)
+        logger.info(f"Batch of {len(items)} queries ({len(self.groups)} unique), concurrency {self.concurrency}")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                key, response = item
+                for index in self.groups[key]:
+                    yield {"event": "result", "data": {"index": index, "response": response}}
+            await producer
+        finally:
+            producer.cancel()
+
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage="batch")
+        yield {"event": "summary", "data": {
+            "queries": len(items),
+            "unique_queries": len(self.groups),
+            "concurrency": self.concurrency,
+            "seconds": round(elapsed, 3),
+            "queries_per_second": round(len(items) / elapsed, 2) if elapsed else None,
+            "outcomes": dict(self.outcomes),
+            "search_terms": self.search_terms,
+            "unique_search_terms": self.unique_search_terms,
+            "retrieval_batches": self.retrieval_batches,
+        }}
+
+    async def _produce(self, queue: asyncio.Queue):
+        routed: asyncio.Queue = asyncio.Queue()
+
+        async def route_all():
+            try:
+                await asyncio.gather(*(self._route(key, queue, routed) for key in self.groups))
+            finally:
+                routed.put_nowait(_DONE)
+
+        router = asyncio.create_task(route_all())
+        retrievals = []
+        try:
+            more = True
+            while more:
+                group, more = await self._next_group(routed)
+                if group:
+                    retrievals.append(asyncio.create_task(self._answer_rag(group, queue)))
+            await router
+            await asyncio.gather(*retrievals)
+        finally:
+            router.cancel()
+            for task in retrievals:
+                task.cancel()
+            queue.put_nowait(_DONE)
+
+    async def _next_group(self, routed: asyncio.Queue) -> Tuple[List[_PendingRAG], bool]:
+        """
+        The next retrieval group: waits for a routed query, then for more until the
+        group would exceed `search_size` unique terms or the window closes.
+        Returns (group, whether more queries may follow).
+        """
+        loop = asyncio.get_running_loop()
+        group: List[_PendingRAG] = []
+        terms: set = set()
+        deadline = None
+        while True:
+            item, self._carried = self._carried, None
+            if item is None:
+                try:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    item = await asyncio.wait_for(routed.get(), timeout)
+                except asyncio.TimeoutError:
+                    return group, True
+            if item is _DONE:
+                return group, False
+
+            grown = terms.union(item.search_terms)
+            if group and len(grown) > self.search_size:
+                self._carried = item
+                return group, True
+            group.append(item)
+            terms = grown
+            if len(terms) >= self.search_size:
+                return group, True
+            if deadline is None:
+                deadline = loop.time() + self.window
+
+    async def _route(self, key: Key, queue: asyncio.Queue, routed: asyncio.Queue):
+        """Compliance and decision for one query; finishes it, or hands it to retrieval via `routed`."""
+        orchestrator = self.orchestrator
+        query, role = key
+        async with self.semaphore:
+            try:
+                checked = vector = None
+                if orchestrator.cache is not None:
+                    cached, checked, vector = await orchestrator._alookup(query, role)
+                    if cached:
+                        self._finish(queue, key, cached)
+                        return
+
+                blocked, safe_query, decision_result = await orchestrator._aroute(query, role, checked)
+                if blocked:
+                    self._finish(queue, key, blocked)
+                elif decision_result.decision == "direct":
+                    answer = await orchestrator.direct_agent.ainvoke(safe_query)
+                    self._finish(queue, key, orchestrator._direct_response(answer, decision_result), vector)
+                elif decision_result.decision == "rag":
+                    search_terms = decision_result.search_terms or [safe_query]
+                    routed.put_nowait(_PendingRAG(key, safe_query, decision_result, vector, search_terms))
+                else:
+                    self._finish(queue, key, orchestrator._unknown_strategy_response())
+            except Exception as e:
+                self._fail(queue, key, e)
+
+    async def _answer_rag(self, pending: List[_PendingRAG], queue: asyncio.Queue):
+        orchestrator = self.orchestrator
+        term_lists = [item.search_terms for item in pending]
+        self.search_terms += sum(len(terms) for terms in term_lists)
+        self.unique_search_terms += len({term for terms in term_lists for term in terms})
+        self.retrieval_batches += 1
+
+        try:
+            contexts = await orchestrator.retriever.asearch_many(term_lists)
+        except Exception as e:
+            for item in pending:
+                self._fail(queue, item.key, e)
+            return
+
+        async def answer(item: _PendingRAG, context):
+            async with self.semaphore:
+                try:
+                    rag_result = await orchestrator.rag_agent.ainvoke(item.safe_query, context.text)
+                    response = orchestrator._rag_response(rag_result, item.decision, context.stats)
+                    self._finish(queue, item.key, response, item.vector)
+                except Exception as e:
+                    self._fail(queue, item.key, e)
+
+        await asyncio.gather(*(answer(item, context) for item, context in zip(pending, contexts)))
+
+    def _finish(self, queue: asyncio.Queue, key: Key, response: Dict[str, Any], vector: Optional[List[float]] = None):
+        if vector is not None and self.orchestrator.cache is not None:
+            self.orchestrator.cache.store(vector, key[1], response, self.generation)
+        count_response(response)
+        self.outcomes[response.get("strategy") or response.get("status")] += len(self.groups[key])
+        queue.put_nowait((key, response))
+
+    def _fail(self, queue: asyncio.Queue, key: Key, error: Exception):
+        logger.error(f"Batch query failed: {error}")
+        self._finish(queue, key, {"status": "error", "message": str(error)})
@@ -0,0 +1,144 @@
+import copy
+import json
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.rag.events import on_ingest
+from src.metrics import count_cache_lookup
+from src.logger import logger
+
+class SemanticCache:
+    """
+    Response cache keyed on the query embedding. A lookup hits when a stored
+    query for the same user role lies within `max_distance` (cosine distance).
+    Entries expire after `ttl_seconds` and are evicted least-recently-used
+    once `max_entries` or `max_bytes` is exceeded.
+
+    Every ingest into the collection bumps `generation`. Callers read it
+    before their lookup and pass it to store(), so a RAG answer computed
+    from the collection as it was before an ingest is not cached after the
+    ingest invalidated its peers.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "documents",
+        max_distance: float = 0.05,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.collection_name = collection_name
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "stale_stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+        on_ingest(self._on_ingest)
+
+    def lookup(self, vector: List[float], user_role: str) -> Optional[Dict[str, Any]]:
+        query = self._normalize(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+            candidates = [(entry_id, entry) for entry_id, entry in self._entries.items() if entry["user_role"] == user_role]
+            if candidates:
+                matrix = np.stack([entry["vector"] for _, entry in candidates])
+                similarities = matrix @ query
+                best = int(np.argmax(similarities))
+                distance = 1.0 - float(similarities[best])
+                if distance <= self.max_distance:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.stats["hits"] += 1
+                    count_cache_lookup("semantic", True)
+                    response = copy.deepcopy(entry["response"])
+                    response["cache"] = {"hit": True, "distance": round(distance, 4)}
+                    return response
+
+            self.stats["misses"] += 1
+            count_cache_lookup("semantic", False)
+            return None
+
+    def store(self, vector: List[float], user_role: str, response: Dict[str, Any], generation: Optional[int] = None):
+        """Cache `response`; a RAG answer is dropped if an ingest happened since `generation` was read."""
+        if response.get("status") != "success":
+            return
+
+        response = {key: value for key, value in response.items() if key not in ("cache", "speculation", "context")}
+        size = len(json.dumps(response, default=str)) + len(vector) * 4
+
+        with self._lock:
+            if generation is not None and generation != self.generation and response.get("strategy") == "rag":
+                self.stats["stale_stores"] += 1
+                return
+            self._entries[self._next_id] = {
+                "vector": self._normalize(vector),
+                "user_role": user_role,
+                "strategy": response.get("strategy"),
+                "response": response,
+                "size": size,
+                "created": time.monotonic(),
+            }
+            self._next_id += 1
+            self._bytes += size
+            self.stats["stores"] += 1
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def invalidate(self, strategy: Optional[str] = None) -> int:
+        with self._lock:
+            stale = [entry_id for entry_id, entry in self._entries.items() if strategy is None or entry["strategy"] == strategy]
+            for entry_id in stale:
+                self._remove(entry_id)
+            self.stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_distance": self.max_distance,
+            }
+
+    def _on_ingest(self, collection_name: str):
+        if collection_name == self.collection_name:
+            with self._lock:
+                self.generation += 1
+            removed = self.invalidate(strategy="rag")
+            logger.info(f"Semantic cache: invalidated {removed} RAG entries after ingest into '{collection_name}'.")
+
+    def _expire(self, now: float):
+        expired = [entry_id for entry_id, entry in self._entries.items() if now - entry["created"] > self.ttl_seconds]
+        for entry_id in expired:
+            self._remove(entry_id)
+        self.stats["expirations"] += len(expired)
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._bytes -= entry["size"]
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
@@ -0,0 +1,238 @@
+import math
+
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.logger import logger
+
+NO_CONTEXT = "No relevant documents found."
+SEPARATOR = "\n\n"
+
+# Chunks overlap by up to chunk_overlap (200) characters; shorter matches are not treated as overlap.
+MIN_OVERLAP_CHARS = 50
+MAX_OVERLAP_CHARS = 400
+
+class PackedContext(NamedTuple):
+    text: str
+    stats: Optional[Dict[str, int]]
+
+@lru_cache(maxsize=None)
+def load_encoding(model: str):
+    """The tiktoken encoding of `model`; fails when it is neither cached nor downloadable."""
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        raise RuntimeError(
+            f"Tokenizer for {model} unavailable ({e}). Run `python -m src.assets` to cache it, "
+            "or set CONTEXT_TOKEN_COUNTING=estimate to count characters/4."
+        ) from e
+
+def count_tokens(text: str, encoding=None) -> int:
+    """Tokens of `text` with `encoding`, or a characters/4 estimate without one."""
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int, encoding=None) -> str:
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+def format_document(doc: Document, text: Optional[str] = None) -> str:
+    content = doc.page_content if text is None else text
+    return f"Source: {doc.metadata.get('source', 'unknown')}\nContent: {content}"
+
+def overlap_length(previous: str, text: str) -> int:
+    """Length of the longest suffix of `previous` that is also a prefix of `text`."""
+    probe = text[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+
+    tail = previous[-MAX_OVERLAP_CHARS:]
+    start = tail.find(probe)
+    while start != -1:
+        if text.startswith(tail[start:]):
+            return len(tail) - start
+        start = tail.find(probe, start + 1)
+    return 0
+
+def _unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else None
+
+class _Candidate:
+    __slots__ = ("doc", "score", "vector", "text")
+
+    def __init__(self, doc: Document):
+        self.doc = doc
+        self.score = float(doc.metadata.get("_score") or 0.0)
+        self.vector = _unit(doc.metadata.get("_vector"))
+        self.text = doc.page_content
+
+class ContextPacker:
+    """
+    Assemble the RAG context under a token budget. Candidates are picked by
+    maximal marginal relevance (score vs. similarity to what is already
+    picked); near-duplicates are dropped and text shared with an already
+    picked chunk of the same source (splitter overlap) is trimmed.
+
+    `token_counting` picks how tokens are counted:
+    - "tokenizer": with the `tokenizer_model` encoding, loaded here so that a
+      missing tokenizer fails at startup
+    - "estimate": characters/4, without loading it
+    - "auto": the encoding if it can be loaded, else the estimate (with a warning)
+    """
+    def __init__(
+        self,
+        max_tokens: int,
+        mmr_lambda: float = 0.7,
+        duplicate_similarity: float = 0.95,
+        tokenizer_model: str = "gpt-4o",
+        token_counting: str = "tokenizer",
+    ):
+        if token_counting not in ("tokenizer", "estimate", "auto"):
+            raise ValueError(f"Unknown token counting '{token_counting}'. Use tokenizer, estimate or auto.")
+        self.max_tokens = max_tokens
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_similarity = duplicate_similarity
+        self.tokenizer_model = tokenizer_model
+        self.encoding = None
+        if token_counting == "tokenizer":
+            self.encoding = load_encoding(tokenizer_model)
+        elif token_counting == "auto":
+            try:
+                self.encoding = load_encoding(tokenizer_model)
+            except RuntimeError as e:
+                logger.warning(f"{e} Estimating context tokens as characters/4.")
+
+    def pack(self, docs: List[Document]) -> PackedContext:
+        candidates = self._unique(docs)
+        stats = {
+            "candidates": len(candidates),
+            "selected": 0,
+            "duplicates_dropped": 0,
+            "overlaps_trimmed": 0,
+            "over_budget": 0,
+            "tokens_before": self._tokens(SEPARATOR.join(format_document(c.doc) for c in candidates)) if candidates else 0,
+        }
+
+        selected: List[_Candidate] = []
+        used = 0
+        pool = list(candidates)
+        while pool:
+            candidate = max(pool, key=lambda c: self._mmr(c, selected))
+            pool.remove(candidate)
+
+            if self._is_duplicate(candidate, selected):
+                stats["duplicates_dropped"] += 1
+                continue
+
+            text, trimmed = self._trim_overlaps(candidate, selected)
+            if text is None:
+                stats["duplicates_dropped"] += 1
+                continue
+
+            tokens = self._tokens(format_document(candidate.doc, text)) + (self._tokens(SEPARATOR) if selected else 0)
+            if used + tokens > self.max_tokens:
+                stats["over_budget"] += 1
+                continue
+
+            candidate.text = text
+            stats["overlaps_trimmed"] += trimmed
+            selected.append(candidate)
+            used += tokens
+
+        if not selected and candidates:
+            # Even the best chunk is over budget: keep a copy truncated to what the budget leaves after its header.
+            best = candidates[0]
+            text = self._truncate_to_budget(best)
+            if text:
+                best.text = text
+                selected.append(best)
+                stats["over_budget"] -= 1
+
+        text = SEPARATOR.join(format_document(c.doc, c.text) for c in selected) or NO_CONTEXT
+        stats["selected"] = len(selected)
+        stats["tokens_after"] = self._tokens(text) if selected else 0
+        stats["tokens_saved"] = max(0, stats["tokens_before"] - stats["tokens_after"])
+        logger.info(
+            f"Context packed: {stats['selected']}/{stats['candidates']} chunks, "
+            f"{stats['tokens_before']} -> {stats['tokens_after']} tokens (saved {stats['tokens_saved']})"
+        )
+        return PackedContext(text, stats)
+
+    def _tokens(self, text: str) -> int:
+        return count_tokens(text, self.encoding)
+
+    def _truncate_to_budget(self, candidate: _Candidate) -> str:
+        """The longest prefix of the candidate's text that fits the budget with its header, or ""."""
+        limit = self.max_tokens - self._tokens(format_document(candidate.doc, ""))
+        while limit > 0:
+            text = truncate_tokens(candidate.text, limit, self.encoding)
+            # Tokens can merge across the header boundary, so check the formatted result.
+            if self._tokens(format_document(candidate.doc, text)) <= self.max_tokens:
+                return text
+            limit -= 1
+        return ""
+
+    @staticmethod
+    def _unique(docs: List[Document]) -> List[_Candidate]:
+        """One candidate per point (best score wins), highest score first."""
+        best: Dict[Any, _Candidate] = {}
+        for doc in docs:
+            candidate = _Candidate(doc)
+            key = doc.metadata.get("_id", doc.page_content)
+            if key not in best or candidate.score > best[key].score:
+                best[key] = candidate
+        return sorted(best.values(), key=lambda c: c.score, reverse=True)
+
+    def _mmr(self, candidate: _Candidate, selected: List[_Candidate]) -> float:
+        redundancy = max((self._similarity(candidate, other) for other in selected), default=0.0)
+        return self.mmr_lambda * candidate.score - (1 - self.mmr_lambda) * redundancy
+
+    @staticmethod
+    def _similarity(a: _Candidate, b: _Candidate) -> float:
+        if a.vector is None or b.vector is None:
+            return 0.0
+        return float(np.dot(a.vector, b.vector))
+
+    def _is_duplicate(self, candidate: _Candidate, selected: List[_Candidate]) -> bool:
+        return any(self._similarity(candidate, other) >= self.duplicate_similarity for other in selected)
+
+    @staticmethod
+    def _trim_overlaps(candidate: _Candidate, selected: List[_Candidate]):
+        """
+        Remove text the candidate shares with picked chunks of the same source.
+        Returns (text, number of overlaps trimmed), or (None, 0) when nothing
+        new is left.
+        """
+        text = candidate.text
+        trimmed = 0
+        source = candidate.doc.metadata.get("source")
+        for other in selected:
+            if other.doc.metadata.get("source") != source:
+                continue
+            original = other.doc.page_content
+            if text in original:
+                return None, 0
+
+            head = overlap_length(original, text)
+            if head:
+                text = text[head:].lstrip()
+                trimmed += 1
+            tail = overlap_length(text, original)
+            if tail:
+                text = text[:-tail].rstrip()
+                trimmed += 1
+
+        if trimmed and len(text) < MIN_OVERLAP_CHARS:
+            return None, 0
+        return text, trimmed
@@ -1,4 +1,370 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_openai import ChatOpenAI
 
-def get_llm(model: str = "gpt-4o", temperature: float = 0):
-    return ChatOpenAI(model=model, temperature=temperature)
+from src.config import (
+    LLM_PROMPT_PRICE_PER_1K,
+    LLM_COMPLETION_PRICE_PER_1K,
+    LLM_QUALITY_MODEL,
+    LLM_FAST_MODEL,
+    LLM_AGENT_TIERS,
+    LLM_FALLBACK_MODEL,
+    LLM_QUALITY_TIMEOUT_SECONDS,
+    LLM_FAST_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_MIN_SECONDS,
+    LLM_LATENCY_WINDOW,
+)
+from src.metrics import LLM_CALLS, LLM_TOKENS, LLM_COST, LLM_SECONDS, LLM_HEDGES, LLM_FALLBACKS
+from src.logger import logger
+
+TIERS = {
+    "quality": (LLM_QUALITY_MODEL, LLM_QUALITY_TIMEOUT_SECONDS),
+    "fast": (LLM_FAST_MODEL, LLM_FAST_TIMEOUT_SECONDS),
+}
+
+class LLMUsageHandler(BaseCallbackHandler):
+    """Counts calls, tokens and estimated cost of every LLM call it is attached to."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def on_llm_end(self, response, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+        if not prompt_tokens and not completion_tokens:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+
+        LLM_CALLS.inc(model=self.model)
+        LLM_TOKENS.inc(prompt_tokens, model=self.model, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, model=self.model, type="completion")
+        LLM_COST.inc(
+            prompt_tokens / 1000 * LLM_PROMPT_PRICE_PER_1K + completion_tokens / 1000 * LLM_COMPLETION_PRICE_PER_1K,
+            model=self.model,
+        )
+
+class LatencyTracker:
+    """
+    Sliding window of recent call durations per model. hedge_delay() is the
+    window's LLM_HEDGE_QUANTILE (never below `min_seconds`), or None until
+    `min_samples` calls have been seen.
+    """
+
+    def __init__(
+        self,
+        window: int = LLM_LATENCY_WINDOW,
+        quantile: float = LLM_HEDGE_QUANTILE,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        min_seconds: float = LLM_HEDGE_MIN_SECONDS,
+    ):
+        self.window = window
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_seconds = min_seconds
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model: str, quantile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        with self._lock:
+            count = len(self._samples.get(model, ()))
+        if count < self.min_samples:
+            return None
+        return max(self.min_seconds, self.percentile(model, self.quantile))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            models = list(self._samples)
+        return {
+            model: {
+                "samples": len(self._samples[model]),
+                "p50_seconds": self.percentile(model, 0.5),
+                "p95_seconds": self.percentile(model, 0.95),
+                "hedge_after_seconds": self.hedge_delay(model),
+            }
+            for model in models
+        }
+
+LATENCY = LatencyTracker()
+
+# Runs sync calls so they can be hedged. Each call carries its remaining deadline
+# as the client's request timeout, so an abandoned call frees its worker by then.
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm")
+
+class _SyncAttempt:
+    """
+    One sync call on _EXECUTOR. The caller cannot cancel it, so abandon() marks
+    it instead: it then records its latency as a cancelled async call would,
+    its elapsed time at abandonment capped at `cancelled_cap` (nothing if None).
+    """
+
+    def __init__(self, llm: "LatencyAwareLLM", input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any], timeout: float, cancelled_cap: Optional[float]):
+        self.llm = llm
+        self.timeout = timeout
+        self.cancelled_cap = cancelled_cap
+        self.abandoned_at: Optional[float] = None
+        self.started = time.perf_counter()
+        self.future = _EXECUTOR.submit(contextvars.copy_context().run, self._run, input, config, {**kwargs, "timeout": timeout})
+
+    def _run(self, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any]) -> Any:
+        try:
+            result = self.llm.primary.invoke(input, config, **kwargs)
+        except Exception:
+            if self.abandoned_at is None and time.perf_counter() - self.started >= self.timeout:
+                # Ended by its request timeout, i.e. at the caller's deadline, possibly just
+                # before the caller gave up on it: count it as abandoned there.
+                self.abandoned_at = time.perf_counter()
+            self._record_abandoned()
+            raise
+        if self.abandoned_at is not None:
+            self._record_abandoned()
+            return result
+        elapsed = time.perf_counter() - self.started
+        self.llm.tracker.record(self.llm.model, elapsed)
+        LLM_SECONDS.observe(elapsed, model=self.llm.model)
+        return result
+
+    def _record_abandoned(self):
+        if self.abandoned_at is not None and self.cancelled_cap is not None:
+            self.llm.tracker.record(self.llm.model, min(self.abandoned_at - self.started, self.cancelled_cap))
+
+    def abandon(self):
+        if not self.future.done():
+            self.abandoned_at = time.perf_counter()
+
+class LatencyAwareLLM(Runnable):
+    """
+    Chat model wrapper used by every agent in place of the bare client:
+    1. Each call must finish within `timeout` seconds
+    2. When it outlasts the model's hedge delay (see LatencyTracker), an
+       identical request is sent and the first answer wins
+    3. If the call fails or times out, it is retried once on `fallback`
+
+    Streams get the deadline and the fallback up to their first chunk, but are
+    never hedged. Call durations feed `tracker`, including calls cut short by
+    a hedge or the deadline, so slow calls keep counting towards the quantile.
+    """
+
+    def __init__(
+        self,
+        primary: Runnable,
+        model: str,
+        timeout: float,
+        fallback: Optional[Runnable] = None,
+        fallback_model: Optional[str] = None,
+        tracker: LatencyTracker = LATENCY,
+        hedge: bool = LLM_HEDGE_ENABLED,
+    ):
+        self.primary = primary
+        self.model = model
+        self.timeout = timeout
+        self.fallback = fallback
+        self.fallback_model = fallback_model
+        self.tracker = tracker
+        self.hedge = hedge
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "LatencyAwareLLM":
+        """The same client, returning `schema` instances through the models' native structured output."""
+        return LatencyAwareLLM(
+            self.primary.with_structured_output(schema, **kwargs),
+            model=self.model,
+            timeout=self.timeout,
+            fallback=self.fallback.with_structured_output(schema, **kwargs) if self.fallback is not None else None,
+            fallback_model=self.fallback_model,
+            tracker=self.tracker,
+            hedge=self.hedge,
+        )
+
+    def _hedge_delay(self) -> Optional[float]:
+        delay = self.tracker.hedge_delay(self.model) if self.hedge else None
+        return delay if delay is not None and delay < self.timeout else None
+
+    def _falling_back(self, error: BaseException):
+        reason = "timeout" if isinstance(error, (asyncio.TimeoutError, TimeoutError)) else "error"
+        LLM_FALLBACKS.inc(model=self.model, reason=reason)
+        logger.warning(f"LLM {self.model} {reason} ({error!r}); falling back to {self.fallback_model}")
+
+    async def _timed_ainvoke(
+        self, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any], cancelled_cap: Optional[float] = float("inf")
+    ) -> Any:
+        """A cancelled call records its elapsed time capped at `cancelled_cap`, or nothing when that is None."""
+        started = time.perf_counter()
+        try:
+            result = await self.primary.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            if cancelled_cap is not None:
+                self.tracker.record(self.model, min(time.perf_counter() - started, cancelled_cap))
+            raise
+        elapsed = time.perf_counter() - started
+        self.tracker.record(self.model, elapsed)
+        LLM_SECONDS.observe(elapsed, model=self.model)
+        return result
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        try:
+            return self._hedged_invoke(input, config, kwargs)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            self._falling_back(e)
+            return self.fallback.invoke(input, config, **{**kwargs, "timeout": self.timeout})
+
+    def _hedged_invoke(self, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any]) -> Any:
+        """Sync counterpart of _hedged_ainvoke, with the same latency recording."""
+        deadline = time.perf_counter() + self.timeout
+        delay = self._hedge_delay()
+        primary = _SyncAttempt(self, input, config, kwargs, self.timeout, cancelled_cap=float("inf") if delay is None else delay)
+        attempts = [primary]
+        try:
+            if delay is not None:
+                done, _ = wait({primary.future}, timeout=delay)
+                if not done:
+                    attempts.append(_SyncAttempt(self, input, config, kwargs, deadline - time.perf_counter(), cancelled_cap=None))
+
+            pending = {attempt.future for attempt in attempts}
+            while pending:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"{self.model} did not answer within {self.timeout}s")
+                for future in done:
+                    if future.exception() is None:
+                        if len(attempts) > 1:
+                            LLM_HEDGES.inc(model=self.model, winner="primary" if future is primary.future else "hedge")
+                        return future.result()
+            if len(attempts) > 1:
+                LLM_HEDGES.inc(model=self.model, winner="none")
+            # Every attempt failed: surface the primary's error.
+            return primary.future.result()
+        finally:
+            for attempt in attempts:
+                attempt.abandon()
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        try:
+            return await asyncio.wait_for(self._hedged_ainvoke(input, config, kwargs), self.timeout)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            self._falling_back(e)
+            return await asyncio.wait_for(self.fallback.ainvoke(input, config, **kwargs), self.timeout)
+
+    async def _hedged_ainvoke(self, input: Any, config: Optional[RunnableConfig], kwargs: Dict[str, Any]) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._timed_ainvoke(input, config, kwargs)
+
+        # A primary beaten by its hedge counts as taking the hedge delay: recording
+        # its full elapsed time would push the quantile, and the delay, up on every hedge.
+        primary = asyncio.create_task(self._timed_ainvoke(input, config, kwargs, cancelled_cap=delay))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.create_task(self._timed_ainvoke(input, config, kwargs, cancelled_cap=None))
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        LLM_HEDGES.inc(model=self.model, winner="primary" if task is primary else "hedge")
+                        return task.result()
+            LLM_HEDGES.inc(model=self.model, winner="none")
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        chunks = self.primary.stream(input, config, **kwargs)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            return
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            self._falling_back(e)
+            yield from self.fallback.stream(input, config, **kwargs)
+            return
+        yield first
+        yield from chunks
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        chunks = self.primary.astream(input, config, **kwargs)
+        try:
+            first = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            await chunks.aclose()
+            if self.fallback is None:
+                raise
+            self._falling_back(e)
+            async for chunk in self.fallback.astream(input, config, **kwargs):
+                yield chunk
+            return
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+def chat_model(model: str, temperature: float = 0, timeout: Optional[float] = None) -> Runnable:
+    # stream_usage makes streamed answers report their token counts too.
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        timeout=timeout,
+        max_retries=LLM_MAX_RETRIES,
+        stream_usage=True,
+        callbacks=[LLMUsageHandler(model)],
+    )
+
+def get_llm(agent: str = "default", temperature: float = 0) -> LatencyAwareLLM:
+    """The client for `agent`: its tier's model and deadline, with hedging and a fallback model."""
+    tier = LLM_AGENT_TIERS.get(agent, "quality")
+    if tier not in TIERS:
+        raise ValueError(f"Unknown LLM tier '{tier}' for agent '{agent}'. Expected one of {sorted(TIERS)}.")
+    model, timeout = TIERS[tier]
+
+    fallback_model = LLM_FALLBACK_MODEL
+    if fallback_model is None:
+        fallback_model = LLM_FAST_MODEL if tier == "quality" else LLM_QUALITY_MODEL
+    fallback = chat_model(fallback_model, temperature, timeout) if fallback_model.lower() != "none" else None
+
+    return LatencyAwareLLM(
+        chat_model(model, temperature, timeout),
+        model=model,
+        timeout=timeout,
+        fallback=fallback,
+        fallback_model=fallback_model if fallback is not None else None,
+    )
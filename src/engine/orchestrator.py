@@ -1,85 +1,449 @@
+import asyncio
 import json
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
 from src.engine.agents.compliance.agent import ComplianceAgent
 from src.engine.agents.decision.agent import DecisionAgent
+from src.engine.agents.decision.router import LocalRouter
 from src.engine.agents.direct_answer.agent import DirectAnswerAgent
 from src.engine.agents.rag_answer.agent import RAGAnswerAgent
+from src.engine.agents.triage.agent import TriageAgent
 
-from src.engine.agents.compliance.model import ComplianceInput
+from src.engine.agents.compliance.model import ComplianceInput, ComplianceOutput
+from src.engine.agents.decision.model import DecisionOutput
+from src.engine.agents.rag_answer.model import RAGAnswerOutput
+from src.engine.batch import BatchRunner
+from src.engine.cache import SemanticCache
 from src.engine.retriever import EngineRetriever
+from src.engine.speculation import SpeculationReport, SpeculativeTask
+from src.metrics import count_response, instrumented
+from src.config import (
+    ORCHESTRATOR_MODE,
+    BATCH_CONCURRENCY,
+    DECISION_ROUTER_ENABLED,
+    DECISION_ROUTER_EXAMPLES_PATH,
+    DECISION_ROUTER_SEED_PATH,
+    DECISION_ROUTER_MIN_SIMILARITY,
+    DECISION_ROUTER_MIN_MARGIN,
+    DECISION_ROUTER_LEARN,
+    DECISION_ROUTER_MAX_EXAMPLES_PER_LABEL,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_DISTANCE,
+    SEMANTIC_CACHE_TTL_SECONDS,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_MAX_MB,
+)
 from src.logger import logger
+from src.tracing import loggable
+
+# Result of the compliance step: the verdict, and the routing decision when triage made it.
+Checked = Tuple[ComplianceOutput, Optional[DecisionOutput]]
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None):
         logger.info("Initializing Orchestrator and sub-agents...")
+        self.mode = mode or ORCHESTRATOR_MODE
+        self.retriever = EngineRetriever()
+        self.embedding = self.retriever.rag_retriever.embedding
+
+        self.router = None
+        if DECISION_ROUTER_ENABLED:
+            self.router = LocalRouter(
+                self.embedding,
+                examples_path=DECISION_ROUTER_EXAMPLES_PATH,
+                seed_path=DECISION_ROUTER_SEED_PATH,
+                min_similarity=DECISION_ROUTER_MIN_SIMILARITY,
+                min_margin=DECISION_ROUTER_MIN_MARGIN,
+                max_examples_per_label=DECISION_ROUTER_MAX_EXAMPLES_PER_LABEL,
+            )
+
         self.compliance_agent = ComplianceAgent()
-        self.decision_agent = DecisionAgent()
+        self.decision_agent = DecisionAgent(router=self.router, learn=DECISION_ROUTER_LEARN)
         self.direct_agent = DirectAnswerAgent()
         self.rag_agent = RAGAnswerAgent()
+        self.triage_agent = TriageAgent(self.compliance_agent) if self.mode == "triage" else None
 
-        self.retriever = EngineRetriever()
+        self.cache = None
+        if SEMANTIC_CACHE_ENABLED:
+            self.cache = SemanticCache(
+                collection_name=self.retriever.rag_retriever.collection_name,
+                max_distance=SEMANTIC_CACHE_MAX_DISTANCE,
+                ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+                max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                max_bytes=int(SEMANTIC_CACHE_MAX_MB * 1024 * 1024),
+            )
         logger.info("Orchestrator initialized.")
 
+    @instrumented("request", on_result=count_response)
     def run(self, query: str, user_role: str = "standard") -> Dict[str, Any]:
         """
-        Main execution flow:
-        1. Compliance Check
-        2. Decision Making (Direct vs RAG)
-        3. Execution & Answer Generation
+        Entry point for the sync flow. When the semantic cache is enabled, a
+        near-identical earlier query from the same role is answered from it.
+        The full compliance check always runs first, and the cache is keyed on
+        the sanitized query.
+        """
+        if self.cache is None:
+            return self._run(query, user_role)
+
+        checked = self._comply(query, user_role)
+        compliance_result = checked[0]
+        if not compliance_result.is_safe:
+            return self._blocked_response(compliance_result)
+
+        generation = self.cache.generation
+        vector = self.embedding.embed_query(compliance_result.sanitized_query or query)
+        cached = self.cache.lookup(vector, user_role)
+        if cached:
+            logger.info("Semantic cache hit.")
+            return cached
+
+        response = self._run(query, user_role, checked)
+        self.cache.store(vector, user_role, response, generation)
+        return response
+
+    @instrumented("request", on_result=count_response)
+    async def arun(self, query: str, user_role: str = "standard") -> Dict[str, Any]:
+        """Async counterpart of run()."""
+        if self.cache is None:
+            return await self._arun(query, user_role)
+
+        generation = self.cache.generation
+        cached, checked, vector = await self._alookup(query, user_role)
+        if cached:
+            return cached
+
+        response = await self._arun(query, user_role, checked)
+        self.cache.store(vector, user_role, response, generation)
+        return response
+
+    async def _alookup(self, query: str, user_role: str) -> Tuple[Optional[Dict[str, Any]], Optional[Checked], Optional[List[float]]]:
         """
-        logger.info(f"--- New Request: {query} (Role: {user_role}) ---")
+        Compliance, then the semantic cache lookup keyed on the sanitized query.
+        Returns (blocked or cached response, None, None), else
+        (None, compliance results, query vector).
+        """
+        checked = await self._acomply(query, user_role)
+        compliance_result = checked[0]
+        if not compliance_result.is_safe:
+            return self._blocked_response(compliance_result), None, None
+
+        vector = await self.embedding.aembed_query(compliance_result.sanitized_query or query)
+        cached = self.cache.lookup(vector, user_role)
+        if cached:
+            logger.info("Semantic cache hit.")
+            return cached, None, None
+        return None, checked, vector
 
+    def _comply(self, query: str, user_role: str) -> Checked:
+        """Step 1 (steps 1-2 in triage mode): the compliance verdict, and the decision if triage made it."""
+        compliance_input = ComplianceInput(query=query, user_role=user_role)
+        if self.triage_agent:
+            logger.info("Step 1-2: Triage (Compliance + Decision)")
+            return self.triage_agent.invoke(compliance_input).split()
         logger.info("Step 1: Compliance Check")
+        return self.compliance_agent.invoke(compliance_input), None
+
+    async def _acomply(self, query: str, user_role: str) -> Checked:
+        """Async counterpart of _comply()."""
         compliance_input = ComplianceInput(query=query, user_role=user_role)
-        compliance_result = self.compliance_agent.invoke(compliance_input)
+        if self.triage_agent:
+            logger.info("Step 1-2: Triage (Compliance + Decision)")
+            return (await self.triage_agent.ainvoke(compliance_input)).split()
+        logger.info("Step 1: Compliance Check")
+        return await self.compliance_agent.ainvoke(compliance_input), None
 
+    def _run(self, query: str, user_role: str = "standard", checked: Optional[Checked] = None) -> Dict[str, Any]:
+        """
+        Main execution flow:
+        1. Compliance Check (skipped when `checked` already holds its result)
+        2. Decision Making (Direct vs RAG)
+        3. Execution & Answer Generation
+        """
+        logger.info(f"--- New Request: {loggable(query)} (Role: {user_role}) ---")
+
+        compliance_result, decision_result = checked or self._comply(query, user_role)
         if not compliance_result.is_safe:
-            logger.warning(f"Compliance Blocked: {compliance_result.reason}")
-            return {
-                "status": "blocked",
-                "reason": compliance_result.reason,
-                "category": compliance_result.category,
-                "risk_level": compliance_result.risk_level,
-                "answer": f"I cannot answer that request. Reason: {compliance_result.reason}"
-            }
+            return self._blocked_response(compliance_result)
         
         safe_query = compliance_result.sanitized_query or query
-        logger.info(f"Query is safe. Proceeding with: '{safe_query}'")
+        logger.info(f"Query is safe. Proceeding with: '{loggable(safe_query)}'")
 
-        logger.info("Step 2: Decision Making")
-        decision_result = self.decision_agent.invoke(safe_query)
+        if decision_result is None:
+            logger.info("Step 2: Decision Making")
+            decision_result = self.decision_agent.invoke(safe_query)
         strategy = decision_result.decision
         logger.info(f"Decision: {strategy.upper()} (Reason: {decision_result.reason})")
 
         if strategy == "direct":
             logger.info("Step 3: Executing Direct Strategy")
             answer = self.direct_agent.invoke(safe_query)
-            return {
-                "status": "success",
-                "strategy": "direct",
-                "answer": answer,
-                "decision_reason": decision_result.reason
-            }
+            return self._direct_response(answer, decision_result)
         
         elif strategy == "rag":
             logger.info("Step 3: Executing RAG Strategy")
             
             search_terms = decision_result.search_terms or [safe_query]
-            context_str = self.retriever.search(search_terms)
+            context = self.retriever.search(search_terms)
 
-            rag_result = self.rag_agent.invoke(safe_query, context_str)
-            
-            return {
-                "status": "success",
-                "strategy": "rag",
-                "answer": rag_result.answer,
-                "context_sufficient": rag_result.context_sufficient,
-                "citations": rag_result.citations,
-                "decision_reason": decision_result.reason
-            }
+            rag_result = self.rag_agent.invoke(safe_query, context.text)
+            return self._rag_response(rag_result, decision_result, context.stats)
+
+        return self._unknown_strategy_response()
+
+    async def _arun(self, query: str, user_role: str = "standard", checked: Optional[Checked] = None) -> Dict[str, Any]:
+        """
+        Async counterpart of _run(). Every LLM and retrieval call is awaited, so a
+        single event loop can serve many in-flight requests concurrently.
+        """
+        if self.mode == "speculative":
+            return await self.arun_speculative(query, user_role, checked)
+
+        logger.info(f"--- New Request: {loggable(query)} (Role: {user_role}) ---")
+
+        blocked, safe_query, decision_result = await self._aroute(query, user_role, checked)
+        if blocked:
+            return blocked
+
+        strategy = decision_result.decision
+        if strategy == "direct":
+            logger.info("Step 3: Executing Direct Strategy")
+            answer = await self.direct_agent.ainvoke(safe_query)
+            return self._direct_response(answer, decision_result)
+
+        elif strategy == "rag":
+            logger.info("Step 3: Executing RAG Strategy")
+
+            search_terms = decision_result.search_terms or [safe_query]
+            context = await self.retriever.asearch(search_terms)
+
+            rag_result = await self.rag_agent.ainvoke(safe_query, context.text)
+            return self._rag_response(rag_result, decision_result, context.stats)
+
+        return self._unknown_strategy_response()
+
+    async def _aroute(
+        self, query: str, user_role: str, checked: Optional[Checked] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[DecisionOutput]]:
+        """
+        Steps 1-2 of the async flow: compliance (unless `checked` holds its result),
+        then the routing decision. Returns (blocked response, None, None) or
+        (None, safe query, decision).
+        """
+        compliance_result, decision_result = checked or await self._acomply(query, user_role)
+        if not compliance_result.is_safe:
+            return self._blocked_response(compliance_result), None, None
+
+        safe_query = compliance_result.sanitized_query or query
+        logger.info(f"Query is safe. Proceeding with: '{loggable(safe_query)}'")
+
+        if decision_result is None:
+            logger.info("Step 2: Decision Making")
+            decision_result = await self.decision_agent.ainvoke(safe_query)
+        logger.info(f"Decision: {decision_result.decision.upper()} (Reason: {decision_result.reason})")
+        return None, safe_query, decision_result
+
+    async def arun_speculative(self, query: str, user_role: str = "standard", checked: Optional[Checked] = None) -> Dict[str, Any]:
+        """
+        Speculative execution flow:
+        1. Compliance, Decision and a retrieval for the raw query start together
+        2. Speculative work is cancelled if compliance blocks, and discarded if
+           compliance rewrites the query (Decision is then re-run on the sanitized query)
+        3. RAG context = speculative retrieval + any extra decision search terms
+
+        The response carries a "speculation" record of the wasted work. When
+        `checked` holds a compliance result already (the semantic cache needs it
+        first), only decision and retrieval run speculatively, on the safe query.
+        """
+        logger.info(f"--- New Request (speculative): {loggable(query)} (Role: {user_role}) ---")
+        report = SpeculationReport()
+
+        if checked is not None:
+            compliance_result = checked[0]
+            query = compliance_result.sanitized_query or query
+            compliance_task = asyncio.ensure_future(asyncio.sleep(0, result=compliance_result))
+        else:
+            # Obvious abuse never reaches the speculative stages.
+            heuristic_result = self.compliance_agent.heuristic_check(query)
+            if heuristic_result:
+                return self._with_speculation(self._blocked_response(heuristic_result), report)
+
+            compliance_input = ComplianceInput(query=query, user_role=user_role)
+            compliance_task = asyncio.create_task(self.compliance_agent.ainvoke(compliance_input))
+        decision_task = report.start("decision", self.decision_agent.ainvoke(query))
+        retrieval_task = report.start("retrieval", self.retriever.asearch_documents([query]))
+
+        try:
+            return await self._resolve_speculation(query, compliance_task, decision_task, retrieval_task, report)
+        except BaseException:
+            compliance_task.cancel()
+            report.discard_all()
+            raise
+
+    async def _resolve_speculation(
+        self,
+        query: str,
+        compliance_task: "asyncio.Task[ComplianceOutput]",
+        decision_task: SpeculativeTask,
+        retrieval_task: Optional[SpeculativeTask],
+        report: SpeculationReport,
+    ) -> Dict[str, Any]:
+        compliance_result = await compliance_task
+
+        if not compliance_result.is_safe:
+            report.discard_all()
+            return self._with_speculation(self._blocked_response(compliance_result), report)
+
+        safe_query = compliance_result.sanitized_query or query
+        if safe_query != query:
+            logger.info("Compliance rewrote the query. Discarding speculative work.")
+            report.discard_all()
+            decision_task = report.start("decision_sanitized", self.decision_agent.ainvoke(safe_query))
+            retrieval_task = None
+
+        decision_result = await decision_task.result()
+        strategy = decision_result.decision
+        logger.info(f"Decision: {strategy.upper()} (Reason: {decision_result.reason})")
+
+        if strategy == "direct":
+            report.discard_all()
+            answer = await self.direct_agent.ainvoke(safe_query)
+            return self._with_speculation(self._direct_response(answer, decision_result), report)
+
+        elif strategy == "rag":
+            search_terms = decision_result.search_terms or [safe_query]
+            if retrieval_task is not None and safe_query not in search_terms:
+                # The decision searches for other terms; the raw-query retrieval is not needed.
+                retrieval_task.discard()
+                retrieval_task = None
+            if retrieval_task is not None:
+                extra_terms = [term for term in search_terms if term != safe_query]
+                speculative_docs, extra_docs = await asyncio.gather(
+                    retrieval_task.result(),
+                    self.retriever.asearch_documents(extra_terms),
+                )
+                docs = speculative_docs + extra_docs
+            else:
+                docs = await self.retriever.asearch_documents(search_terms)
+
+            context = self.retriever.build_context(docs)
+            rag_result = await self.rag_agent.ainvoke(safe_query, context.text)
+            return self._with_speculation(self._rag_response(rag_result, decision_result, context.stats), report)
+
+        report.discard_all()
+        return self._with_speculation(self._unknown_strategy_response(), report)
+
+    def _with_speculation(self, response: Dict[str, Any], report: SpeculationReport) -> Dict[str, Any]:
+        speculation = report.to_dict()
+        logger.info(f"Speculation: {speculation['wasted_tasks']} task(s) wasted, {speculation['wasted_ms']} ms")
+        response["speculation"] = speculation
+        return response
+
+    async def astream(self, query: str, user_role: str = "standard") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming flow. Yields events as soon as they are known:
+        - {"event": "compliance", ...} and {"event": "decision", ...}
+        - {"event": "token", "data": str} for each piece of the answer
+        - {"event": "final", "data": response} with the same payload as arun()
+        """
+        compliance_result, decision_result = await self._acomply(query, user_role)
+        yield {"event": "compliance", "data": compliance_result.model_dump(exclude={"sanitized_query"})}
+
+        if not compliance_result.is_safe:
+            response = self._blocked_response(compliance_result)
+            count_response(response)
+            yield {"event": "final", "data": response}
+            return
+
+        safe_query = compliance_result.sanitized_query or query
+        vector = generation = None
+        if self.cache is not None:
+            generation = self.cache.generation
+            vector = await self.embedding.aembed_query(safe_query)
+            cached = self.cache.lookup(vector, user_role)
+            if cached:
+                logger.info("Semantic cache hit.")
+                count_response(cached)
+                yield {"event": "final", "data": cached}
+                return
+        if decision_result is None:
+            decision_result = await self.decision_agent.ainvoke(safe_query)
+        yield {"event": "decision", "data": decision_result.model_dump()}
+
+        if decision_result.decision == "direct":
+            tokens = []
+            async for token in self.direct_agent.astream(safe_query):
+                if not token:
+                    continue
+                tokens.append(token)
+                yield {"event": "token", "data": token}
+            response = self._direct_response("".join(tokens), decision_result)
+
+        elif decision_result.decision == "rag":
+            search_terms = decision_result.search_terms or [safe_query]
+            context = await self.retriever.asearch(search_terms)
+
+            rag_result = None
+            async for kind, value in self.rag_agent.astream(safe_query, context.text):
+                if kind == "token":
+                    yield {"event": "token", "data": value}
+                else:
+                    rag_result = value
+            response = self._rag_response(rag_result, decision_result, context.stats)
+
+        else:
+            response = self._unknown_strategy_response()
+
+        if self.cache is not None:
+            self.cache.store(vector, user_role, response, generation)
+        count_response(response)
+        yield {"event": "final", "data": response}
+
+    async def astream_batch(self, items: List[Tuple[str, str]], concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answers many (query, role) pairs with bounded concurrency and one shared
+        retrieval. Yields a "result" event per query as it completes, then a "summary".
+        """
+        async for event in BatchRunner(self, concurrency or BATCH_CONCURRENCY).run(items):
+            yield event
+
+    async def aclose(self):
+        await self.retriever.rag_retriever.aclose()
+
+    def _blocked_response(self, compliance_result: ComplianceOutput) -> Dict[str, Any]:
+        logger.warning(f"Compliance Blocked: {compliance_result.reason}")
+        return {
+            "status": "blocked",
+            "reason": compliance_result.reason,
+            "category": compliance_result.category,
+            "risk_level": compliance_result.risk_level,
+            "answer": f"I cannot answer that request. Reason: {compliance_result.reason}"
+        }
+
+    def _direct_response(self, answer: str, decision_result: DecisionOutput) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "strategy": "direct",
+            "answer": answer,
+            "decision_reason": decision_result.reason
+        }
+
+    def _rag_response(
+        self, rag_result: RAGAnswerOutput, decision_result: DecisionOutput, context_stats: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        response = {
+            "status": "success",
+            "strategy": "rag",
+            "answer": rag_result.answer,
+            "context_sufficient": rag_result.context_sufficient,
+            "citations": rag_result.citations,
+            "decision_reason": decision_result.reason
+        }
+        if context_stats is not None:
+            response["context"] = context_stats
+        return response
 
+    def _unknown_strategy_response(self) -> Dict[str, Any]:
         return {
             "status": "error",
             "message": "Unknown strategy"
@@ -1,27 +1,105 @@
-from typing import List
+from typing import Dict, List, Tuple
 
+from langchain_core.documents import Document
+
+from src.engine.context import NO_CONTEXT, SEPARATOR, ContextPacker, PackedContext, format_document
 from src.rag.retrieval import RAGRetrieval
+from src.metrics import CONTEXT_CHUNKS, CONTEXT_TOKENS, RETRIEVED_CHUNKS, instrumented, timed
+from src.config import (
+    RETRIEVAL_K,
+    CONTEXT_PACKING_ENABLED,
+    CONTEXT_MAX_TOKENS,
+    CONTEXT_MMR_LAMBDA,
+    CONTEXT_DUPLICATE_SIMILARITY,
+    CONTEXT_TOKENIZER_MODEL,
+    CONTEXT_TOKEN_COUNTING,
+)
 from src.logger import logger
+from src.tracing import loggable_terms
 
 class EngineRetriever:
-    def __init__(self):
+    def __init__(self, k: int = RETRIEVAL_K):
         self.rag_retriever = RAGRetrieval()
+        self.k = k
+        self.packer = ContextPacker(
+            max_tokens=CONTEXT_MAX_TOKENS,
+            mmr_lambda=CONTEXT_MMR_LAMBDA,
+            duplicate_similarity=CONTEXT_DUPLICATE_SIMILARITY,
+            tokenizer_model=CONTEXT_TOKENIZER_MODEL,
+            token_counting=CONTEXT_TOKEN_COUNTING,
+        ) if CONTEXT_PACKING_ENABLED else None
+
+    @instrumented("retrieval")
+    def search(self, search_terms: List[str]) -> PackedContext:
+        logger.info(f"Retrieving for terms: {loggable_terms(search_terms)}")
+        results = self.rag_retriever.get_context_batch(search_terms, k=self.k, with_vectors=self.packer is not None)
+        return self.build_context(self._merge(results))
+
+    async def asearch(self, search_terms: List[str]) -> PackedContext:
+        return self.build_context(await self.asearch_documents(search_terms))
+
+    @instrumented("retrieval")
+    async def asearch_documents(self, search_terms: List[str]) -> List[Document]:
+        logger.info(f"Retrieving for terms: {loggable_terms(search_terms)}")
+        results = await self.rag_retriever.aget_context_batch(search_terms, k=self.k, with_vectors=self.packer is not None)
+        return self._merge(results)
+
+    @instrumented("batch_retrieval")
+    async def asearch_many(self, term_lists: List[List[str]]) -> List[PackedContext]:
+        """
+        Retrieval for several queries at once: their search terms are deduplicated,
+        embedded and searched in one batch, then each query gets its own context.
+        """
+        terms = list(dict.fromkeys(term for search_terms in term_lists for term in search_terms))
+        logger.info(f"Batch retrieval: {len(terms)} unique terms for {len(term_lists)} queries")
+        results = await self.rag_retriever.aget_context_batch(terms, k=self.k, with_vectors=self.packer is not None) if terms else []
+        hits = dict(zip(terms, results))
 
-    def search(self, search_terms: List[str]) -> str:
-        all_docs = []
-            
-        for term in search_terms:
-            logger.info(f"Retrieving for term: '{term}'")
-
-            docs = self.rag_retriever.get_context(term, k=5)
-            all_docs.extend(docs)
-            
-        unique_docs = {doc.page_content: doc for doc in all_docs}.values()
-                
-        context_str = "\n\n".join([f"Source: {doc.metadata.get('source', 'unknown')}\nContent: {doc.page_content}" for doc in unique_docs])
-                
-        if not context_str:
+        contexts = []
+        for search_terms in term_lists:
+            # Copies, since _merge writes each query's own best score into the metadata.
+            own_hits = [
+                [(Document(page_content=doc.page_content, metadata=dict(doc.metadata)), score) for doc, score in hits[term]]
+                for term in search_terms
+            ]
+            contexts.append(self.build_context(self._merge(own_hits)))
+        return contexts
+
+    def _merge(self, results: List[List[Tuple[Document, float]]]) -> List[Document]:
+        """Merge per-term hits, keeping each point once with its best score (in metadata["_score"])."""
+        best: Dict[str, Tuple[Document, float]] = {}
+        for hits in results:
+            for doc, score in hits:
+                key = self._doc_key(doc)
+                if key not in best or score > best[key][1]:
+                    best[key] = (doc, score)
+
+        ranked = sorted(best.values(), key=lambda hit: hit[1], reverse=True)
+        for doc, score in ranked:
+            doc.metadata["_score"] = score
+        return [doc for doc, _ in ranked]
+
+    @staticmethod
+    def _doc_key(doc: Document):
+        return doc.metadata.get("_id", doc.page_content)
+
+    def build_context(self, all_docs: List[Document]) -> PackedContext:
+        """
+        Turn retrieved documents into the prompt context. With packing enabled
+        the result fits the token budget and carries packing stats.
+        """
+        if not all_docs:
             logger.warning("No documents found for RAG.")
-            context_str = "No relevant documents found."
+        RETRIEVED_CHUNKS.observe(len(all_docs))
+
+        if self.packer is not None:
+            with timed("context_packing"):
+                context = self.packer.pack(all_docs)
+            CONTEXT_CHUNKS.observe(context.stats["selected"])
+            CONTEXT_TOKENS.observe(context.stats["tokens_after"])
+            return context
 
-        return context_str
+        unique_docs = {self._doc_key(doc): doc for doc in all_docs}.values()
+        CONTEXT_CHUNKS.observe(len(unique_docs))
+        context_str = SEPARATOR.join(format_document(doc) for doc in unique_docs)
+        return PackedContext(context_str or NO_CONTEXT, None)
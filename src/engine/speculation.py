@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from typing import Any, Awaitable, Dict, List
+
+class SpeculativeTask:
+    """
+    Wraps a coroutine started ahead of knowing whether its result is needed.
+    Tracks how long it ran so discarded work can be reported per request.
+    """
+
+    def __init__(self, name: str, coro: Awaitable[Any]):
+        self.name = name
+        self.outcome = "pending"
+        self.started = time.perf_counter()
+        self.finished = None
+        self.task = asyncio.create_task(self._run(coro))
+        self.task.add_done_callback(self._consume_exception)
+
+    async def _run(self, coro: Awaitable[Any]) -> Any:
+        try:
+            return await coro
+        finally:
+            self.finished = time.perf_counter()
+
+    @staticmethod
+    def _consume_exception(task: asyncio.Task):
+        # Failures of speculative work that nobody awaits must not surface as
+        # "Task exception was never retrieved" warnings.
+        if not task.cancelled():
+            task.exception()
+
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    async def result(self) -> Any:
+        value = await self.task
+        self.outcome = "used"
+        return value
+
+    def discard(self):
+        if self.task.done():
+            self.outcome = "discarded"
+        else:
+            self.task.cancel()
+            self.outcome = "cancelled"
+
+class SpeculationReport:
+    def __init__(self):
+        self.tasks: List[SpeculativeTask] = []
+
+    def start(self, name: str, coro: Awaitable[Any]) -> SpeculativeTask:
+        speculative_task = SpeculativeTask(name, coro)
+        self.tasks.append(speculative_task)
+        return speculative_task
+
+    def discard_all(self):
+        for speculative_task in self.tasks:
+            if speculative_task.outcome == "pending":
+                speculative_task.discard()
+
+    def to_dict(self) -> Dict[str, Any]:
+        wasted = [t for t in self.tasks if t.outcome in ("cancelled", "discarded")]
+        return {
+            "tasks": {t.name: {"outcome": t.outcome, "elapsed_ms": round(t.elapsed() * 1000, 2)} for t in self.tasks},
+            "wasted_tasks": len(wasted),
+            "wasted_ms": round(sum(t.elapsed() for t in wasted) * 1000, 2),
+        }
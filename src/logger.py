@@ -1,5 +1,17 @@
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from contextvars import ContextVar
+
+# Trace id of the request being served, shown on every log line ("-" outside requests).
+trace_id: ContextVar[str] = ContextVar("trace_id", default="-")
+
+class _TraceIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id.get()
+        return True
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(trace_id)s] %(message)s')
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(_TraceIdFilter())
 
 logger = logging.getLogger(__name__)
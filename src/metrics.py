@@ -0,0 +1,162 @@
+"""
+In-process Prometheus metrics: labeled counters and histograms, rendered in
+the text exposition format by render() for the /metrics endpoint.
+"""
+import asyncio
+import functools
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+TOKEN_BUCKETS = (0, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_REGISTRY: List["_Metric"] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        names = self.labelnames + ("le",)
+        for key, state in values:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {_format_value(cumulative)}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(state[-2])}"
+            yield f"{self.name}_count{labels} {_format_value(state[-1])}"
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in _REGISTRY) + "\n"
+
+STAGE_SECONDS = Histogram("rag_stage_duration_seconds", "Duration of pipeline stages and agent calls.", ["stage"])
+REQUESTS = Counter("rag_requests_total", "Answered requests by status and strategy.", ["status", "strategy"])
+LLM_CALLS = Counter("rag_llm_calls_total", "LLM calls by model.", ["model"])
+LLM_TOKENS = Counter("rag_llm_tokens_total", "LLM tokens by model and type (prompt or completion).", ["model", "type"])
+LLM_COST = Counter("rag_llm_cost_usd_total", "Estimated LLM cost in USD, from the configured prices.", ["model"])
+RETRIEVED_CHUNKS = Histogram("rag_retrieved_chunks", "Unique chunks retrieved per request.", buckets=COUNT_BUCKETS)
+CONTEXT_CHUNKS = Histogram("rag_context_chunks", "Chunks placed in the RAG context per request.", buckets=COUNT_BUCKETS)
+CONTEXT_TOKENS = Histogram("rag_context_tokens", "Tokens in the RAG context per request.", buckets=TOKEN_BUCKETS)
+LLM_SECONDS = Histogram("rag_llm_call_duration_seconds", "Duration of completed LLM calls by model.", ["model"])
+LLM_HEDGES = Counter("rag_llm_hedged_requests_total", "Hedged duplicate LLM requests by model and which call answered.", ["model", "winner"])
+LLM_FALLBACKS = Counter("rag_llm_fallbacks_total", "LLM calls handed to the fallback model, by primary model and reason.", ["model", "reason"])
+CACHE_LOOKUPS = Counter("rag_cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ["cache", "result"])
+INGESTED_CHUNKS = Counter("rag_ingested_chunks_total", "Chunks embedded and upserted by ingestion.")
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the enclosed block under `stage`, failures included."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+def instrumented(stage: str, on_result: Optional[Callable] = None):
+    """Decorator timing a sync or async function as `stage`; `on_result` sees each return value."""
+    def decorate(function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with timed(stage):
+                    result = await function(*args, **kwargs)
+                if on_result:
+                    on_result(result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                result = function(*args, **kwargs)
+            if on_result:
+                on_result(result)
+            return result
+        return wrapper
+    return decorate
+
+def count_cache_lookup(cache: str, hit: bool, amount: int = 1):
+    if amount:
+        CACHE_LOOKUPS.inc(amount, cache=cache, result="hit" if hit else "miss")
+
+def count_response(response: dict):
+    REQUESTS.inc(status=str(response.get("status")), strategy=str(response.get("strategy", "none")))
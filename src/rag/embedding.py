@@ -1,4 +1,109 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import multiprocessing
+import os
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+from src.rag.embedding_cache import CachedEmbeddings
+from src.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZED,
+    EMBEDDING_THREADS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MEMORY_MB,
+)
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+def build_embedding_model(backend: str = EMBEDDING_BACKEND, threads: Optional[int] = EMBEDDING_THREADS):
+    """
+    Build the raw embedding model for `backend` ("torch" or "onnx"), using at
+    most `threads` CPU threads. Returns the model and a name identifying its
+    numeric output, used as the embedding cache namespace.
+    """
+    if backend == "onnx":
+        from src.rag.onnx_embedding import OnnxEmbeddings
+
+        model = OnnxEmbeddings(
+            EMBEDDING_ONNX_DIR,
+            quantized=EMBEDDING_ONNX_QUANTIZED,
+            threads=threads,
+            batch_size=EMBEDDING_BATCH_SIZE,
+        )
+        return model, f"{MODEL_NAME}-onnx{'-int8' if EMBEDDING_ONNX_QUANTIZED else ''}"
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if threads:
+        import torch
+
+        # Process-wide: only limits the caller when it runs in a process of its own.
+        torch.set_num_threads(threads)
+    model = HuggingFaceEmbeddings(model_name=MODEL_NAME, encode_kwargs={"batch_size": EMBEDDING_BATCH_SIZE})
+    return model, MODEL_NAME
+
+@lru_cache(maxsize=None)
 def get_embedding():
-    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    """
+    Process-wide embedding model. Loading MiniLM is expensive, so every
+    caller (retrieval, ingestion) shares the same instance. Unless disabled,
+    it is wrapped in a memory + on-disk cache keyed on model and text.
+    """
+    embedding, model_name = build_embedding_model()
+    if not EMBEDDING_CACHE_ENABLED:
+        return embedding
+
+    return CachedEmbeddings(
+        embedding,
+        model_name=model_name,
+        path=EMBEDDING_CACHE_PATH or None,
+        memory_bytes=int(EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024),
+    )
+
+def job_embedding_model(threads: int) -> Embeddings:
+    return build_embedding_model(threads=threads)[0]
+
+_worker_model: Optional[Embeddings] = None
+
+def _start_embed_worker(factory: Callable[[int], Embeddings], threads: int, niceness: int):
+    global _worker_model
+    if niceness:
+        os.nice(niceness)
+    _worker_model = factory(threads)
+
+def _worker_embed(texts: List[str]) -> List[List[float]]:
+    return _worker_model.embed_documents(texts)
+
+class ProcessEmbeddings(Embeddings):
+    """
+    Embeds in a child process of its own, started at `niceness` with its own
+    model limited to `threads` CPU threads. Background ingestion uses it so
+    that embedding, its largest CPU cost, yields to the server's queries
+    instead of competing with them inside the API process.
+    `factory(threads)` builds the model in the child and must be picklable.
+    """
+
+    def __init__(self, threads: int = 1, niceness: int = 0, factory: Callable[[int], Embeddings] = job_embedding_model):
+        # "spawn" keeps the child independent of the server's threads.
+        self._pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_start_embed_worker,
+            initargs=(factory, threads, niceness),
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._pool.submit(_worker_embed, texts).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
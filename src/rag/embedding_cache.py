@@ -0,0 +1,156 @@
+import asyncio
+import contextvars
+import copy
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.cache import LRUCache
+from src.metrics import count_cache_lookup
+from src.logger import logger
+
+# Vectors are kept as float32 arrays (4 bytes per value) and only turned into
+# Python lists, at about 32 bytes per value, when handed to the caller.
+_KEY_BYTES = sys.getsizeof("0" * 64)
+
+def _entry_bytes(vector: array) -> int:
+    return sys.getsizeof(vector) + _KEY_BYTES
+
+class SQLiteVectorStore:
+    """On-disk key -> float32 vector table that survives restarts."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, array]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                for key, blob in rows:
+                    found[key] = array("f", blob)
+        return found
+
+    def put_many(self, items: Dict[str, array]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper with two cache tiers in front of the model: an
+    in-memory LRU bounded to `memory_bytes` and an optional SQLite store on
+    disk. Keys are derived from the model name, the kind of text (query or
+    document) and the text itself, so only texts never seen before reach the
+    model. Async calls run on one executor of `async_workers` threads.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_name: str,
+        path: Optional[str] = None,
+        memory_bytes: int = 32 * 1024 * 1024,
+        async_workers: int = 2,
+    ):
+        self.base = base
+        self.model_name = model_name
+        self.memory = LRUCache(max_entries=None, max_bytes=memory_bytes, sizeof=_entry_bytes)
+        self.disk = SQLiteVectorStore(path) if path else None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        # Request threads and the async executor update the stats concurrently.
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=async_workers, thread_name_prefix="embedding")
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _embed(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        vectors: Dict[str, array] = {}
+
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        self._count("memory_hits", len(vectors))
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self.disk:
+            from_disk = self.disk.get_many(missing)
+            for key, vector in from_disk.items():
+                self.memory.put(key, vector)
+            vectors.update(from_disk)
+            self._count("disk_hits", len(from_disk))
+
+        to_compute = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                to_compute[key] = text
+        if to_compute:
+            self._count("misses", len(to_compute))
+            if kind == "query":
+                computed = [self.base.embed_query(text) for text in to_compute.values()]
+            else:
+                computed = self.base.embed_documents(list(to_compute.values()))
+            # Stored as float32, so fresh and cached vectors are identical.
+            new_vectors = {key: array("f", vector) for key, vector in zip(to_compute.keys(), computed)}
+            for key, vector in new_vectors.items():
+                self.memory.put(key, vector)
+            if self.disk:
+                self.disk.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        count_cache_lookup("embedding", True, len(keys) - len(to_compute))
+        count_cache_lookup("embedding", False, len(to_compute))
+        return [vectors[key].tolist() for key in keys]
+
+    def _count(self, stat: str, n: int):
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def with_base(self, base: Embeddings) -> "CachedEmbeddings":
+        """A view sharing this cache (both tiers and stats) that computes misses with `base`."""
+        view = copy.copy(self)
+        view.base = base
+        return view
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._run_async(self._embed, "document", texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._run_async(self._embed, "query", [text]))[0]
+
+    def _run_async(self, call, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, contextvars.copy_context().run, call, *args)
+
+    def snapshot(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = sum(stats.values())
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        return {**stats, "hit_rate": round(hits / lookups, 4) if lookups else 0.0, "memory_entries": len(self.memory), "memory_bytes": self.memory.bytes}
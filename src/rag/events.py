@@ -0,0 +1,16 @@
+from typing import Callable, List
+
+from src.logger import logger
+
+_ingest_listeners: List[Callable[[str], None]] = []
+
+def on_ingest(listener: Callable[[str], None]):
+    """Register a callback invoked with the collection name after it changes."""
+    _ingest_listeners.append(listener)
+
+def notify_ingest(collection_name: str):
+    for listener in list(_ingest_listeners):
+        try:
+            listener(collection_name)
+        except Exception as e:
+            logger.error(f"Ingest listener failed: {e}")
@@ -1,29 +1,32 @@
 import os
-import nltk
-import ssl
+import threading
+import time
 
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from langchain_core.documents import Document
-from langchain_community.document_loaders import TextLoader, PyPDFLoader, UnstructuredMarkdownLoader
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.adapters.vector_store import get_vector_store
+from src.adapters.vector_store import get_vector_store, point_ids, wait_for_writes
 from src.rag.embedding import get_embedding
+from src.rag.events import notify_ingest
+from src.rag.loaders import SUPPORTED_EXTENSIONS, load_file
+from src.rag.manifest import FileChange, IngestionManifest, chunk_id, file_sha256
+from src.rag.pipeline import IngestionCancelled, IngestionPipeline
+from src.metrics import INGESTED_CHUNKS, instrumented, timed
+from src.config import (
+    INGEST_MANIFEST_DIR,
+    INGEST_PARALLEL,
+    INGEST_PARSE_WORKERS,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_UPSERT_WORKERS,
+    INGEST_QUEUE_SIZE,
+)
 from src.logger import logger
 
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-nltk.download('punkt_tab')
-nltk.download('averaged_perceptron_tagger')
-
 class RAGIngestion:
-    def __init__(self, collection_name: str = "documents"):
+    def __init__(self, collection_name: str = "documents", manifest_path: Optional[str] = None):
         self.collection_name = collection_name
         self.embedding = get_embedding()
         self.vector_store = get_vector_store(
@@ -35,47 +38,197 @@ class RAGIngestion:
             chunk_overlap=200,
             length_function=len,
         )
+        self.manifest_path = manifest_path or os.path.join(INGEST_MANIFEST_DIR, f"{collection_name}.json")
 
-    def load_documents(self, directory_path: str) -> List[Document]:
-        documents = []
+    def discover_files(self, directory_path: str) -> List[str]:
+        file_paths = []
         for root, _, files in os.walk(directory_path):
             for file in files:
-                file_path = os.path.join(root, file)
-
-                try:
-                    if file.endswith(".txt"):
-                        loader = TextLoader(file_path, encoding="utf-8")
-                        documents.extend(loader.load())
-                    elif file.endswith(".md"):
-                        try:
-                            from langchain_community.document_loaders import UnstructuredMarkdownLoader
-                            
-                            loader = UnstructuredMarkdownLoader(file_path)
-                        except ImportError:
-                            loader = TextLoader(file_path, encoding="utf-8")
-                        
-                        documents.extend(loader.load())
-                    elif file.endswith(".pdf"):
-                        loader = PyPDFLoader(file_path)
-                        documents.extend(loader.load())
-                except Exception as e:
-                    logger.error(f"Error loading {file_path}: {e}")
+                if file.endswith(SUPPORTED_EXTENSIONS):
+                    file_paths.append(os.path.join(root, file))
+        return sorted(file_paths)
+
+    def load_file(self, file_path: str) -> List[Document]:
+        try:
+            return load_file(file_path)
+        except Exception as e:
+            logger.error(f"Error loading {file_path}: {e}")
+            return []
+
+    def load_documents(self, directory_path: str) -> List[Document]:
+        documents = []
+        for file_path in self.discover_files(directory_path):
+            documents.extend(self.load_file(file_path))
 
         return documents
 
-    def ingest(self, directory_path: str):
-        logger.info(f"Loading documents from {directory_path}...")
-        docs = self.load_documents(directory_path)
-        logger.info(f"Loaded {len(docs)} documents.")
-        
-        if not docs:
-            logger.warning("No documents found.")
+    @instrumented("ingest")
+    def ingest(
+        self,
+        directory_path: str,
+        parallel: Optional[bool] = None,
+        progress: Optional[Dict[str, Any]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        parse_workers: Optional[int] = None,
+        niceness: int = 0,
+        embedding: Optional[Embeddings] = None,
+        rebuild: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Incremental ingestion. Files whose size/mtime (or, failing that, content
+        hash) match the manifest are skipped, changed files only embed chunks
+        that are not already stored, and points of deleted files are removed.
+        Point ids are deterministic, so re-running never duplicates chunks.
+
+        With `parallel` (default: INGEST_PARALLEL) changed files go through the
+        streaming IngestionPipeline instead of being indexed one by one.
+        `progress` is updated in place (files_total, files_parsed,
+        chunks_embedded, points_upserted) and setting `cancel_event` stops the
+        run after the work in flight; completed files stay in the manifest.
+        A separate `embedding` (background jobs embed in a child process) also
+        implies the pipeline, since the one-by-one path embeds in the vector store.
+
+        The first run that completes without failed files for a collection (or
+        any run with `rebuild`) then deletes every point the manifest does not
+        reference. This removes the random-id points of a collection filled
+        before manifests existed, and the points of directories that were not
+        ingested under this manifest; re-ingest those to restore them.
+        """
+        parallel = INGEST_PARALLEL if parallel is None else parallel
+        progress = progress if progress is not None else {}
+        progress.update({"files_total": 0, "files_parsed": 0, "chunks_embedded": 0, "points_upserted": 0})
+        started = time.perf_counter()
+
+        logger.info(f"Scanning documents in {directory_path}...")
+        manifest = IngestionManifest(self.manifest_path)
+        summary = {"files_added": 0, "files_updated": 0, "files_unchanged": 0, "files_removed": 0,
+                   "files_failed": 0, "chunks_upserted": 0, "points_deleted": 0, "points_swept": 0}
+
+        try:
+            with timed("ingest_plan"):
+                changes = self._plan(directory_path, manifest, summary)
+            progress["files_total"] = len(changes)
+            logger.info(f"{len(changes)} files to index, {summary['files_unchanged']} unchanged.")
+
+            if embedding is not None or (parallel and len(changes) > 1):
+                pipeline = IngestionPipeline(
+                    self,
+                    parse_workers=parse_workers or INGEST_PARSE_WORKERS,
+                    embed_batch_size=INGEST_EMBED_BATCH_SIZE,
+                    upsert_workers=INGEST_UPSERT_WORKERS,
+                    queue_size=INGEST_QUEUE_SIZE,
+                    niceness=niceness,
+                    progress=progress,
+                    cancel_event=cancel_event,
+                    embedding=embedding,
+                )
+                pipeline.run(changes, manifest, summary)
+            else:
+                for change in changes:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise IngestionCancelled("Ingestion cancelled.")
+                    self._index_file(change, manifest, summary, progress)
+
+            if rebuild or not manifest.swept:
+                self._sweep(manifest, summary)
+        finally:
+            manifest.save()
+            if summary["chunks_upserted"] or summary["points_deleted"] or summary["points_swept"]:
+                notify_ingest(self.collection_name)
+
+        elapsed = time.perf_counter() - started
+        files_processed = summary["files_added"] + summary["files_updated"]
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["files_per_second"] = round(files_processed / elapsed, 2) if elapsed else 0.0
+        summary["chunks_per_second"] = round(summary["chunks_upserted"] / elapsed, 2) if elapsed else 0.0
+
+        logger.info(f"Ingestion complete: {summary}")
+        return summary
+
+    def _sweep(self, manifest: IngestionManifest, summary: Dict[str, Any]):
+        """Delete the points of the collection that no manifest entry references."""
+        if summary["files_failed"]:
+            logger.warning("Not removing unreferenced points while files fail to load; the next complete run will.")
+            return
+        with timed("ingest_sweep"):
+            unreferenced = list(point_ids(self.vector_store) - manifest.point_ids())
+            if unreferenced:
+                wait_for_writes(self.vector_store)
+                self.vector_store.delete(ids=unreferenced)
+        manifest.swept = True
+        summary["points_swept"] = len(unreferenced)
+        logger.info(f"Removed {len(unreferenced)} points not referenced by the manifest.")
+
+    def _plan(self, directory_path: str, manifest: IngestionManifest, summary: Dict[str, Any]) -> List[FileChange]:
+        """Compare the directory with the manifest: drop removed files, return changed ones."""
+        changes = []
+        seen = set()
+
+        for file_path in self.discover_files(directory_path):
+            key = os.path.abspath(file_path)
+            seen.add(key)
+            stat = os.stat(file_path)
+
+            if manifest.is_unchanged(key, stat):
+                summary["files_unchanged"] += 1
+                continue
+
+            sha256 = file_sha256(file_path)
+            entry = manifest.get(key)
+            if entry and entry["sha256"] == sha256:
+                manifest.touch(key, stat)
+                summary["files_unchanged"] += 1
+                continue
+
+            changes.append(FileChange(file_path, key, stat, sha256, entry))
+
+        for key in manifest.paths_under(directory_path):
+            if key not in seen:
+                stale_ids = manifest.remove(key)
+                if stale_ids:
+                    wait_for_writes(self.vector_store)
+                    self.vector_store.delete(ids=stale_ids)
+                summary["files_removed"] += 1
+                summary["points_deleted"] += len(stale_ids)
+                logger.info(f"Removed {key}: {len(stale_ids)} points deleted.")
+
+        return changes
+
+    def _index_file(self, change: FileChange, manifest: IngestionManifest, summary: Dict[str, Any], progress: Dict[str, Any]):
+        try:
+            with timed("ingest_parse"):
+                docs = load_file(change.file_path)
+        except Exception as e:
+            logger.error(f"Error loading {change.file_path}: {e}")
+            summary["files_failed"] += 1
             return
+        progress["files_parsed"] += 1
+
+        with timed("ingest_split"):
+            chunks = self.text_splitter.split_documents(docs)
+        ids = [chunk_id(change.key, chunk) for chunk in chunks]
+        old_ids = set(change.entry["ids"]) if change.entry else set()
+
+        new_chunks = {}
+        for point_id, chunk in zip(ids, chunks):
+            if point_id not in old_ids:
+                new_chunks[point_id] = chunk
+        if new_chunks:
+            # add_documents embeds and upserts in one call.
+            with timed("ingest_embed_upsert"):
+                wait_for_writes(self.vector_store)
+                self.vector_store.add_documents(list(new_chunks.values()), ids=list(new_chunks.keys()))
+            INGESTED_CHUNKS.inc(len(new_chunks))
+            progress["chunks_embedded"] += len(new_chunks)
+            progress["points_upserted"] += len(new_chunks)
 
-        logger.info("Splitting documents...")
-        chunks = self.text_splitter.split_documents(docs)
-        logger.info(f"Created {len(chunks)} chunks.")
+        stale_ids = list(old_ids - set(ids))
+        if stale_ids:
+            wait_for_writes(self.vector_store)
+            self.vector_store.delete(ids=stale_ids)
 
-        logger.info("Indexing to Qdrant...")
-        self.vector_store.add_documents(chunks)
-        logger.info("Ingestion complete.")
+        manifest.update(change.key, change.sha256, change.stat, list(dict.fromkeys(ids)))
+        summary["files_updated" if change.entry else "files_added"] += 1
+        summary["chunks_upserted"] += len(new_chunks)
+        summary["points_deleted"] += len(stale_ids)
+        logger.info(f"Indexed {change.file_path}: {len(new_chunks)} new chunks, {len(stale_ids)} stale points removed.")
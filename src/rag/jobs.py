@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.rag.pipeline import IngestionCancelled
+from src.logger import logger
+
+class IngestionJob:
+    def __init__(self, directory_path: str, collection_name: str, parallel: Optional[bool], rebuild: bool = False):
+        self.id = uuid.uuid4().hex
+        self.directory_path = directory_path
+        self.collection_name = collection_name
+        self.parallel = parallel
+        self.rebuild = rebuild
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Any] = {}
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.status != "running" or not self.started_at:
+            return None
+        total = self.progress.get("files_total", 0)
+        done = self.progress.get("files_parsed", 0)
+        if not total or not done:
+            return None
+        elapsed = time.time() - self.started_at
+        return round(elapsed * (total - done) / done, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "directory_path": self.directory_path,
+            "collection_name": self.collection_name,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.progress),
+            "eta_seconds": self.eta_seconds(),
+            "summary": self.summary,
+            "error": self.error,
+        }
+
+class IngestionJobManager:
+    """
+    Runs ingestions in the background. At most `max_concurrent_jobs` run at
+    once, each limited to `parse_workers` parser processes started at
+    `niceness`. Unless `embed_threads` is 0, each job also embeds in a child
+    process at `niceness` using `embed_threads` threads, so a large ingest
+    does not starve query traffic.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_jobs: int = 1,
+        parse_workers: Optional[int] = None,
+        niceness: int = 10,
+        embed_threads: int = 1,
+        history: int = 50,
+    ):
+        self.parse_workers = parse_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.niceness = niceness
+        self.embed_threads = embed_threads
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix="ingest-job")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self, directory_path: str, collection_name: str = "documents", parallel: Optional[bool] = None, rebuild: bool = False
+    ) -> IngestionJob:
+        job = IngestionJob(directory_path, collection_name, parallel, rebuild)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        self._executor.submit(self._run, job)
+        logger.info(f"Ingestion job {job.id} queued for {directory_path}.")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        job = self._jobs.get(job_id)
+        if job and job.status in ("queued", "running"):
+            job.cancel_event.set()
+            if job.status == "queued":
+                job.status = "cancelled"
+                job.finished_at = time.time()
+        return job
+
+    def shutdown(self):
+        for job in self._jobs.values():
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestionJob):
+        from src.rag.embedding import ProcessEmbeddings
+        from src.rag.embedding_cache import CachedEmbeddings
+        from src.rag.ingestion import RAGIngestion
+
+        if job.cancel_event.is_set():
+            return
+
+        job.status = "running"
+        job.started_at = time.time()
+        worker = embedding = None
+        try:
+            rag = RAGIngestion(collection_name=job.collection_name)
+            if self.embed_threads:
+                worker = ProcessEmbeddings(threads=self.embed_threads, niceness=self.niceness)
+                # Cached texts are still served from the server's cache; only misses go to the child.
+                embedding = rag.embedding.with_base(worker) if isinstance(rag.embedding, CachedEmbeddings) else worker
+            job.summary = rag.ingest(
+                job.directory_path,
+                parallel=job.parallel,
+                progress=job.progress,
+                cancel_event=job.cancel_event,
+                parse_workers=self.parse_workers,
+                niceness=self.niceness,
+                embedding=embedding,
+                rebuild=job.rebuild,
+            )
+            job.status = "completed"
+        except IngestionCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            if worker is not None:
+                worker.close()
+            job.finished_at = time.time()
+            logger.info(f"Ingestion job {job.id} finished with status '{job.status}'.")
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("completed", "failed", "cancelled")]
+        while len(self._jobs) > self.history and finished:
+            del self._jobs[finished.pop(0)]
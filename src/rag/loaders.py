@@ -0,0 +1,45 @@
+from typing import List
+
+from langchain_core.documents import Document
+
+from src.config import OFFLINE_MODE
+from src.logger import logger
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".pdf")
+
+def load_file(file_path: str) -> List[Document]:
+    """
+    Parse one file into Documents. Kept free of embedding/vector store imports
+    so it can run cheaply inside worker processes; the document loaders
+    themselves are imported on first use.
+    """
+    from langchain_community.document_loaders import TextLoader
+
+    if file_path.endswith(".txt"):
+        loader = TextLoader(file_path, encoding="utf-8")
+    elif file_path.endswith(".md"):
+        loader = _markdown_loader(file_path)
+    elif file_path.endswith(".pdf"):
+        from langchain_community.document_loaders import PyPDFLoader
+
+        loader = PyPDFLoader(file_path)
+    else:
+        return []
+
+    return loader.load()
+
+def _markdown_loader(file_path: str):
+    from langchain_community.document_loaders import TextLoader
+
+    try:
+        from langchain_community.document_loaders import UnstructuredMarkdownLoader
+    except ImportError:
+        return TextLoader(file_path, encoding="utf-8")
+
+    # unstructured downloads missing NLTK data on demand, which hangs without network.
+    from src.assets import nltk_available
+
+    if OFFLINE_MODE and not nltk_available():
+        logger.warning(f"NLTK data missing in offline mode; loading {file_path} as plain text.")
+        return TextLoader(file_path, encoding="utf-8")
+    return UnstructuredMarkdownLoader(file_path)
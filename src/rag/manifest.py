@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import uuid
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set
+
+from langchain_core.documents import Document
+
+from src.logger import logger
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_id(source: str, chunk: Document) -> str:
+    """
+    Deterministic point id for a chunk: the same file path and the same chunk
+    (content and metadata) always map to the same Qdrant point.
+    """
+    payload = json.dumps({"content": chunk.page_content, "metadata": chunk.metadata}, sort_keys=True, default=str)
+    chunk_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{chunk_hash}"))
+
+class FileChange(NamedTuple):
+    """A file that needs (re)indexing, with what the manifest knew about it."""
+    file_path: str
+    key: str
+    stat: os.stat_result
+    sha256: str
+    entry: Optional[Dict]
+
+class IngestionManifest:
+    """
+    Persisted record of ingested files: content hash, mtime, size and the
+    point ids written for each file, keyed by absolute path.
+
+    `swept` is False until a run has deleted the points the manifest does not
+    know, such as those of a collection filled before manifests existed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        self.swept = False
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.swept = data.get("swept", True)
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        return self.files.get(file_path)
+
+    def is_unchanged(self, file_path: str, stat: os.stat_result) -> bool:
+        entry = self.files.get(file_path)
+        return bool(entry) and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size
+
+    def update(self, file_path: str, sha256: str, stat: os.stat_result, ids: List[str]):
+        self.files[file_path] = {"sha256": sha256, "mtime": stat.st_mtime, "size": stat.st_size, "ids": ids}
+
+    def touch(self, file_path: str, stat: os.stat_result):
+        self.files[file_path]["mtime"] = stat.st_mtime
+        self.files[file_path]["size"] = stat.st_size
+
+    def remove(self, file_path: str) -> List[str]:
+        return self.files.pop(file_path, {}).get("ids", [])
+
+    def point_ids(self) -> Set[str]:
+        return {point_id for entry in self.files.values() for point_id in entry["ids"]}
+
+    def paths_under(self, directory_path: str) -> Iterator[str]:
+        prefix = os.path.join(os.path.abspath(directory_path), "")
+        return (file_path for file_path in list(self.files) if file_path.startswith(prefix))
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files, "swept": self.swept}, f)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved ingestion manifest with {len(self.files)} files to {self.path}.")
@@ -0,0 +1,120 @@
+import argparse
+import os
+
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.logger import logger
+
+HF_REPO_ID = "sentence-transformers/all-MiniLM-L6-v2"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+class OnnxEmbeddings(Embeddings):
+    """
+    all-MiniLM-L6-v2 served through ONNX Runtime on CPU: tokenization with the
+    `tokenizers` library, then mean pooling and L2 normalization as in the
+    sentence-transformers pipeline. Vectors are 384-dim and interchangeable
+    with the PyTorch backend.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        threads: Optional[int] = None,
+        batch_size: int = 32,
+        max_length: int = 256,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}. Run: python -m src.rag.onnx_embedding --output {model_dir}"
+                + (" --quantize" if quantized else "")
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        logger.info(f"Loaded ONNX embedding model from {model_path}.")
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        # Batch texts of similar length together to minimize padding.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in indices])
+            input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            vectors[indices] = pooled
+
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+def prepare_model(output_dir: str, quantize: bool = False):
+    """
+    Fetch the exported ONNX graph and tokenizer of all-MiniLM-L6-v2 into
+    `output_dir` and optionally write an int8 dynamically-quantized copy.
+    """
+    from huggingface_hub import hf_hub_download
+
+    os.makedirs(output_dir, exist_ok=True)
+    downloaded = hf_hub_download(HF_REPO_ID, f"onnx/{MODEL_FILE}", local_dir=output_dir)
+    os.replace(downloaded, os.path.join(output_dir, MODEL_FILE))
+    hf_hub_download(HF_REPO_ID, TOKENIZER_FILE, local_dir=output_dir)
+    logger.info(f"ONNX model and tokenizer saved to {output_dir}.")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            os.path.join(output_dir, MODEL_FILE),
+            os.path.join(output_dir, QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+        logger.info(f"int8 quantized model saved to {os.path.join(output_dir, QUANTIZED_MODEL_FILE)}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare the ONNX embedding backend.")
+    parser.add_argument("--output", default="models/all-MiniLM-L6-v2-onnx")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamically-quantized model.")
+    args = parser.parse_args()
+    prepare_model(args.output, quantize=args.quantize)
@@ -0,0 +1,240 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.rag.loaders import load_file
+from src.rag.manifest import FileChange, IngestionManifest, chunk_id
+from src.metrics import INGESTED_CHUNKS, STAGE_SECONDS, timed
+from src.logger import logger
+
+_DONE = object()
+
+class IngestionCancelled(Exception):
+    pass
+
+def _timed_load(file_path: str) -> Tuple[List[Document], float]:
+    """load_file plus its duration, measured in the parser process."""
+    started = time.perf_counter()
+    docs = load_file(file_path)
+    return docs, time.perf_counter() - started
+
+class IngestionPipeline:
+    """
+    Streaming ingestion: files are parsed in a process pool, chunked as they
+    arrive, embedded in fixed-size batches on a dedicated thread and upserted
+    by a pool of writer threads. Stages are connected by bounded queues and
+    the number of files being parsed at once is capped, so memory stays flat
+    regardless of corpus size. `embedding` (default: the ingestion's) does the
+    embedding stage, e.g. a ProcessEmbeddings for background jobs.
+    """
+
+    def __init__(
+        self,
+        ingestion,
+        parse_workers: int = 4,
+        embed_batch_size: int = 64,
+        upsert_workers: int = 4,
+        queue_size: int = 8,
+        niceness: int = 0,
+        progress: Optional[Dict] = None,
+        cancel_event: Optional[threading.Event] = None,
+        embedding: Optional[Embeddings] = None,
+    ):
+        self.ingestion = ingestion
+        self.embedding = embedding or ingestion.embedding
+        self.parse_workers = parse_workers
+        self.embed_batch_size = embed_batch_size
+        self.upsert_workers = upsert_workers
+        self.queue_size = queue_size
+        self.niceness = niceness
+        self.cancel_event = cancel_event
+
+        self.stats = progress if progress is not None else {}
+        self.stats.update({"files_parsed": 0, "chunks_embedded": 0, "points_upserted": 0})
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        self._files: Dict[str, Tuple[FileChange, List[str], List[str], int]] = {}
+
+    def run(self, changes: List[FileChange], manifest: IngestionManifest, summary: Dict):
+        self._manifest = manifest
+        self._summary = summary
+        self._embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._upsert_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        embedder = threading.Thread(target=self._embed_worker, name="ingest-embed", daemon=True)
+        upserters = [threading.Thread(target=self._upsert_worker, name=f"ingest-upsert-{i}", daemon=True)
+                     for i in range(self.upsert_workers)]
+        embedder.start()
+        for upserter in upserters:
+            upserter.start()
+
+        try:
+            self._parse_and_chunk(changes)
+        finally:
+            # Consumers drain their queue until the sentinel even after a
+            # failure, so these blocking puts always complete.
+            self._embed_queue.put(_DONE)
+            embedder.join()
+            for _ in upserters:
+                self._upsert_queue.put(_DONE)
+            for upserter in upserters:
+                upserter.join()
+
+        if self._error:
+            raise self._error
+
+    def _parse_and_chunk(self, changes: List[FileChange]):
+        batch: List[Tuple[str, str, Document]] = []
+        remaining = iter(changes)
+        in_flight = {}
+        workers = max(1, min(self.parse_workers, len(changes)))
+        # "spawn" keeps workers independent of the parent's threads (uvicorn, upserters).
+        context = multiprocessing.get_context("spawn")
+
+        initializer, initargs = (os.nice, (self.niceness,)) if self.niceness else (None, ())
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs) as pool:
+            while not self._stopped():
+                while len(in_flight) < workers * 2:
+                    change = next(remaining, None)
+                    if change is None:
+                        break
+                    in_flight[pool.submit(_timed_load, change.file_path)] = change
+                if not in_flight:
+                    break
+
+                # Time out regularly so cancellation is noticed while parsers are busy.
+                done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    change = in_flight.pop(future)
+                    try:
+                        docs, seconds = future.result()
+                    except Exception as e:
+                        logger.error(f"Error loading {change.file_path}: {e}")
+                        self._summary["files_failed"] += 1
+                        continue
+
+                    STAGE_SECONDS.observe(seconds, stage="ingest_parse")
+                    with self._lock:
+                        self.stats["files_parsed"] += 1
+                    batch.extend(self._chunk(change, docs))
+                    while len(batch) >= self.embed_batch_size:
+                        self._put(self._embed_queue, batch[:self.embed_batch_size])
+                        batch = batch[self.embed_batch_size:]
+
+            for future in in_flight:
+                future.cancel()
+
+        if batch and not self._stopped():
+            self._put(self._embed_queue, batch)
+
+    def _chunk(self, change: FileChange, docs: List[Document]) -> List[Tuple[str, str, Document]]:
+        with timed("ingest_split"):
+            chunks = self.ingestion.text_splitter.split_documents(docs)
+        ids = [chunk_id(change.key, chunk) for chunk in chunks]
+        old_ids = set(change.entry["ids"]) if change.entry else set()
+
+        new_chunks = {}
+        for point_id, chunk in zip(ids, chunks):
+            if point_id not in old_ids:
+                new_chunks[point_id] = chunk
+        stale_ids = list(old_ids - set(ids))
+
+        with self._lock:
+            self._files[change.key] = (change, list(dict.fromkeys(ids)), stale_ids, len(new_chunks))
+            self._pending[change.key] = len(new_chunks)
+        if not new_chunks:
+            self._finish_file(change.key, 0)
+
+        return [(change.key, point_id, chunk) for point_id, chunk in new_chunks.items()]
+
+    def _embed_worker(self):
+        while True:
+            batch = self._embed_queue.get()
+            if batch is _DONE:
+                return
+            if self._stopped():
+                continue
+            try:
+                with timed("ingest_embed"):
+                    vectors = self.embedding.embed_documents([doc.page_content for _, _, doc in batch])
+                with self._lock:
+                    self.stats["chunks_embedded"] += len(batch)
+                self._put(self._upsert_queue, (batch, vectors))
+            except BaseException as e:
+                self._error = e
+
+    def _upsert_worker(self):
+        from src.adapters.vector_store import upsert_embeddings
+
+        while True:
+            item = self._upsert_queue.get()
+            if item is _DONE:
+                return
+            if self._stopped():
+                continue
+            batch, vectors = item
+            try:
+                with timed("ingest_upsert"):
+                    upsert_embeddings(
+                        self.ingestion.vector_store,
+                        [point_id for _, point_id, _ in batch],
+                        vectors,
+                        [doc for _, _, doc in batch],
+                    )
+                INGESTED_CHUNKS.inc(len(batch))
+                with self._lock:
+                    self.stats["points_upserted"] += len(batch)
+
+                per_file: Dict[str, int] = {}
+                for key, _, _ in batch:
+                    per_file[key] = per_file.get(key, 0) + 1
+                for key, count in per_file.items():
+                    self._finish_file(key, count)
+            except BaseException as e:
+                self._error = e
+
+    def _finish_file(self, key: str, upserted: int):
+        """Record `upserted` chunks of a file; once all are stored, commit the file."""
+        with self._lock:
+            self._pending[key] -= upserted
+            if self._pending[key] > 0:
+                return
+            change, ids, stale_ids, new_count = self._files.pop(key)
+            del self._pending[key]
+
+        if stale_ids:
+            from src.adapters.vector_store import wait_for_writes
+
+            wait_for_writes(self.ingestion.vector_store)
+            self.ingestion.vector_store.delete(ids=stale_ids)
+
+        with self._lock:
+            self._manifest.update(change.key, change.sha256, change.stat, ids)
+            self._summary["files_updated" if change.entry else "files_added"] += 1
+            self._summary["chunks_upserted"] += new_count
+            self._summary["points_deleted"] += len(stale_ids)
+
+    def _stopped(self) -> bool:
+        """True once a stage has failed or the run was cancelled."""
+        if self._error is None and self.cancel_event is not None and self.cancel_event.is_set():
+            self._error = IngestionCancelled("Ingestion cancelled.")
+        return self._error is not None
+
+    def _put(self, target: queue.Queue, item):
+        """Blocking put that gives up once another stage has failed."""
+        while not self._stopped():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
@@ -2,30 +2,58 @@ from typing import List, Tuple
 
 from langchain_core.documents import Document
 
-from src.adapters.vector_store import get_vector_store
+from src.adapters.vector_store import SEARCH_PARAMS, get_vector_store, get_async_client, close_async_client, search_batch, asearch_batch
 from src.rag.embedding import get_embedding
+from src.metrics import timed
 from src.logger import logger
+from src.tracing import loggable
 
 class RAGRetrieval:
     def __init__(self, collection_name: str = "documents"):
         self.collection_name = collection_name
         self.embedding = get_embedding()
         self.vector_store = get_vector_store(collection_name=self.collection_name, embedding=self.embedding)
+        self.async_client = get_async_client(self.collection_name)
 
     def get_context(self, query: str, k: int = 5) -> List[Document]:
         """
         Retrieve relevant documents for a given query.
         """
-        logger.info(f"Retrieving context for query: '{query}'...")
-        docs = self.vector_store.similarity_search(query, k=k)
+        logger.info(f"Retrieving context for query: '{loggable(query)}'...")
+        docs = self.vector_store.similarity_search(query, k=k, search_params=SEARCH_PARAMS)
         logger.info(f"Retrieved {len(docs)} documents.")
         return docs
 
+    def get_context_batch(self, queries: List[str], k: int = 5, with_vectors: bool = False) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve documents with scores for several queries at once: a single
+        batched embedding pass followed by a single Qdrant batch query.
+        """
+        logger.info(f"Retrieving context for {len(queries)} queries in one batch...")
+        with timed("embedding"):
+            vectors = self.embedding.embed_documents(queries) if queries else []
+        with timed("vector_search"):
+            results = search_batch(self.vector_store.client, self.collection_name, vectors, k, with_vectors)
+        logger.info(f"Retrieved {sum(len(hits) for hits in results)} documents.")
+        return results
+
+    async def aget_context_batch(self, queries: List[str], k: int = 5, with_vectors: bool = False) -> List[List[Tuple[Document, float]]]:
+        logger.info(f"Retrieving context for {len(queries)} queries in one batch...")
+        with timed("embedding"):
+            vectors = await self.embedding.aembed_documents(queries) if queries else []
+        with timed("vector_search"):
+            results = await asearch_batch(self.async_client, self.collection_name, vectors, k, with_vectors)
+        logger.info(f"Retrieved {sum(len(hits) for hits in results)} documents.")
+        return results
+
     def get_context_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
         """
         Retrieve relevant documents with their similarity scores.
         """
-        logger.info(f"Retrieving context with scores for query: '{query}'...")
-        docs_with_score = self.vector_store.similarity_search_with_score(query, k=k)
+        logger.info(f"Retrieving context with scores for query: '{loggable(query)}'...")
+        docs_with_score = self.vector_store.similarity_search_with_score(query, k=k, search_params=SEARCH_PARAMS)
         logger.info(f"Retrieved {len(docs_with_score)} documents.")
         return docs_with_score
+
+    async def aclose(self):
+        await close_async_client(self.async_client)
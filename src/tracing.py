@@ -0,0 +1,23 @@
+import uuid
+
+from typing import Iterable, List, Optional
+
+from src.config import LOG_QUERIES
+from src.logger import trace_id
+
+def start_trace(value: Optional[str] = None) -> str:
+    """Set the trace id for the current request (a new one unless given) and return it."""
+    value = value or uuid.uuid4().hex
+    trace_id.set(value)
+    return value
+
+def current_trace_id() -> Optional[str]:
+    value = trace_id.get()
+    return None if value == "-" else value
+
+def loggable(text: str) -> str:
+    """User text for log lines: as is with LOG_QUERIES, otherwise only its length."""
+    return text if LOG_QUERIES else f"<{len(text)} chars>"
+
+def loggable_terms(terms: Iterable[str]) -> List[str]:
+    return [loggable(term) for term in terms]
@@ -0,0 +1,97 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src.engine.agents.decision.model import DecisionOutput
+from src.engine.agents.rag_answer.model import RAGAnswerOutput
+from src.engine.batch import BatchRunner
+from src.engine.orchestrator import Orchestrator
+
+class Retriever:
+    def __init__(self, failing_term=None):
+        self.calls = []
+        self.failing_term = failing_term
+
+    async def asearch_many(self, term_lists):
+        self.calls.append(term_lists)
+        if any(self.failing_term in terms for terms in term_lists):
+            raise RuntimeError("search timed out")
+        return [SimpleNamespace(text=" ".join(terms), stats=None) for terms in term_lists]
+
+class RAGAgent:
+    async def ainvoke(self, query, context):
+        return RAGAnswerOutput(answer=f"{query}: {context}", context_sufficient=True)
+
+def orchestrator(retriever, blocked=()):
+    """Routes "direct ..." queries to a direct answer and the rest to RAG with the query as search term."""
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.cache = None
+    orchestrator.retriever = retriever
+    orchestrator.rag_agent = RAGAgent()
+    orchestrator.direct_agent = SimpleNamespace(ainvoke=lambda query: asyncio.sleep(0, result=f"direct: {query}"))
+    orchestrator.routed = []
+
+    async def aroute(query, role, checked=None):
+        orchestrator.routed.append(query)
+        if query in blocked:
+            await asyncio.Event().wait()
+        decision = "direct" if query.startswith("direct") else "rag"
+        return None, query, DecisionOutput(decision=decision, reason="test", search_terms=[query] if decision == "rag" else [])
+
+    orchestrator._aroute = aroute
+    return orchestrator
+
+def run(runner, items):
+    async def collect():
+        return [event async for event in runner.run(items)]
+    return asyncio.run(collect())
+
+def test_identical_queries_are_answered_once_and_every_index_gets_a_result():
+    fake = orchestrator(Retriever())
+    items = [("q1", "standard"), ("direct hi", "standard"), (" q1 ", "standard"), ("q1", "admin")]
+    events = run(BatchRunner(fake, 4), items)
+
+    results = {event["data"]["index"]: event["data"]["response"] for event in events if event["event"] == "result"}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[0] == results[2] and results[0]["answer"] == "q1: q1"
+    assert results[1]["strategy"] == "direct"
+    assert sorted(fake.routed) == ["direct hi", "q1", "q1"]
+
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert summary["data"]["unique_queries"] == 3 and summary["data"]["outcomes"] == {"rag": 3, "direct": 1}
+
+def test_retrieval_is_split_into_bounded_groups_and_failures_stay_in_their_group():
+    retriever = Retriever(failing_term="q3")
+    events = run(BatchRunner(orchestrator(retriever), 8, search_size=2, window=1), [(f"q{i}", "standard") for i in range(6)])
+
+    assert all(len({term for terms in call for term in terms}) <= 2 for call in retriever.calls)
+    responses = {event["data"]["index"]: event["data"]["response"] for event in events if event["event"] == "result"}
+    failed = sorted(index for index, response in responses.items() if response["status"] == "error")
+    assert failed == [2, 3]
+    assert events[-1]["data"]["retrieval_batches"] == 3
+
+def test_rag_answers_do_not_wait_for_the_slowest_routing():
+    # "slow" never finishes routing; "fast" is answered regardless.
+    runner = BatchRunner(orchestrator(Retriever(), blocked={"slow"}), 4, window=0)
+
+    async def first_result():
+        async for event in runner.run([("slow", "standard"), ("fast", "standard")]):
+            return event
+
+    event = asyncio.run(first_result())
+    assert event["data"]["index"] == 1 and event["data"]["response"]["answer"] == "fast: fast"
+
+def test_batch_endpoint_rejects_too_many_queries(monkeypatch):
+    from src.api import routes
+    from src.api.lifespan import get_orchestrator
+
+    monkeypatch.setattr(routes, "BATCH_MAX_QUERIES", 2)
+    routes.app.dependency_overrides[get_orchestrator] = lambda: orchestrator(Retriever())
+    try:
+        response = TestClient(routes.app).post("/ask/batch", json={"queries": [{"query": "q"}] * 3})
+    finally:
+        routes.app.dependency_overrides.clear()
+    assert response.status_code == 413
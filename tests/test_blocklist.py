@@ -0,0 +1,46 @@
+import os
+
+from src.engine.agents.compliance.blocklist import Blocklist, matching_form, normalize_text
+
+def test_normalize_text_folds_case_width_and_zero_width():
+    assert normalize_text("  ＨＥＬＬＯ​   World ") == "hello world"
+
+def test_matching_form_strips_accents_lookalikes_and_punctuation():
+    assert matching_form("Make-a  BÖMB!") == "make a bomb"
+    # Cyrillic "а" and "о" look like the Latin letters.
+    assert matching_form("mаke а bоmb") == "make a bomb"
+    assert matching_form("__--__") == ""
+
+def test_finds_overlapping_and_suffix_terms():
+    blocklist = Blocklist(["she sells", "he", "hers", "sells sea"])
+    assert blocklist.find("The shell") == "he"
+    assert blocklist.find("ushers") == "he"
+    assert blocklist.find("SHE  sells, sea shells") == "he"
+    # A term that is a suffix of a longer partial match is still reported.
+    assert Blocklist(["abcd", "bc"]).find("xabcx") == "bc"
+    assert Blocklist(["abcd", "bc"]).find("nothing here") is None
+
+def test_terms_match_in_any_written_form():
+    blocklist = Blocklist(["make a bomb"])
+    assert blocklist.find("How do I MAKE-A  Bömb?") == "make a bomb"
+    assert blocklist.find("how to mаke​ a bomb") == "make a bomb"
+    assert blocklist.find("make bombs") is None
+
+def test_file_terms_reload_when_modified(tmp_path):
+    path = tmp_path / "blocklist.txt"
+    path.write_text("# comment\nforbidden\n\n")
+    blocklist = Blocklist(["base"], path=str(path), reload_interval=0)
+    assert blocklist.terms == ["base", "forbidden"]
+    assert blocklist.find("a FORBIDDEN word") == "forbidden"
+
+    path.write_text("other\n")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert blocklist.find("a forbidden word") is None
+    assert blocklist.find("the other one") == "other"
+    assert blocklist.find("base") == "base"
+
+def test_missing_file_keeps_base_terms(tmp_path):
+    blocklist = Blocklist(["base"], path=str(tmp_path / "missing.txt"))
+    assert blocklist.terms == ["base"]
+    assert blocklist.find("base case") == "base"
@@ -0,0 +1,84 @@
+import pytest
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.engine.context import NO_CONTEXT, ContextPacker, count_tokens, format_document, overlap_length
+
+TEXT = " ".join(f"Sentence {i} says something about topic {i % 7}." for i in range(200))
+
+def chunks():
+    return RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_text(TEXT)
+
+def doc(text: str, source: str = "a.txt", score: float = 0.5, point_id=None, vector=None) -> Document:
+    metadata = {"source": source, "_score": score, "_id": point_id if point_id is not None else text}
+    if vector is not None:
+        metadata["_vector"] = vector
+    return Document(page_content=text, metadata=metadata)
+
+def packer(max_tokens: int = 10000) -> ContextPacker:
+    return ContextPacker(max_tokens, token_counting="estimate")
+
+def test_overlap_length_finds_splitter_overlap():
+    first, second = chunks()[:2]
+    overlap = overlap_length(first, second)
+    assert 50 <= overlap <= 200
+    assert first.endswith(second[:overlap])
+    assert overlap_length("short", "short text") == 0
+
+def test_overlap_between_neighbouring_chunks_is_trimmed():
+    first, second = chunks()[:2]
+    context = packer().pack([doc(first, score=0.9, point_id=1), doc(second, score=0.8, point_id=2)])
+    assert context.stats["overlaps_trimmed"] == 1
+    assert context.text.count(second[:100]) == 1
+    # Together the two parts still hold all of the text, once.
+    assert TEXT.startswith(first) and second[-100:] in context.text
+
+def test_overlap_is_kept_across_sources():
+    first, second = chunks()[:2]
+    context = packer().pack([doc(first, score=0.9), doc(second, source="b.txt", score=0.8)])
+    assert context.stats["overlaps_trimmed"] == 0
+
+def test_contained_chunks_and_near_duplicates_are_dropped():
+    first = chunks()[0]
+    docs = [
+        doc(first, score=0.9, point_id=1, vector=[1.0, 0.0]),
+        doc(first[100:600], score=0.8, point_id=2),
+        doc("Something else entirely. " * 5, source="b.txt", score=0.7, point_id=3, vector=[0.99, 0.01]),
+    ]
+    context = packer().pack(docs)
+    assert context.stats["selected"] == 1
+    assert context.stats["duplicates_dropped"] == 2
+
+def test_budget_skips_chunks_that_do_not_fit():
+    parts = chunks()[:4]
+    docs = [doc(text, source=f"{i}.txt", score=1 - i / 10, point_id=i) for i, text in enumerate(parts)]
+    budget = count_tokens(format_document(docs[0])) * 2 + 5
+    context = packer(budget).pack(docs)
+    assert context.stats["selected"] == 2
+    assert context.stats["over_budget"] == 2
+    assert context.stats["tokens_after"] <= budget
+    assert context.stats["tokens_saved"] > 0
+
+def test_best_chunk_is_truncated_when_nothing_fits():
+    context = packer(20).pack([doc(chunks()[0], score=0.9)])
+    assert context.stats["selected"] == 1 and context.stats["over_budget"] == 0
+    assert context.text.startswith("Source: a.txt\nContent: Sentence 0")
+    assert context.stats["tokens_after"] <= 20
+
+def test_nothing_is_selected_when_the_header_alone_is_over_budget():
+    context = packer(3).pack([doc(chunks()[0], source="a-long-source-name.txt")])
+    assert context.text == NO_CONTEXT
+    assert context.stats["selected"] == 0 and context.stats["over_budget"] == 1
+
+def test_auto_counting_falls_back_to_the_estimate(monkeypatch):
+    def unavailable(model):
+        raise RuntimeError("Tokenizer unavailable.")
+
+    monkeypatch.setattr("src.engine.context.load_encoding", unavailable)
+    assert ContextPacker(100, token_counting="auto").encoding is None
+    with pytest.raises(RuntimeError):
+        ContextPacker(100, token_counting="tokenizer")
+
+def test_empty_input():
+    assert packer().pack([]).text == NO_CONTEXT
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from benchmarks.fakes import HashEmbeddings
+from src.engine.agents.decision.model import DecisionOutput
+from src.engine.agents.decision.router import LocalRouter
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+def rag(query: str) -> DecisionOutput:
+    return DecisionOutput(decision="rag", reason="test", search_terms=[query])
+
+def test_record_reuses_route_vector():
+    embedding = CountingEmbeddings()
+    router = LocalRouter(embedding)
+    _, vector = router.route("what is the vacation policy")
+    router.record("what is the vacation policy", rag("x"), vector)
+    assert embedding.queries == 1
+    assert router.snapshot()["learned"] == 1
+
+def test_record_deduplicates_normalized_queries(tmp_path):
+    path = tmp_path / "examples.jsonl"
+    router = LocalRouter(HashEmbeddings(), examples_path=str(path))
+    router.record("Vacation policy?", rag("x"))
+    router.record("  vacation   POLICY? ", rag("x"))
+    assert router.snapshot()["learned"] == 1
+    assert len(path.read_text().splitlines()) == 1
+
+def test_record_caps_examples_per_label(tmp_path):
+    path = tmp_path / "examples.jsonl"
+    router = LocalRouter(HashEmbeddings(), examples_path=str(path), max_examples_per_label=2)
+    for i in range(5):
+        router.record(f"question number {i}", rag("x"))
+    assert router.snapshot()["learned"] == 2
+    assert len(path.read_text().splitlines()) == 2
+
+def test_load_drops_duplicates_and_rewrites_log(tmp_path):
+    path = tmp_path / "examples.jsonl"
+    lines = [{"query": "Who is the CEO", "decision": "rag"}, {"query": "who is the ceo", "decision": "rag"}]
+    lines += [{"query": f"greeting {i}", "decision": "direct"} for i in range(3)]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    router = LocalRouter(HashEmbeddings(), examples_path=str(path), max_examples_per_label=2)
+    kept = [json.loads(line) for line in path.read_text().splitlines()]
+    assert kept == [lines[0], lines[2], lines[3]]
+
+    # Already learned on load, so not logged again.
+    router.record("WHO IS THE CEO", rag("x"))
+    assert len(path.read_text().splitlines()) == 3
+
+def test_seed_examples_are_loaded_and_not_relearned(tmp_path):
+    seeds = tmp_path / "seeds.jsonl"
+    seeds.write_text(json.dumps({"query": "Who founded Acme?", "decision": "rag"}) + "\n")
+    router = LocalRouter(HashEmbeddings(), seed_path=str(seeds))
+    assert router.snapshot()["examples"]["rag"] == 13
+
+    router.record("who founded acme?", rag("x"))
+    assert router.snapshot()["learned"] == 0
+    assert seeds.read_text().count("\n") == 1
+
+def test_seed_file_with_unknown_decision_is_rejected(tmp_path):
+    seeds = tmp_path / "seeds.jsonl"
+    seeds.write_text(json.dumps({"query": "Who founded Acme?", "decision": "search"}) + "\n")
+    with pytest.raises(ValueError):
+        LocalRouter(HashEmbeddings(), seed_path=str(seeds))
@@ -0,0 +1,69 @@
+import asyncio
+
+from benchmarks.fakes import HashEmbeddings
+from src.cache import LRUCache
+from src.rag.embedding_cache import CachedEmbeddings
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.texts += len(texts)
+        return super().embed_documents(texts)
+
+def test_lru_evicts_by_bytes():
+    cache = LRUCache(max_entries=None, max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("a", "xxxx")  # replacing an entry does not count it twice
+    assert cache.bytes == 8
+    cache.put("c", "xxxx")
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.bytes == 8
+
+def test_memory_tier_is_bounded_in_bytes():
+    embeddings = CachedEmbeddings(HashEmbeddings(), "hash", memory_bytes=20 * 1024)
+    embeddings.embed_documents([f"text {i}" for i in range(100)])
+    # 384 float32 values are about 1.6 KB each, so roughly a dozen fit.
+    assert 5 < len(embeddings.memory) < 15
+    assert embeddings.memory.bytes <= 20 * 1024
+
+def test_vectors_round_trip_through_both_tiers(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    model = CountingEmbeddings()
+    first = CachedEmbeddings(model, "hash", path=path).embed_documents(["alpha", "beta"])
+    assert all(isinstance(value, float) for value in first[0])
+
+    again = CachedEmbeddings(model, "hash", path=path)
+    assert again.embed_documents(["alpha", "beta"]) == first
+    assert again.embed_documents(["alpha"]) == first[:1]
+    assert model.texts == 2
+    assert again.stats["disk_hits"] == 2 and again.stats["memory_hits"] == 1
+
+def test_async_methods_use_the_cache():
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "hash")
+
+    async def run():
+        documents = await embeddings.aembed_documents(["alpha", "beta"])
+        return documents, await embeddings.aembed_documents(["alpha"]), await embeddings.aembed_query("alpha")
+
+    documents, cached, query = asyncio.run(run())
+    assert cached == documents[:1]
+    assert query == HashEmbeddings().embed_query("alpha")
+    assert model.texts == 2
+
+def test_stats_are_exact_under_concurrent_lookups():
+    embeddings = CachedEmbeddings(HashEmbeddings(), "hash")
+    embeddings.embed_documents(["alpha"])
+
+    async def run():
+        await asyncio.gather(*(embeddings.aembed_query("alpha") for _ in range(200)))
+        await asyncio.gather(*(asyncio.to_thread(embeddings.embed_documents, ["alpha"]) for _ in range(200)))
+
+    asyncio.run(run())
+    stats = embeddings.snapshot()
+    assert stats["misses"] == 2 and stats["memory_hits"] == 399
@@ -0,0 +1,80 @@
+import os
+import uuid
+
+import pytest
+
+from langchain_core.documents import Document
+
+from src.rag.manifest import IngestionManifest, chunk_id
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.adapters.vector_store.VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setattr("src.adapters.vector_store.LOCAL_VECTOR_STORE_DIR", str(tmp_path / "vectors"))
+    from benchmarks.fakes import HashEmbeddings
+    monkeypatch.setattr("src.rag.ingestion.get_embedding", HashEmbeddings)
+
+    directory = tmp_path / "docs"
+    (directory / "sub").mkdir(parents=True)
+    (directory / "a.txt").write_text("alpha beta gamma. " * 200)
+    (directory / "sub" / "b.txt").write_text("delta epsilon. " * 100)
+    return directory
+
+def ingestion(corpus):
+    from src.rag.ingestion import RAGIngestion
+
+    return RAGIngestion(collection_name="test", manifest_path=str(corpus.parent / "manifest.json"))
+
+def test_chunk_id_depends_on_source_content_and_metadata():
+    chunk = Document(page_content="text", metadata={"source": "a.txt", "page": 1})
+    same = Document(page_content="text", metadata={"page": 1, "source": "a.txt"})
+    assert chunk_id("a.txt", chunk) == chunk_id("a.txt", same)
+    uuid.UUID(chunk_id("a.txt", chunk))
+    assert chunk_id("b.txt", chunk) != chunk_id("a.txt", chunk)
+    assert chunk_id("a.txt", Document(page_content="other", metadata=chunk.metadata)) != chunk_id("a.txt", chunk)
+    assert chunk_id("a.txt", Document(page_content="text", metadata={"source": "a.txt", "page": 2})) != chunk_id("a.txt", chunk)
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    (tmp_path / "a.txt").write_text("a")
+    stat = os.stat(tmp_path / "a.txt")
+    manifest = IngestionManifest(path)
+    assert not manifest.swept
+    manifest.update(str(tmp_path / "a.txt"), "hash", stat, ["1", "2"])
+    manifest.swept = True
+    manifest.save()
+
+    loaded = IngestionManifest(path)
+    assert loaded.get(str(tmp_path / "a.txt"))["ids"] == ["1", "2"]
+    assert loaded.is_unchanged(str(tmp_path / "a.txt"), stat)
+    assert loaded.point_ids() == {"1", "2"}
+    assert list(loaded.paths_under(str(tmp_path))) == [str(tmp_path / "a.txt")]
+    assert list(loaded.paths_under(str(tmp_path / "other"))) == []
+    assert loaded.swept
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_rerun_only_touches_changed_and_removed_files(corpus, parallel):
+    rag = ingestion(corpus)
+    first = rag.ingest(str(corpus), parallel=parallel)
+    assert first["files_added"] == 2 and first["chunks_upserted"] == rag.vector_store.client.points_count
+
+    again = rag.ingest(str(corpus), parallel=parallel)
+    assert again["files_unchanged"] == 2 and again["chunks_upserted"] == 0
+
+    (corpus / "a.txt").write_text("alpha beta gamma. " * 200 + "A new closing sentence.")
+    (corpus / "sub" / "b.txt").unlink()
+    changed = rag.ingest(str(corpus), parallel=parallel)
+    assert changed["files_updated"] == 1 and changed["files_removed"] == 1
+    # Only the last chunk of a.txt changed; the others keep their ids.
+    assert changed["chunks_upserted"] == 1
+    assert rag.vector_store.client.points_count == len(IngestionManifest(rag.manifest_path).point_ids())
+
+def test_first_run_sweeps_points_without_manifest_entry(corpus):
+    rag = ingestion(corpus)
+    baseline = rag.text_splitter.split_documents(rag.load_documents(str(corpus)))
+    rag.vector_store.add_documents(baseline, ids=[str(uuid.uuid4()) for _ in baseline])
+
+    summary = rag.ingest(str(corpus), parallel=False)
+    assert summary["points_swept"] == len(baseline)
+    assert rag.vector_store.client.points_count == summary["chunks_upserted"]
+    assert rag.ingest(str(corpus), parallel=False)["points_swept"] == 0
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+import pytest
+
+from langchain_core.runnables import Runnable
+
+from benchmarks.fakes import FakeChatModel
+from src.engine.llm import LatencyAwareLLM, LatencyTracker
+
+# Generous bound for waiting on background threads; tests never sleep for a fixed time.
+WAIT_SECONDS = 10
+
+class Gate(Runnable):
+    """
+    A model whose calls block until release(), except the call numbers in
+    `instant`, which answer at once. A blocked sync call ends at its request
+    `timeout`, as the OpenAI client does.
+    """
+
+    def __init__(self, instant=()):
+        self.instant = set(instant)
+        self.released = threading.Event()
+        self.timeouts = []
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def _number(self) -> int:
+        with self._lock:
+            self._calls += 1
+            return self._calls
+
+    def invoke(self, input, config=None, **kwargs):
+        number = self._number()
+        if number not in self.instant:
+            self.timeouts.append(kwargs.get("timeout"))
+            if not self.released.wait(kwargs.get("timeout")):
+                raise TimeoutError("Request timed out.")
+        return f"answer {number}"
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        number = self._number()
+        if number not in self.instant:
+            await asyncio.Event().wait()
+        return f"answer {number}"
+
+    async def astream(self, input, config=None, **kwargs):
+        await asyncio.Event().wait()
+        yield "never"
+
+class Tracker(LatencyTracker):
+    """LatencyTracker that lets a test wait for recordings made on other threads."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.recorded = threading.Semaphore(0)
+
+    def record(self, model: str, seconds: float):
+        super().record(model, seconds)
+        self.recorded.release()
+
+    def wait_for(self, recordings: int):
+        for _ in range(recordings):
+            assert self.recorded.acquire(timeout=WAIT_SECONDS)
+
+def instant() -> FakeChatModel:
+    return FakeChatModel(model="b", latency_ms=0, jitter_ms=0)
+
+def tracker_with(model: str, seconds: float, samples: int = 5) -> Tracker:
+    tracker = Tracker(min_samples=samples, min_seconds=0)
+    for _ in range(samples):
+        tracker.record(model, seconds)
+    tracker.wait_for(samples)
+    return tracker
+
+def test_tracker_waits_for_min_samples():
+    tracker = LatencyTracker(quantile=0.5, min_samples=3, min_seconds=0.2)
+    tracker.record("m", 0.1)
+    tracker.record("m", 0.1)
+    assert tracker.hedge_delay("m") is None
+    tracker.record("m", 0.1)
+    assert tracker.hedge_delay("m") == 0.2
+
+def test_invoke_answers_and_records_latency():
+    tracker = Tracker()
+    client = LatencyAwareLLM(instant(), "b", timeout=WAIT_SECONDS, tracker=tracker, hedge=False)
+    assert client.invoke("hi").content
+    assert asyncio.run(client.ainvoke("hi")).content
+    tracker.wait_for(2)
+    assert tracker.snapshot()["b"]["samples"] == 2
+
+def test_deadline_without_fallback_raises():
+    client = LatencyAwareLLM(Gate(), "slow", timeout=0.1, tracker=LatencyTracker(), hedge=False)
+    with pytest.raises(TimeoutError):
+        client.invoke("hi")
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(client.ainvoke("hi"))
+
+@pytest.mark.parametrize("primary", [Gate(), FakeChatModel(model="broken", latency_ms=0, error_ratio=1.0)])
+def test_fallback_answers_failed_or_late_calls(primary):
+    client = LatencyAwareLLM(primary, "a", timeout=0.1, fallback=instant(), fallback_model="b", tracker=LatencyTracker(), hedge=False)
+    assert client.invoke("hi").content
+    assert asyncio.run(client.ainvoke("hi")).content
+
+def test_fallback_streams_when_first_chunk_is_late():
+    client = LatencyAwareLLM(Gate(), "slow", timeout=0.1, fallback=instant(), fallback_model="b", tracker=LatencyTracker(), hedge=False)
+
+    async def collect():
+        return [chunk async for chunk in client.astream("hi")]
+
+    assert len(asyncio.run(collect())) > 1
+
+def test_sync_deadline_ends_the_abandoned_call():
+    tracker = Tracker()
+    model = Gate()
+    client = LatencyAwareLLM(model, "slow", timeout=0.1, tracker=tracker, hedge=False)
+    with pytest.raises(TimeoutError):
+        client.invoke("hi")
+    # The call got the deadline as its request timeout, so it ends (and records) without being released.
+    assert model.timeouts == [0.1]
+    tracker.wait_for(1)
+    assert tracker.snapshot()["slow"]["samples"] == 1
+
+@pytest.mark.parametrize("entry", ["sync", "async"])
+def test_hedge_wins_and_beaten_primary_is_capped(entry):
+    # The primary (call 1) hangs; the hedge (call 2) answers at once.
+    tracker = tracker_with("a", 0.05)
+    model = Gate(instant={2})
+    client = LatencyAwareLLM(model, "a", timeout=WAIT_SECONDS, tracker=tracker, hedge=True)
+
+    if entry == "sync":
+        assert client.invoke("hi") == "answer 2"
+        model.released.set()  # the abandoned sync primary records once it finishes
+    else:
+        assert asyncio.run(client.ainvoke("hi")) == "answer 2"
+
+    # The hedge, and the primary counted as the 0.05 s hedge delay however long it ran.
+    tracker.wait_for(2)
+    assert tracker.snapshot()["a"]["samples"] == 7
+    assert tracker.percentile("a", 1.0) <= 0.05
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+from src.adapters import local_vector_store
+from src.adapters.local_vector_store import LocalIndex
+
+DIM = 16
+
+def vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(count, DIM)).astype(np.float32)
+
+def nearest(index: LocalIndex, vector) -> int:
+    return index.search_batch([vector], 1)[0][0].id
+
+def test_upsert_replaces_and_delete_removes(tmp_path):
+    data = vectors(10)
+    index = LocalIndex(str(tmp_path), dim=DIM, dtype="float32")
+    index.upsert(list(range(10)), data.tolist(), [{"n": i} for i in range(10)])
+    index.upsert([3], [data[3].tolist()], [{"n": 3, "version": 2}])
+    assert index.points_count == 10 and index.count == 11
+
+    hit = index.search_batch([data[3]], 1, with_vectors=True)[0][0]
+    assert hit.id == 3 and hit.payload == {"n": 3, "version": 2}
+    assert np.allclose(hit.vector, data[3] / np.linalg.norm(data[3]), atol=1e-6)
+
+    index.delete([3, 99])
+    assert index.points_count == 9
+    assert 3 not in index.point_ids()
+    assert nearest(index, data[3]) != 3
+
+def test_reopen_and_other_instances_see_writes(tmp_path):
+    data = vectors(20)
+    writer = LocalIndex(str(tmp_path), dim=DIM, dtype="int8")
+    reader = LocalIndex(str(tmp_path), dim=DIM)
+    writer.upsert(list(range(20)), data.tolist(), [{"n": i} for i in range(20)])
+    writer.delete([0])
+    # Other instances catch up on their next search.
+    assert nearest(reader, data[5]) == 5 and reader.points_count == 19
+
+    reopened = LocalIndex(str(tmp_path), dim=DIM)
+    assert reopened.dtype == "int8"
+    assert sorted(reopened.point_ids()) == list(range(1, 20))
+
+def test_compaction_drops_dead_rows(tmp_path):
+    data = vectors(2000)
+    ids = list(range(2000))
+    writer = LocalIndex(str(tmp_path), dim=DIM, dtype="float32")
+    reader = LocalIndex(str(tmp_path), dim=DIM)
+    writer.upsert(ids, data.tolist(), [{"n": i} for i in ids])
+    writer.upsert(ids[:1200], data[:1200].tolist(), [{"n": i, "version": 2} for i in ids[:1200]])
+
+    assert writer.generation == 1 and writer.count == writer.points_count == 2000
+    assert not os.path.exists(tmp_path / "vectors.bin")
+    assert reader.search_batch([data[7]], 1)[0][0].payload == {"n": 7, "version": 2}
+    assert reader.generation == 1 and reader.count == 2000
+    assert LocalIndex(str(tmp_path), dim=DIM).points_count == 2000
+
+def test_reopen_starts_from_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_vector_store, "SNAPSHOT_RECORDS", 50)
+    data = vectors(120)
+    index = LocalIndex(str(tmp_path), dim=DIM)
+    for start in range(0, 120, 40):
+        index.upsert(list(range(start, start + 40)), data[start:start + 40].tolist(), [{}] * 40)
+    assert os.path.exists(tmp_path / "snapshot.npz")
+
+    reopened = LocalIndex(str(tmp_path), dim=DIM)
+    # Only the records after the snapshot were replayed.
+    assert 0 < reopened._records_since_snapshot < 120
+    assert reopened.points_count == 120 and nearest(reopened, data[100]) == 100
+
+def test_approximate_search_finds_exact_neighbours(tmp_path):
+    data = vectors(12000)
+    index = LocalIndex(str(tmp_path), dim=DIM, approximate=True, nprobe=16)
+    index.upsert(list(range(12000)), data.tolist(), [{}] * 12000)
+    assert [nearest(index, data[i]) for i in (10, 5000, 11999)] == [10, 5000, 11999]
+    assert index._ivf["built_count"] == 12000
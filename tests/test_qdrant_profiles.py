@@ -0,0 +1,75 @@
+import pytest
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import CreateAlias, CreateAliasOperation, Distance, PointStruct, VectorParams
+
+from src.adapters import qdrant_profiles
+from src.adapters.qdrant_profiles import PROFILES, _catch_up, _fingerprints, migrate, migration_marker
+from src.adapters.vector_store import search_batch
+
+def client_with(name: str, points: int = 100) -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(name, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    client.upsert(name, [PointStruct(id=i, vector=[1, i, 0, 1], payload={"n": i}) for i in range(points)])
+    return client
+
+def same_points(client: QdrantClient, a: str, b: str) -> bool:
+    left, right = _fingerprints(client, a, 32, 4), _fingerprints(client, b, 32, 4)
+    return left.keys() == right.keys() and all(left[i].matches(right[i]) for i in left)
+
+def test_migrate_switches_plain_collection_then_alias():
+    client = client_with("documents")
+    first = migrate(client, "documents", PROFILES["quantized"], batch_size=32, settle_seconds=0)
+    assert [(a.alias_name, a.collection_name) for a in client.get_aliases().aliases] == [("documents", first["target"])]
+    assert client.count("documents").count == 100
+    assert not client.collection_exists(migration_marker("documents"))
+
+    second = migrate(client, "documents", PROFILES["default"], batch_size=32, drop_old=True, settle_seconds=0)
+    assert second["source"] == first["target"]
+    assert not client.collection_exists(first["target"])
+    assert client.count("documents").count == 100
+
+def test_failed_switch_restores_the_plain_collection(monkeypatch):
+    client = client_with("documents")
+
+    def fail(**kwargs):
+        raise RuntimeError("alias rejected")
+
+    monkeypatch.setattr(client, "update_collection_aliases", fail)
+    with pytest.raises(RuntimeError, match="restored"):
+        migrate(client, "documents", PROFILES["quantized"], batch_size=32, settle_seconds=0)
+
+    assert not client.get_aliases().aliases
+    assert client.count("documents").count == 100
+    assert not client.collection_exists(migration_marker("documents"))
+
+def test_search_waits_for_the_alias_during_the_switch(monkeypatch):
+    client = client_with("documents_new")
+    client.create_collection(migration_marker("documents"), vectors_config=VectorParams(size=1, distance=Distance.DOT))
+
+    def switch(seconds):
+        # The migration creates the alias while the search is waiting.
+        client.update_collection_aliases(
+            change_aliases_operations=[CreateAliasOperation(create_alias=CreateAlias(collection_name="documents_new", alias_name="documents"))]
+        )
+
+    monkeypatch.setattr(qdrant_profiles.time, "sleep", switch)
+    hits = search_batch(client, "documents", [[1, 5, 0, 1]], 1, params=None)
+    assert hits[0][0][0].metadata["_id"] == 5
+
+    client.delete_collection(migration_marker("documents"))
+    with pytest.raises(Exception):
+        search_batch(client, "missing", [[1, 5, 0, 1]], 1, params=None)
+
+def test_catch_up_copies_changed_payloads_and_vectors_and_removes_deleted():
+    client = client_with("source")
+    client.create_collection("target", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    assert _catch_up(client, "source", "target", 32, 4, max_rounds=2) == (100, 0, True)
+    # Copies are renormalized by Qdrant, yet count as unchanged.
+    assert _catch_up(client, "source", "target", 32, 4, max_rounds=2) == (0, 0, True)
+
+    client.set_payload("source", {"n": -1}, points=[1])
+    client.upsert("source", [PointStruct(id=2, vector=[0, 0, 1, 0], payload={"n": 2}), PointStruct(id=500, vector=[1, 1, 1, 1], payload={})])
+    client.delete("source", points_selector=[3])
+    assert _catch_up(client, "source", "target", 32, 4, max_rounds=2) == (3, 1, True)
+    assert same_points(client, "source", "target")
@@ -0,0 +1,58 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from src.engine.agents.compliance.model import ComplianceOutput
+from src.engine.agents.decision.model import DecisionOutput
+from src.engine.agents.rag_answer.model import RAGAnswerOutput
+from src.engine.orchestrator import Orchestrator
+from src.engine.speculation import SpeculationReport
+
+class Retriever:
+    def __init__(self):
+        self.searched = []
+
+    async def asearch_documents(self, terms):
+        self.searched.append(list(terms))
+        return [f"doc for {term}" for term in terms]
+
+    def build_context(self, docs):
+        return SimpleNamespace(text="\n".join(docs), stats=None)
+
+class RAGAgent:
+    async def ainvoke(self, query, context):
+        return RAGAnswerOutput(answer=context, context_sufficient=True)
+
+def resolve(search_terms):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.retriever = Retriever()
+    orchestrator.rag_agent = RAGAgent()
+
+    async def compliance():
+        return ComplianceOutput(is_safe=True)
+
+    async def decide():
+        return DecisionOutput(decision="rag", reason="test", search_terms=search_terms)
+
+    async def run():
+        report = SpeculationReport()
+        decision_task = report.start("decision", decide())
+        retrieval_task = report.start("retrieval", orchestrator.retriever.asearch_documents(["raw query"]))
+        return await orchestrator._resolve_speculation(
+            "raw query", asyncio.ensure_future(compliance()), decision_task, retrieval_task, report
+        )
+
+    return asyncio.run(run()), orchestrator.retriever.searched
+
+def test_speculative_retrieval_is_used_when_decision_searches_the_query():
+    response, searched = resolve(["raw query", "other"])
+    assert response["answer"] == "doc for raw query\ndoc for other"
+    assert searched == [["raw query"], ["other"]]
+    assert response["speculation"]["tasks"]["retrieval"]["outcome"] == "used"
+
+def test_speculative_retrieval_is_wasted_when_decision_searches_other_terms():
+    response, searched = resolve(["rewritten"])
+    assert response["answer"] == "doc for rewritten"
+    assert searched[-1] == ["rewritten"]
+    assert response["speculation"]["tasks"]["retrieval"]["outcome"] in ("cancelled", "discarded")
+    assert response["speculation"]["wasted_tasks"] == 1
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from src.engine.agents.rag_answer.streaming import JsonStringFieldStreamer
+
+def stream(document: str, chunk_size: int, field: str = "answer"):
+    streamer = JsonStringFieldStreamer(field)
+    parts = [streamer.feed(document[i:i + chunk_size]) for i in range(0, len(document), chunk_size)]
+    return "".join(parts), streamer
+
+ANSWER = 'Line one\nsaid "hi" \\ path/to\tend — café 😀 𝄞'
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 1000])
+def test_decodes_escapes_and_surrogates_split_at_any_point(chunk_size):
+    document = json.dumps({"context_sufficient": True, "answer": ANSWER, "note": "x"})
+    assert "\\ud83d\\ude00" in document
+    text, streamer = stream(document, chunk_size)
+    assert text == ANSWER
+    assert streamer.done
+
+def test_unescaped_non_ascii_and_escaped_solidus():
+    text, _ = stream('{"answer": "café 😀 a\\/b \\u00e9"}', 4)
+    assert text == "café 😀 a/b é"
+
+def test_other_fields_are_ignored_until_the_key():
+    streamer = JsonStringFieldStreamer("answer")
+    assert streamer.feed('{"reason": "the answer is", "ans') == ""
+    assert streamer.feed('wer" :  "Yes') == "Yes"
+    assert streamer.feed('!", "answer": "again"}') == "!"
+    assert streamer.feed("more") == ""
+    assert streamer.done
+
+def test_incomplete_escape_waits_for_more_input():
+    streamer = JsonStringFieldStreamer("answer")
+    assert streamer.feed('{"answer": "a\\') == "a"
+    assert streamer.feed("u00") == ""
+    assert streamer.feed("e9\\ud83d") == "é"
+    assert streamer.feed("\\ude00\"") == "😀"
+    assert streamer.done
+
+def test_unfinished_document_is_not_done():
+    text, streamer = stream('{"answer": "partial', 3)
+    assert text == "partial"
+    assert not streamer.done